@@ -0,0 +1,260 @@
+#===============================ArtifactStore.py================================#
+# Description:
+# One on-disk cache of derived artifacts shared by every part of the project
+# and every process: exports (LimitExport.py), encoded dashboard figures
+# (LimitLayers.py), WebGL display lists (LimitGL.py) and batch figures
+# (LimitBuild.py) are looked up here before they are computed.
+#
+# Artifacts are addressed by a hash of their inputs (Key): for anything drawn
+# by PlotFuncs (DataKey, FigureKey) those are the contents of the data files
+# and the source of the functions involved (from LimitDeps.py), the
+# parameters, and the versions of the libraries that made them (LIBRARIES).
+# Contents are stored under their own hash, so identical outputs of different
+# inputs are kept once:
+#   artifacts/objects/ab/abcd...     contents, by content hash
+#   artifacts/keys/12/1234...        content hash stored for an input key
+# Every file is written to a temporary name in its folder and renamed into
+# place, so readers never see a partial file and workers writing the same
+# artifact at once don't get in each other's way. Reads refresh an object's
+# mtime; once more than max_bytes are stored the least recently used objects
+# are removed (under a lock file, by one process at a time).
+#
+# Usage:
+#   store = SharedStore()
+#   key = FigureKey(spec,'export',fmt='pdf')
+#   data = store.get(key)                # bytes, or None
+#   store.put(key,data)
+#   items = store.cached(DataKey('display',['AxionPhoton.Helioscopes']),make)
+#
+#   python ArtifactStore.py [trim]       # size of the store [and trim it]
+#==============================================================================#
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+import threading
+
+storedir = 'artifacts'
+MAX_BYTES = int(os.environ.get('LIMIT_ARTIFACTS_MAX',512*2**20))
+TRIM_TO = 0.9          # trimming leaves this fraction of max_bytes
+TRIM_EVERY = 0.05      # fraction of max_bytes written between size checks
+# Libraries whose output is stored: drawing, arrays, and image encoding
+LIBRARIES = ['matplotlib','numpy','pillow']
+# Functions of PlotFuncs every figure goes through, besides its limits'
+FRAME = ['FigSetup','FixedLayout','ApplyView','MassWindow','LimitView','LoadCurve','loadtxt']
+# Modules that read the curves, and draw and save the figures
+DRAWING = ['LimitFigure.py','LimitLabels.py','LimitExport.py','CurveStore.py','LimitIngest.py']
+
+#==============================================================================#
+# Input hashes
+_file_hashes = {}      # path -> ((mtime, size), hash)
+_versions = None
+
+def FileHash(path):
+    # Hash of a file's contents (None if missing), hashed again only when its
+    # size or mtime changed
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns,st.st_size)
+    known = _file_hashes.get(path)
+    if (known is not None) and (known[0]==stamp):
+        return known[1]
+    with open(path,'rb') as f:
+        h = hashlib.sha1(f.read()).hexdigest()
+    _file_hashes[path] = (stamp,h)
+    return h
+
+def Versions():
+    global _versions
+    if _versions is None:
+        from importlib.metadata import version, PackageNotFoundError
+        _versions = {}
+        for lib in LIBRARIES:
+            try:
+                _versions[lib] = version(lib)
+            except PackageNotFoundError:
+                _versions[lib] = None
+    return _versions
+
+def Key(kind,inputs):
+    # Address of the artifact of kind made from inputs (JSON-able)
+    s = json.dumps({'kind':kind,'inputs':inputs,'versions':Versions()},sort_keys=True,default=repr)
+    return hashlib.sha256(s.encode()).hexdigest()
+
+def DataKey(kind,functions,sources=(),**params):
+    # Key of an artifact made by the PlotFuncs functions ('Class.method'),
+    # from the data files they read, their source and that of the functions
+    # they call, the modules sources, and params. None if no function is
+    # known to the map.
+    from LimitDeps import SharedMap
+    deps = SharedMap()
+    if not any(n in deps.nodes for n in functions):
+        return None
+    closure = sorted(deps.Closure(functions))
+    files = sorted(set(deps.Files(closure)+deps.Files(closure,missing=True)))
+    inputs = {'functions':{n:deps.nodes[n]['hash'] for n in closure},'module':deps.module,
+              'files':{fn:FileHash(os.path.join(deps.root,fn)) for fn in files},
+              'sources':{fn:FileHash(os.path.join(deps.root,fn)) for fn in sources},
+              'params':params}
+    return Key(kind,inputs)
+
+def FigureKey(spec,kind,sources=(),**params):
+    # Key of an artifact drawn from a plot spec (see LimitFigure.py), by the
+    # drawing modules and sources
+    functions = FRAME+['%s.%s' % (cls,method) for _,cls,method,_ in spec['limits']]
+    return DataKey(kind,functions,DRAWING+list(sources),spec=spec,**params)
+#==============================================================================#
+
+
+#==============================================================================#
+class ArtifactStore():
+    def __init__(self,root=storedir,max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.lock = threading.Lock()
+
+    def _path(self,folder,h):
+        return os.path.join(self.root,folder,h[:2],h[2:])
+
+    def _write(self,path,data):
+        os.makedirs(os.path.dirname(path),exist_ok=True)
+        tmp = '%s.%d.%d.tmp' % (path,os.getpid(),threading.get_ident())
+        with open(tmp,'wb') as f:
+            f.write(data)
+        os.replace(tmp,path)
+
+    def get(self,key):
+        # Contents stored for key, or None. A key of None is never stored.
+        if key is None:
+            return None
+        try:
+            with open(self._path('keys',key)) as f:
+                digest = f.read().strip()
+        except OSError:
+            return None
+        path = self._path('objects',digest)
+        try:
+            with open(path,'rb') as f:
+                data = f.read()
+        except OSError:
+            return None    # trimmed
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self,key,data):
+        # Stores data for key. Returns its content hash, or None if it couldn't
+        # be stored (a cache never fails its caller).
+        if key is None:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path('objects',digest)
+        try:
+            try:
+                os.utime(path)    # already stored
+            except OSError:
+                self._write(path,data)
+                with self.lock:
+                    self.written += len(data)
+            self._write(self._path('keys',key),digest.encode())
+            if self.written>TRIM_EVERY*self.max_bytes:
+                self.trim()
+        except OSError:
+            return None
+        return digest
+
+    def get_object(self,key):
+        data = self.get(key)
+        return None if data is None else pickle.loads(data)
+
+    def put_object(self,key,obj):
+        return self.put(key,pickle.dumps(obj,protocol=pickle.HIGHEST_PROTOCOL))
+
+    def cached(self,key,make):
+        # make(), computed once for key by any process
+        obj = self.get_object(key)
+        if obj is None:
+            obj = make()
+            self.put_object(key,obj)
+        return obj
+
+    def _objects(self):
+        # [(mtime, size, path)] of the stored objects
+        found = []
+        for d,_,fns in os.walk(os.path.join(self.root,'objects')):
+            for fn in fns:
+                if fn.endswith('.tmp'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(d,fn))
+                except OSError:
+                    continue
+                found.append((st.st_mtime,st.st_size,os.path.join(d,fn)))
+        return found
+
+    def size(self):
+        objects = self._objects()
+        return len(objects),sum([s for _,s,_ in objects])
+
+    def trim(self):
+        # Removes the least recently used objects until at most TRIM_TO of
+        # max_bytes are stored, and the keys of removed objects
+        with self.lock:
+            self.written = 0
+        os.makedirs(self.root,exist_ok=True)
+        with open(os.path.join(self.root,'lock'),'w') as lockfile:
+            try:
+                import fcntl
+                fcntl.flock(lockfile,fcntl.LOCK_EX)
+            except ImportError:
+                pass
+            objects = sorted(self._objects())
+            total = sum([s for _,s,_ in objects])
+            if total<=self.max_bytes:
+                return 0
+            removed = 0
+            for _,s,path in objects:
+                if total<=TRIM_TO*self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= s
+                removed += 1
+            for d,_,fns in os.walk(os.path.join(self.root,'keys')):
+                for fn in fns:
+                    try:
+                        with open(os.path.join(d,fn)) as f:
+                            if not os.path.exists(self._path('objects',f.read().strip())):
+                                os.remove(os.path.join(d,fn))
+                    except OSError:
+                        pass
+            return removed
+#==============================================================================#
+
+
+#==============================================================================#
+# One store object per process; the files are shared by all of them
+_shared = None
+
+def SharedStore():
+    global _shared
+    if _shared is None:
+        _shared = ArtifactStore()
+    return _shared
+
+if __name__=='__main__':
+    store = SharedStore()
+    if sys.argv[1:2]==['trim']:
+        print(store.trim(),'objects removed')
+    n,total = store.size()
+    print('%d objects, %.1f MB of %.1f MB in %s/' % (n,total/2**20,store.max_bytes/2**20,store.root))
+#==============================================================================#
@@ -0,0 +1,204 @@
+#================================CurveStore.py=================================#
+# Description:
+# A read-only pack of every curve in limit_data/, shared between processes.
+# One loader parses all the text files once and writes them into a single
+# binary file; every process then memory-maps it and gets its curves as views
+# into the mapping, so the pages are shared through the OS page cache instead
+# of each `panel serve --num-procs` worker holding its own parsed copies.
+#
+# Layout: 8 byte magic, 8 byte header length, JSON header, padding to 64 bytes,
+# then all curves back to back as float64, then their log10 columns. The header
+# maps each file name to (offset, shape) plus the mtime/size it was packed
+# from; curves whose file has changed since are ignored, and are parsed from
+# the text file instead.
+#
+# Files are read by LimitIngest.py, with their delimiter detected, and the
+# header also keeps each curve's metadata (title, references, columns, from
+# its comments) and geometry (line or contour, closed, sentinel caps).
+#
+# Every curve also gets its log10 columns, stored one column after the other
+# (NaN where a value isn't positive). For curves whose first column (the mass)
+# is positive and sorted, the first of them is the mass index, so that the
+# rows inside a mass window are found with a binary search that only touches
+# a few pages (see CurveStore.rows and PlotFuncs.MassWindow).
+#
+# Usage:
+#   python CurveStore.py                  # publish limit_data/ to limit_data.pack
+#   python LimitIngest.py --check         # files not in canonical form
+#   PlotFuncs.UseCurveStore()             # attach, in each process
+#==============================================================================#
+
+import os
+import sys
+import json
+import struct
+import argparse
+import numpy as np
+
+from LimitIngest import ReadCurve, Geometry
+
+storefile = 'limit_data.pack'
+datadir = 'limit_data/'
+
+MAGIC = b'CURVPAK2'   # bumped whenever the layout changes
+ALIGN = 64
+
+def _name(filename):
+    return os.path.normpath(filename)
+
+def _stamp(filename):
+    st = os.stat(filename)
+    return [st.st_mtime_ns,st.st_size]
+
+def MassIndex(dat):
+    # log10 of the mass column if it is positive and sorted, otherwise None
+    if (dat.ndim!=2) or (dat.shape[0]<2) or (dat.shape[1]<2):
+        return None
+    m = dat[:,0]
+    if not (np.all(m>0) and np.all(np.diff(m)>=0)):
+        return None
+    return np.log10(m)
+
+def LogColumns(dat):
+    # log10 of every column, one after the other, NaN where not positive
+    with np.errstate(divide='ignore',invalid='ignore'):
+        return np.where(dat.T>0,np.log10(dat.T),np.nan)
+
+def WindowRows(logm,m_min,m_max):
+    # Rows i0:i1 of a curve with mass index logm that lie inside
+    # [m_min,m_max], plus one point either side
+    i0 = np.searchsorted(logm,np.log10(m_min),'left')-1
+    i1 = np.searchsorted(logm,np.log10(m_max),'right')+1
+    return max(int(i0),0),min(int(i1),len(logm))
+
+#==============================================================================#
+def PackCurves(root=datadir,path=storefile):
+    # Parses every .txt under root (as numpy's loadtxt would, with the file's
+    # delimiter) and writes the pack atomically. Returns the number of curves
+    # packed and the list of files that could not be parsed.
+    files = []
+    for d,_,names in os.walk(root):
+        files += [os.path.join(d,n) for n in names if n.endswith('.txt')]
+    files.sort()
+
+    index = {}
+    curves = []
+    skipped = []
+    offset = 0
+    for fn in files:
+        try:
+            dat,meta = ReadCurve(fn)
+        except ValueError:
+            skipped.append(fn)
+            continue
+        if dat.size==0:
+            skipped.append(fn)
+            continue
+        dat = np.squeeze(dat)    # a single row or column, as loadtxt reads it
+        index[_name(fn)] = {'offset':offset,'shape':list(dat.shape),'stamp':_stamp(fn),
+                            'meta':meta,'geometry':Geometry(dat)}
+        curves.append(dat)
+        offset += dat.size
+    for (name,e),dat in zip(index.items(),list(curves)):
+        if dat.ndim!=2:
+            continue
+        e['log'] = offset
+        if MassIndex(dat) is not None:
+            e['logm'] = offset
+        curves.append(LogColumns(dat))
+        offset += dat.size
+
+    header = json.dumps({'files':index,'size':offset}).encode()
+    start = len(MAGIC)+8+len(header)
+    pad = (-start) % ALIGN
+    tmp = path+'.%d.tmp' % os.getpid()
+    with open(tmp,'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q',len(header)+pad))
+        f.write(header)
+        f.write(b' '*pad)
+        for dat in curves:
+            f.write(dat.astype('<f8',copy=False).tobytes())
+    os.replace(tmp,path)
+    return len(index),skipped
+#==============================================================================#
+
+
+#==============================================================================#
+class CurveStore():
+    def __init__(self,path=storefile,check=True):
+        with open(path,'rb') as f:
+            if f.read(len(MAGIC))!=MAGIC:
+                raise ValueError(path+' is not a curve pack of this version: run `python CurveStore.py`')
+            n = struct.unpack('<Q',f.read(8))[0]
+            header = json.loads(f.read(n))
+        self.path = path
+        self.index = header['files']
+        start = len(MAGIC)+8+n
+        total = header['size']
+        self.data = np.memmap(path,dtype='<f8',mode='r',offset=start,shape=(total,)) if total>0 else np.empty(0)
+        if check:
+            for name in list(self.index):
+                try:
+                    ok = _stamp(name)==self.index[name]['stamp']
+                except OSError:
+                    ok = False
+                if not ok:
+                    del self.index[name]
+
+    def get(self,filename):
+        # Read-only view of the curve, or None if it isn't in the pack
+        e = self.index.get(_name(filename))
+        if e is None:
+            return None
+        n = int(np.prod(e['shape']))
+        return np.asarray(self.data[e['offset']:e['offset']+n]).reshape(e['shape'])
+
+    def log(self,filename):
+        # Read-only view of the log10 of the curve's columns (same shape as
+        # the curve), or None if it isn't in the pack
+        e = self.index.get(_name(filename))
+        if (e is None) or ('log' not in e):
+            return None
+        n,k = e['shape']
+        return np.asarray(self.data[e['log']:e['log']+n*k]).reshape(k,n).T
+
+    def info(self,filename):
+        # {'meta','geometry'} of the curve (see LimitIngest.py), or None
+        e = self.index.get(_name(filename))
+        if (e is None) or ('meta' not in e):
+            return None
+        return {'meta':e['meta'],'geometry':e['geometry']}
+
+    def rows(self,filename,m_min,m_max):
+        # Row range of the curve inside a mass window (see WindowRows): None
+        # if the curve isn't in the pack, all rows if it has no mass index
+        e = self.index.get(_name(filename))
+        if e is None:
+            return None
+        n = e['shape'][0]
+        if 'logm' not in e:
+            return 0,n
+        return WindowRows(self.data[e['logm']:e['logm']+n],m_min,m_max)
+
+    def forget(self,filename):
+        # Stop serving a curve whose file has changed since the pack was attached
+        self.index.pop(_name(filename),None)
+
+    def __contains__(self,filename):
+        return _name(filename) in self.index
+
+    def __len__(self):
+        return len(self.index)
+#==============================================================================#
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Pack all limit curves into one shared, memory-mappable file')
+    parser.add_argument('--root',default=datadir)
+    parser.add_argument('--out',default=storefile)
+    args = parser.parse_args()
+    n,skipped = PackCurves(args.root,args.out)
+    print(n,'curves packed into',args.out,'(%.1f MB)' % (os.path.getsize(args.out)/1e6))
+    for fn in skipped:
+        print('  not packed:',fn,file=sys.stderr)
@@ -0,0 +1,241 @@
+#=================================LimitBuild.py=================================#
+# Description:
+# Batch rendering of the standard figures, rebuilding only the ones whose
+# inputs changed. The inputs of a figure are
+#   - its spec (see LimitFigure.py) and output format,
+#   - the content of every limit_data file its methods read, directly or
+#     through the functions they call (LimitDeps.py), missing files included,
+#     and the list of files matching each path pattern,
+#   - the source of those PlotFuncs functions and of the framing functions
+#     every figure goes through, and PlotFuncs' module-level statements,
+#   - the modules that read the curves and draw and save figures, and the
+#     matplotlib and numpy versions.
+# out/build.json keeps the hash of every input of every figure. File contents
+# are only hashed again when their size or mtime changed, and PlotFuncs.py
+# only parsed again when its contents did, so a rebuild with nothing to do
+# imports neither matplotlib nor PlotFuncs.
+#
+# The standard figures are every AxionPhoton limit of the dashboard on one
+# figure, and one figure per category of app.py; a JSON file of
+# {name: spec} replaces them.
+#
+# Usage:
+#   python LimitBuild.py [--out plots] [--formats pdf png] [--jobs 4]
+#                        [--figures figures.json] [--dry-run]
+#==============================================================================#
+
+import os
+import json
+import time
+import hashlib
+import argparse
+
+from ArtifactStore import FRAME, DRAWING
+
+here = os.path.dirname(os.path.abspath(__file__))
+BUILD_VERSION = 1
+LIBRARIES = ['matplotlib','numpy']
+
+def _hash(data):
+    return hashlib.sha1(data).hexdigest()[:16]
+
+def SpecKey(spec,fmt):
+    # LimitFigure.SpecHash of spec, with the format, without importing matplotlib
+    return _hash((json.dumps(spec,sort_keys=True,default=repr)+fmt).encode())
+
+#==============================================================================#
+def StandardFigures(cls='AxionPhoton'):
+    # {name: spec}: all the dashboard's limits, and each of its categories
+    from LimitBundles import Categories, Slug
+    base = {'shape':'Rectangular','xlim':(1e-12,1e7),'ylim':(1e-19,1e-6),'plane':'g',
+            'ylab':r'$|g_{a\gamma}|$ [GeV$^{-1}$]',
+            'models':[{'name':'KSVZ','C':(-1.92,-1.92),'color':'#1f77b4'},
+                      {'name':'DFSZ-I','C':(0.75,0.75),'color':'#ff7f0e'}]}
+    figures = {}
+    everything = []
+    for cat,items in Categories():
+        limits = [(fn.split('.')[1],fn.split('.')[0],fn.split('.')[1],{})
+                  for fn,visible in items if fn.startswith(cls+'.')]
+        everything += [l for l in limits if l not in everything]
+        figures['%s_%s' % (cls,Slug(cat))] = dict(base,limits=limits)
+    figures[cls] = dict(base,limits=everything)
+    return figures
+#==============================================================================#
+
+
+#==============================================================================#
+class Builder():
+    def __init__(self,out='plots'):
+        self.out = out
+        self.manifestfile = os.path.join(out,'build.json')
+        self.manifest = {'version':BUILD_VERSION,'stamps':{},'code':{},'figures':{}}
+        try:
+            with open(self.manifestfile) as f:
+                manifest = json.load(f)
+            if manifest.get('version')==BUILD_VERSION:
+                self.manifest = manifest
+        except (OSError,ValueError):
+            pass
+        self.deps = None
+        self.code = None
+
+    def FileHash(self,path):
+        # Hash of a file's contents (None if missing), hashed again only if
+        # its size or mtime changed since the last build
+        try:
+            st = os.stat(os.path.join(here,path))
+        except OSError:
+            return None
+        stamps = self.manifest['stamps']
+        stamp = [st.st_mtime_ns,st.st_size]
+        if (path in stamps) and (stamps[path][:2]==stamp):
+            return stamps[path][2]
+        with open(os.path.join(here,path),'rb') as f:
+            h = _hash(f.read())
+        stamps[path] = stamp+[h]
+        return h
+
+    def Code(self):
+        # {function: source hash} of PlotFuncs.py, parsed only if it changed
+        if self.code is None:
+            source = self.FileHash('PlotFuncs.py')
+            code = self.manifest['code']
+            if code.get('source')!=source:
+                from LimitDeps import DependencyMap
+                self.deps = DependencyMap()
+                code = {'source':source,'module':self.deps.module,
+                        'hashes':{n:node['hash'] for n,node in self.deps.nodes.items()}}
+                self.manifest['code'] = code
+            self.code = code
+        return self.code
+
+    def Keys(self,name,spec,key):
+        # The inputs of a figure other than its spec: those of its last build
+        # if neither its spec nor PlotFuncs.py changed since, otherwise from
+        # the map
+        self.Code()
+        old = self.manifest['figures'].get(name)
+        if (self.deps is None) and (old is not None) and (old['inputs'].get('spec')==key):
+            return [k for k in old['inputs'] if k!='spec']
+        if self.deps is None:
+            from LimitDeps import DependencyMap
+            self.deps = DependencyMap()
+        names = FRAME+['%s.%s' % (cls,method) for _,cls,method,_ in spec['limits']]
+        closure = sorted(self.deps.Closure(names))
+        keys = ['code:module']+['code:'+n for n in closure]
+        keys += ['file:'+f for f in sorted(set(self.deps.Files(closure)+self.deps.Files(closure,missing=True)))]
+        keys += ['glob:'+p for p in sorted({p for n in closure for p in self.deps.nodes[n]['patterns']})]
+        keys += ['file:'+f for f in DRAWING]+['lib:'+l for l in LIBRARIES]
+        return keys
+
+    def Input(self,key):
+        kind,name = key.split(':',1)
+        if kind=='code':
+            code = self.Code()
+            return code['module'] if name=='module' else code['hashes'].get(name)
+        if kind=='file':
+            return self.FileHash(name)
+        if kind=='glob':
+            import glob
+            return _hash('\n'.join(sorted(glob.glob(os.path.join(here,name)))).encode())
+        if kind=='lib':
+            from importlib.metadata import version
+            return version(name)
+        return None
+
+    def Plan(self,figures,formats):
+        # [(output, spec, fmt, inputs)] of the outputs to render
+        todo = []
+        for name,spec in figures.items():
+            for fmt in formats:
+                output = '%s.%s' % (name,fmt)
+                key = SpecKey(spec,fmt)
+                inputs = {'spec':key}
+                inputs.update((k,self.Input(k)) for k in self.Keys(output,spec,key))
+                old = self.manifest['figures'].get(output)
+                if (old is None) or (old['inputs']!=inputs) or not os.path.exists(os.path.join(self.out,output)):
+                    todo.append((output,spec,fmt,inputs))
+        return todo
+
+    def Changed(self,output,inputs):
+        # The inputs of output that differ from its last build
+        old = self.manifest['figures'].get(output,{}).get('inputs',{})
+        return [k for k in inputs if old.get(k)!=inputs[k]]
+
+    def Save(self):
+        os.makedirs(self.out,exist_ok=True)
+        tmp = self.manifestfile+'.%d.tmp' % os.getpid()
+        with open(tmp,'w') as f:
+            json.dump(self.manifest,f,indent=1,sort_keys=True)
+        os.replace(tmp,self.manifestfile)
+
+    def Run(self,figures,formats=('pdf',),jobs=1,dry_run=False,verbose=True):
+        # Renders the outputs whose inputs changed. Returns their names.
+        todo = self.Plan(figures,formats)
+        if verbose:
+            for output,spec,fmt,inputs in todo:
+                changed = self.Changed(output,inputs)
+                print('%-40s %s' % (output,', '.join(changed[:4])+(' ...' if len(changed)>4 else '')))
+        if dry_run or not todo:
+            if not dry_run:
+                self.Save()
+            return [t[0] for t in todo]
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from LimitExport import ExportSpec, _init_worker
+        from LimitFigure import LayerError
+        from ArtifactStore import SharedStore, Key
+        os.makedirs(self.out,exist_ok=True)
+        store = SharedStore()
+        # outputs rendered before from the same inputs (e.g. after a revert)
+        # are taken from the artifact store
+        render = []
+        for output,spec,fmt,inputs in todo:
+            data = store.get(Key('build',inputs))
+            if data is None:
+                render.append((output,spec,fmt,inputs))
+            else:
+                self.Write(output,inputs,data)
+        if not render:
+            return [t[0] for t in todo]
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(jobs,len(render)),mp_context=ctx,initializer=_init_worker) as pool:
+            futures = [(t,pool.submit(ExportSpec,t[1],t[2])) for t in render]
+            for (output,spec,fmt,inputs),fut in futures:
+                try:
+                    data = fut.result()
+                except LayerError as e:
+                    # left out of the manifest, so the next build tries again
+                    print('%-40s not built: %s' % (output,e))
+                    continue
+                store.put(Key('build',inputs),data)
+                self.Write(output,inputs,data)
+        return [t[0] for t in todo]
+
+    def Write(self,output,inputs,data):
+        path = os.path.join(self.out,output)
+        with open(path+'.tmp','wb') as f:
+            f.write(data)
+        os.replace(path+'.tmp',path)
+        self.manifest['figures'][output] = {'inputs':inputs,'bytes':len(data)}
+        self.Save()
+#==============================================================================#
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Render the figures whose inputs changed')
+    parser.add_argument('--out',default='plots')
+    parser.add_argument('--formats',nargs='+',default=['pdf'])
+    parser.add_argument('--jobs',type=int,default=max(1,min(4,os.cpu_count() or 1)))
+    parser.add_argument('--figures',help='JSON file of {name: spec}, instead of the standard figures')
+    parser.add_argument('--dry-run',action='store_true',help='only list what would be rendered')
+    args = parser.parse_args()
+    t = time.perf_counter()
+    if args.figures:
+        with open(args.figures) as f:
+            figures = json.load(f)
+    else:
+        figures = StandardFigures()
+    done = Builder(args.out).Run(figures,args.formats,args.jobs,args.dry_run)
+    print('%d of %d outputs %s in %.2f s' % (len(done),len(figures)*len(args.formats),
+          'out of date' if args.dry_run else 'rendered',time.perf_counter()-t))
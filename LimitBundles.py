@@ -0,0 +1,207 @@
+#================================LimitBundles.py================================#
+# Description:
+# Asset bundles for the browser (pyodide) build. Rather than one assets.zip
+# with the code and all of limit_data, the build gets
+#   - a core bundle: the modules app.py imports (directly or not) and the
+#     curves of the limits shown by default,
+#   - one bundle per category of `categories` in app.py, with the curves only
+#     its limits read (from LimitDeps.py), and one with the curves read by
+#     more than one category,
+#   - bundles/manifest.json, naming the bundles and those each category needs.
+# The page fetches the manifest and the core bundle at start (in app.py, as
+# this module is in the core bundle); a category's bundles are fetched the
+# first time one of its limits is checked (Load).
+# Bundle names carry a hash of their contents, so browsers can cache them for
+# good. Categories and their methods are read from the source of app.py.
+#
+# The single assets.zip that app.py falls back to without bundles is built
+# from the same list of modules (Assets), so it can't miss one.
+#
+# Usage:
+#   python LimitBundles.py [out]          # writes out/bundles (default docs)
+#   python LimitBundles.py [out] --assets # writes out/assets.zip instead
+#
+#   Load(['Helioscopes'])                 # in the app, before drawing
+#==============================================================================#
+
+import os
+import io
+import re
+import sys
+import ast
+import json
+import hashlib
+import zipfile
+
+here = os.path.dirname(os.path.abspath(__file__))
+manifestfile = 'bundles.json'   # the manifest as saved by app.py, in the browser
+ZIP_TIME = (1980,1,1,0,0,0)     # fixed, so unchanged bundles keep their hash
+
+#==============================================================================#
+def Categories(app='app.py'):
+    # [(category, [(function name, shown by default)])] of app.py's categories
+    with open(os.path.join(here,app)) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node,ast.Assign) and [getattr(t,'id',None) for t in node.targets]==['categories']:
+            cats = []
+            for key,items in zip(node.value.keys,node.value.values):
+                found = []
+                for item in items.elts:
+                    entry = dict(zip([k.value for k in item.keys],item.values))
+                    fn = entry['fn']
+                    visible = isinstance(entry.get('visible'),ast.Constant) and bool(entry['visible'].value)
+                    found.append(('%s.%s' % (fn.value.id,fn.attr),visible))
+                cats.append((key.value,found))
+            return cats
+    return []
+
+def CodeFiles(entry='app.py'):
+    # The modules of this folder that entry imports, directly or not
+    found = []
+    todo = [entry]
+    while todo:
+        name = todo.pop()
+        with open(os.path.join(here,name)) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node,ast.Import):
+                mods = [a.name for a in node.names]
+            elif isinstance(node,ast.ImportFrom) and node.module and not node.level:
+                mods = [node.module]
+            else:
+                continue
+            for mod in mods:
+                fn = mod.split('.')[0]+'.py'
+                if (fn not in found) and (fn!=entry) and os.path.isfile(os.path.join(here,fn)):
+                    found.append(fn)
+                    todo.append(fn)
+    return sorted(found)
+
+def Slug(name):
+    return re.sub(r'[^a-z0-9]+','-',name.lower()).strip('-')
+
+def Zip(files):
+    # Deflated zip of files (paths relative to this folder), byte-identical
+    # for identical contents
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf,'w') as z:
+        for fn in files:
+            info = zipfile.ZipInfo(fn,ZIP_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644<<16
+            with open(os.path.join(here,fn),'rb') as f:
+                z.writestr(info,f.read(),compresslevel=9)
+    return buf.getvalue()
+#==============================================================================#
+
+
+#==============================================================================#
+def Plan(app='app.py'):
+    # {bundle: [files]} and {category: [bundles]}. Curves read by more than
+    # one category go in a 'shared' bundle, so no category has to fetch
+    # another's bundle for them.
+    from LimitDeps import SharedMap
+    deps = SharedMap()
+    cats = Categories(app)
+    default = [fn for cat,items in cats for fn,visible in items if visible]
+    bundles = {'core':CodeFiles(app)+deps.Files(default)}
+    files = {cat:deps.Files([fn for fn,visible in items]) for cat,items in cats}
+    count = {}
+    for cat in files:
+        for fn in files[cat]:
+            count[fn] = count.get(fn,0)+1
+    owner = {fn:'core' for fn in bundles['core']}
+    for cat in files:
+        for fn in files[cat]:
+            if fn not in owner:
+                owner[fn] = 'shared' if count[fn]>1 else Slug(cat)
+                bundles.setdefault(owner[fn],[]).append(fn)
+    needs = {cat:sorted({owner[fn] for fn in files[cat]}-{'core'}) for cat in files}
+    return bundles,needs
+
+def Build(out='docs',app='app.py'):
+    # Writes the bundles and their manifest to out/bundles. Returns the manifest.
+    bundles,needs = Plan(app)
+    outdir = os.path.join(out,'bundles')
+    os.makedirs(outdir,exist_ok=True)
+    manifest = {'bundles':{},'categories':needs}
+    for name,files in bundles.items():
+        data = Zip(files)
+        fn = '%s.%s.zip' % (name,hashlib.sha1(data).hexdigest()[:10])
+        if not os.path.exists(os.path.join(outdir,fn)):
+            tmp = os.path.join(outdir,fn+'.tmp')
+            with open(tmp,'wb') as f:
+                f.write(data)
+            os.replace(tmp,os.path.join(outdir,fn))
+        manifest['bundles'][name] = {'file':'bundles/'+fn,'size':len(data),'files':len(files)}
+    # bundles of earlier builds are no longer referenced
+    keep = {os.path.basename(b['file']) for b in manifest['bundles'].values()}
+    for fn in os.listdir(outdir):
+        if fn.endswith('.zip') and fn not in keep:
+            os.remove(os.path.join(outdir,fn))
+    with open(os.path.join(outdir,'manifest.json'),'w') as f:
+        json.dump(manifest,f,indent=1)
+    return manifest
+
+def Assets(out='docs',app='app.py'):
+    # Writes out/assets.zip: every module app.py imports and all of
+    # limit_data. Returns its size.
+    curves = sorted(os.path.relpath(os.path.join(d,fn),here)
+                    for d,_,fns in os.walk(os.path.join(here,'limit_data')) for fn in fns if fn.endswith('.txt'))
+    data = Zip(CodeFiles(app)+curves)
+    os.makedirs(out,exist_ok=True)
+    tmp = os.path.join(out,'assets.zip.tmp')
+    with open(tmp,'wb') as f:
+        f.write(data)
+    os.replace(tmp,os.path.join(out,'assets.zip'))
+    return len(data)
+#==============================================================================#
+
+
+#==============================================================================#
+# In the browser. Bundles are fetched with requests (patched by pyodide_http)
+# relative to the page, and unpacked into the working directory.
+Loaded = {'core'}
+
+def Fetch(path):
+    import requests
+    from js import window, URL
+    r = requests.get(URL.new(path,window.location.href).href)
+    r.raise_for_status()
+    return r.content
+
+def Unpack(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        z.extractall('.')
+
+def Load(categories):
+    # Fetches the bundles the categories need that aren't loaded yet. Does
+    # nothing outside the browser build, where every file is on disk.
+    if not os.path.exists(manifestfile):
+        return []
+    with open(manifestfile) as f:
+        manifest = json.load(f)
+    todo = []
+    for cat in categories:
+        todo += [b for b in manifest['categories'].get(cat,[]) if (b not in Loaded) and (b not in todo)]
+    for b in todo:
+        Unpack(Fetch('./'+manifest['bundles'][b]['file']))
+        Loaded.add(b)
+    return todo
+#==============================================================================#
+
+
+if __name__=='__main__':
+    args = [a for a in sys.argv[1:] if a!='--assets']
+    out = args[0] if args else 'docs'
+    if '--assets' in sys.argv:
+        print('%s/assets.zip %.1f kB' % (out,Assets(out)/1e3))
+        sys.exit()
+    manifest = Build(out)
+    whole = len(Zip(CodeFiles()+sorted(os.path.relpath(os.path.join(d,fn),here)
+                    for d,_,fns in os.walk(os.path.join(here,'limit_data')) for fn in fns if fn.endswith('.txt'))))
+    for name,b in manifest['bundles'].items():
+        print('%-24s %4d files %8.1f kB' % (b['file'],b['files'],b['size']/1e3))
+    core = manifest['bundles']['core']['size']
+    print('first paint %.1f kB (core), everything %.1f kB in one zip' % (core/1e3,whole/1e3))
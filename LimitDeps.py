@@ -0,0 +1,269 @@
+#=================================LimitDeps.py==================================#
+# Description:
+# Static map of the limit_data files each plotting function of PlotFuncs.py
+# reads, and of the PlotFuncs functions it calls, built from the syntax tree of
+# PlotFuncs.py without running anything. A path is any string expression in a
+# function that contains 'limit_data/': literals, concatenations and f-strings,
+# with names filled in from string defaults of the function's arguments and
+# string assignments in its body. Parts that can't be resolved become '*', and
+# the pattern stands for every file it matches.
+#
+# Every file is checked on disk; methods of classes whose data isn't shipped
+# (AxionElectron/, DarkPhoton/, fa/, ...) show up as missing files.
+#
+# Each function also gets a hash of its source, so that a build can tell which
+# functions changed. The map drives preloading (PlotFuncs.CurveFiles),
+# invalidation of the warm snapshot (WarmStart.py), the asset bundles of the
+# browser build (LimitBundles.py) and incremental rebuilds (LimitBuild.py).
+#
+# Usage:
+#   python LimitDeps.py                          # summary and missing files
+#   python LimitDeps.py AxionPhoton.Helioscopes  # files and calls of functions
+#   python LimitDeps.py --json deps.json         # the whole map as JSON
+#
+#   deps = SharedMap()
+#   deps.Files('AxionPhoton.Helioscopes')        # existing files, with callees'
+#   deps.Users('limit_data/AxionPhoton/CAST.txt')
+#==============================================================================#
+
+import os
+import sys
+import ast
+import glob
+import json
+import hashlib
+import itertools
+
+here = os.path.dirname(os.path.abspath(__file__))
+sourcefile = os.path.join(here,'PlotFuncs.py')
+DATA = 'limit_data/'
+WILD = '\0'     # stands for an unresolved part of a path while it is built
+
+#==============================================================================#
+def _strings(node,env):
+    # Possible values of a string expression, or None if node isn't one.
+    # Unresolved parts are WILD.
+    if isinstance(node,ast.Constant):
+        return [node.value] if isinstance(node.value,str) else None
+    if isinstance(node,ast.Name):
+        return env.get(node.id)
+    if isinstance(node,ast.BinOp) and isinstance(node.op,ast.Add):
+        left,right = _strings(node.left,env),_strings(node.right,env)
+        if (left is None) and (right is None):
+            return None
+        return [a+b for a,b in itertools.product(left or [WILD],right or [WILD])]
+    if isinstance(node,ast.JoinedStr):
+        parts = []
+        for v in node.values:
+            if isinstance(v,ast.FormattedValue):
+                parts.append(_strings(v.value,env) or [WILD])
+            else:
+                parts.append(_strings(v,env) or [WILD])
+        return [''.join(p) for p in itertools.product(*parts)]
+    if isinstance(node,ast.IfExp):
+        a,b = _strings(node.body,env),_strings(node.orelse,env)
+        if (a is None) and (b is None):
+            return None
+        return (a or [WILD])+(b or [WILD])
+    return None
+
+def _env(fn):
+    # {name: possible string values} from the argument defaults and the
+    # assignments in the body of fn
+    env = {}
+    args = fn.args
+    pos = args.posonlyargs+args.args
+    for arg,default in list(zip(pos[len(pos)-len(args.defaults):],args.defaults))+ \
+                       list(zip(args.kwonlyargs,args.kw_defaults)):
+        if default is not None:
+            values = _strings(default,env)
+            if values is not None:
+                env[arg.arg] = values
+    for node in ast.walk(fn):
+        if isinstance(node,ast.Assign) and len(node.targets)==1 and isinstance(node.targets[0],ast.Name):
+            values = _strings(node.value,env)
+            if values is not None:
+                env[node.targets[0].id] = env.get(node.targets[0].id,[])+values
+    return env
+
+def _paths(fn):
+    # Data paths (with WILD parts) written in fn
+    env = _env(fn)
+    found = []
+    def visit(node):
+        if isinstance(node,(ast.Constant,ast.BinOp,ast.JoinedStr,ast.IfExp)):
+            values = _strings(node,env)
+            if values is not None:
+                for v in values:
+                    if DATA in v:
+                        v = v[v.index(DATA):]
+                        if v not in found:
+                            found.append(v)
+                return
+        for child in ast.iter_child_nodes(node):
+            visit(child)
+    for stmt in fn.body:
+        visit(stmt)
+    return found
+
+def _calls(fn,functions,classes):
+    # Names of the PlotFuncs functions fn calls
+    calls = []
+    for node in ast.walk(fn):
+        if not isinstance(node,ast.Call):
+            continue
+        f = node.func
+        name = None
+        if isinstance(f,ast.Name) and f.id in functions:
+            name = f.id
+        elif isinstance(f,ast.Attribute) and isinstance(f.value,ast.Name) and \
+                ('%s.%s' % (f.value.id,f.attr)) in classes.get(f.value.id,()):
+            name = '%s.%s' % (f.value.id,f.attr)
+        if (name is not None) and (name not in calls):
+            calls.append(name)
+    return calls
+
+def _source(lines,node):
+    # Source lines of a statement, with its decorators
+    first = min([node.lineno]+[d.lineno for d in getattr(node,'decorator_list',[])])
+    return ''.join(lines[first-1:node.end_lineno])
+
+def _hash(s):
+    return hashlib.sha1(s.encode()).hexdigest()[:16]
+#==============================================================================#
+
+
+#==============================================================================#
+class DependencyMap():
+    def __init__(self,source=sourcefile,root=None):
+        self.source = source
+        self.root = here if root is None else root
+        self.stamp = os.stat(source).st_mtime_ns
+        with open(source) as f:
+            text = f.read()
+        tree = ast.parse(text,filename=source)
+        defs = {}
+        classes = {}
+        for node in tree.body:
+            if isinstance(node,(ast.FunctionDef,ast.AsyncFunctionDef)):
+                defs[node.name] = node
+            elif isinstance(node,ast.ClassDef):
+                for item in node.body:
+                    if isinstance(item,(ast.FunctionDef,ast.AsyncFunctionDef)):
+                        defs['%s.%s' % (node.name,item.name)] = item
+                classes[node.name] = {n for n in defs if n.startswith(node.name+'.')}
+        functions = {n for n in defs if '.' not in n}
+        # the statements outside functions and classes (imports, constants)
+        lines = text.splitlines(True)
+        self.module = _hash(''.join(_source(lines,node) for node in tree.body
+                                    if not isinstance(node,(ast.FunctionDef,ast.AsyncFunctionDef,ast.ClassDef))))
+        # name -> {'line', 'hash', 'files', 'missing', 'patterns', 'calls'}
+        self.nodes = {}
+        for name,fn in defs.items():
+            files,missing,patterns = [],[],[]
+            for p in _paths(fn):
+                if WILD in p:
+                    pattern = p.replace(WILD,'*')
+                    patterns.append(pattern)
+                    files += sorted(os.path.relpath(f,self.root)
+                                    for f in glob.glob(os.path.join(self.root,pattern)))
+                elif os.path.isfile(os.path.join(self.root,p)):
+                    files.append(p)
+                else:
+                    missing.append(p)
+            self.nodes[name] = {'line':fn.lineno,'hash':_hash(_source(lines,fn)),'files':files,'missing':missing,
+                                'patterns':patterns,'calls':_calls(fn,functions,classes)}
+        self.users = {}
+        for name in self.nodes:
+            for f in self.Files(name)+self.Files(name,missing=True):
+                self.users.setdefault(f,[]).append(name)
+
+    def Closure(self,names):
+        # names and every function they call, directly or not
+        seen = []
+        todo = [names] if isinstance(names,str) else list(names)
+        while todo:
+            name = todo.pop()
+            if (name in seen) or (name not in self.nodes):
+                continue
+            seen.append(name)
+            todo += self.nodes[name]['calls']
+        return seen
+
+    def Files(self,names,missing=False):
+        # Files read by names and their callees (the missing ones, if missing)
+        key = 'missing' if missing else 'files'
+        files = []
+        for name in self.Closure(names):
+            files += [f for f in self.nodes[name][key] if f not in files]
+        return files
+
+    def Users(self,filename):
+        # Functions that read filename (shipped or not), directly or through a
+        # callee
+        return list(self.users.get(os.path.normpath(filename),[]))
+
+    def Callers(self,names):
+        # Functions that call any of names, directly or not, and names
+        names = set(names)
+        return [n for n in self.nodes if names.intersection(self.Closure(n))]
+
+    def Methods(self,cls):
+        return [n for n in self.nodes if n.startswith(cls+'.')]
+
+    def ToJSON(self):
+        return {'source':os.path.relpath(self.source,self.root),'functions':self.nodes}
+#==============================================================================#
+
+
+#==============================================================================#
+# One map per process, rebuilt when PlotFuncs.py changes
+_shared = None
+
+def SharedMap():
+    global _shared
+    if (_shared is None) or (os.stat(sourcefile).st_mtime_ns!=_shared.stamp):
+        _shared = DependencyMap()
+    return _shared
+
+if __name__=='__main__':
+    deps = DependencyMap()
+    args = sys.argv[1:]
+    if args[:1]==['--json']:
+        out = args[1] if len(args)>1 else 'deps.json'
+        with open(out,'w') as f:
+            json.dump(deps.ToJSON(),f,indent=1)
+        print('written',out)
+    elif args:
+        for name in args:
+            if name not in deps.nodes:
+                print(name,': not a function of PlotFuncs.py')
+                continue
+            node = deps.nodes[name]
+            print('%s (line %d)' % (name,node['line']))
+            print('  calls   :',', '.join(node['calls']) or '-')
+            for f in deps.Files(name):
+                print('  file    :',f)
+            for f in deps.Files(name,missing=True):
+                print('  MISSING :',f)
+            for p in node['patterns']:
+                print('  pattern :',p)
+    else:
+        nodes = deps.nodes
+        reading = [n for n in nodes if deps.Files(n) or deps.Files(n,missing=True)]
+        files = {f for n in nodes for f in nodes[n]['files']}
+        missing = sorted({f for n in nodes for f in nodes[n]['missing']})
+        print('%d functions, %d read data (%d files found, %d missing)'
+              % (len(nodes),len(reading),len(files),len(missing)))
+        dirs = {}
+        for f in missing:
+            dirs.setdefault(os.path.dirname(f),[]).append(f)
+        for d,fs in sorted(dirs.items()):
+            users = [n for n,node in nodes.items() if set(node['missing'])&set(fs)]
+            print('  missing %3d files in %-28s used by %d functions' % (len(fs),d+'/',len(users)))
+        shipped = {os.path.relpath(f,here) for f in glob.glob(os.path.join(here,DATA,'**','*.txt'),recursive=True)}
+        unused = sorted(shipped-files)
+        print('%d shipped files no function refers to' % len(unused))
+        for f in unused[:20]:
+            print('  ',f)
+#==============================================================================#
@@ -0,0 +1,131 @@
+#===============================LimitExplorer.py===============================#
+# Description:
+# Interactive explorer for notebooks (ipympl). Panning or zooming a figure
+# with a few limits on it normally redraws every artist of every limit on
+# each mouse event. Here, when the view starts to move, the data area is
+# grabbed once with copy_from_bbox and the limits are hidden. Each event then
+# only redraws the frame, pastes the snapshot (moved and scaled to the new
+# window, nearest pixel, in log units) into the canvas buffer and blits, and the
+# full figure is drawn again once the view has been still for `settle` ms.
+# Areas panned into during a gesture stay blank until then, as do minor ticks.
+#
+# The mouse wheel zooms about the cursor, by `zoom_step` per notch.
+#
+# Usage (in a notebook):
+#   %matplotlib widget
+#   from LimitExplorer import Explorer
+#   ex = Explorer(['Haloscopes','LowMassAstroBounds'])
+#   ex.fig.canvas
+#==============================================================================#
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.ticker import NullLocator
+
+from PlotFuncs import FigSetup
+from LimitFigure import DrawLayer, clean_latex
+
+class Explorer():
+    def __init__(self,layers,cls='AxionPhoton',settle=250,zoom_step=1.25,
+                 ylab=r'$|g_{a\gamma}|$ [GeV$^{-1}$]',**kwargs):
+        # layers: method names of cls, or (method,kwargs) pairs
+        # kwargs go to FigSetup
+        self.settle = settle
+        self.zoom_step = zoom_step
+        with plt.rc_context({'text.usetex':False}):
+            self.fig,self.ax = FigSetup(ylab=ylab,**kwargs)
+        plt.rcParams['text.usetex'] = False
+        self.artists = []
+        for layer in layers:
+            method,kw = (layer,{}) if isinstance(layer,str) else layer
+            self.artists += DrawLayer(self.ax,cls,method,dict(kw)) or []
+        clean_latex(self.fig)
+
+        self.snapshot = None    # (pixels, log10 window, visibility of the limits, minor locators)
+        self.window = None      # the view the canvas was last fully drawn at
+        canvas = self.fig.canvas
+        self.timer = canvas.new_timer(interval=settle)
+        self.timer.single_shot = True
+        self.timer.add_callback(self.Settle)
+        self.ax.callbacks.connect('xlim_changed',self.Moved)
+        self.ax.callbacks.connect('ylim_changed',self.Moved)
+        canvas.mpl_connect('scroll_event',self.Scroll)
+        canvas.mpl_connect('draw_event',self.Drawn)
+
+    def Window(self):
+        return self.ax.get_xlim()+self.ax.get_ylim()
+
+    def Drawn(self,event):
+        # After a draw with the limits on: remember which view is on screen.
+        # During a gesture only the frame was drawn: paste the snapshot into it.
+        if self.snapshot is None:
+            self.window = self.Window()
+            return
+        self.Paste()
+        self.fig.canvas.blit(self.ax.bbox)
+
+    def Freeze(self):
+        # Grab the data area as last drawn and hide the limits
+        ax = self.ax
+        pixels = np.asarray(self.fig.canvas.copy_from_bbox(ax.bbox)).copy()
+        visible = [a.get_visible() for a in self.artists]
+        for a in self.artists:
+            a.set_visible(False)
+        # Minor ticks are most of what is left to draw; they come back with
+        # the limits
+        minor = (ax.xaxis.get_minor_locator(),ax.yaxis.get_minor_locator())
+        ax.xaxis.set_minor_locator(NullLocator())
+        ax.yaxis.set_minor_locator(NullLocator())
+        self.snapshot = (pixels,np.log10(self.window),visible,minor)
+
+    def Paste(self):
+        # Nearest-pixel copy of the snapshot into the canvas buffer, for the
+        # current window. A couple of pixels at the edges of both are spines.
+        pixels,(x0,x1,y0,y1) = self.snapshot[:2]
+        h,w = pixels.shape[:2]
+        buf = np.asarray(self.fig.canvas.buffer_rgba())
+        bb = self.ax.bbox
+        top = buf.shape[0]-bb.y1
+        cols = np.arange(int(np.ceil(bb.x0))+2,int(bb.x1)-2)
+        rows = np.arange(int(np.ceil(top))+2,int(top+bb.height)-2)
+        cx0,cx1,cy0,cy1 = np.log10(self.Window())
+        lx = cx0+(cols+0.5-bb.x0)/bb.width*(cx1-cx0)
+        ly = cy1-(rows+0.5-top)/bb.height*(cy1-cy0)
+        sc = np.floor((lx-x0)/(x1-x0)*w).astype(int)
+        sr = np.floor((y1-ly)/(y1-y0)*h).astype(int)
+        # sc and sr increase along the buffer, so the covered part is a box;
+        # pixels are moved whole as uint32
+        kc = np.flatnonzero((sc>=2)&(sc<w-2))
+        kr = np.flatnonzero((sr>=2)&(sr<h-2))
+        if len(kc) and len(kr):
+            src = pixels.view(np.uint32)[:,:,0]
+            dst = buf.view(np.uint32)[:,:,0]
+            dst[rows[kr[0]]:rows[kr[-1]]+1,cols[kc[0]]:cols[kc[-1]]+1] = \
+                src.take(sr[kr],axis=0).take(sc[kc],axis=1)
+
+    def Moved(self,ax):
+        if (self.snapshot is None) and (self.window is not None):
+            self.Freeze()
+        self.timer.stop()
+        self.timer.start()
+
+    def Settle(self):
+        # The view has stopped moving: back to the real artists
+        if self.snapshot is not None:
+            _,_,visible,minor = self.snapshot
+            self.snapshot = None
+            for a,v in zip(self.artists,visible):
+                a.set_visible(v)
+            self.ax.xaxis.set_minor_locator(minor[0])
+            self.ax.yaxis.set_minor_locator(minor[1])
+        self.fig.canvas.draw_idle()
+
+    def Scroll(self,event):
+        if event.inaxes is not self.ax:
+            return
+        f = self.zoom_step**(-event.step)
+        lx,ly = np.log10(event.xdata),np.log10(event.ydata)
+        x0,x1,y0,y1 = np.log10(self.Window())
+        self.ax.set_xlim(10**(lx+(x0-lx)*f),10**(lx+(x1-lx)*f))
+        self.ax.set_ylim(10**(ly+(y0-ly)*f),10**(ly+(y1-ly)*f))
+        self.fig.canvas.draw_idle()
@@ -0,0 +1,219 @@
+#================================LimitExport.py================================#
+# Description:
+# Figure downloads for the dashboard. Exports are rendered from the plot spec
+# (see LimitFigure.py) in a background process rather than from the live
+# figure, so saving a PDF never blocks the interactive session, and the bytes
+# are cached by (spec hash, format) so a repeated download is instant, and in
+# the artifact store (ArtifactStore.py) for every process.
+#
+# Formats: 'pdf','svg','png','eps', and 'zip', a bundle of the PDF, the spec
+# and one CSV per visible limit with the curves as drawn (clipped to the mass
+# window, in the coupling plane shown).
+#
+# Usage:
+#   queue = SharedQueue()                 # one per process, shared by sessions
+#   queue.submit(spec,'pdf')              # start rendering in the background
+#   data = await queue.fetch(spec,'pdf')  # bytes, from the app's event loop
+#   data = queue.result(spec,'pdf')       # bytes, blocking
+#==============================================================================#
+
+import io
+import sys
+import json
+import asyncio
+import zipfile
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+
+from LimitFigure import SpecHash
+from ArtifactStore import SharedStore, FigureKey
+
+#==============================================================================#
+def _init_worker():
+    import os
+    import matplotlib
+    matplotlib.use('Agg')
+    import PlotFuncs
+    from CurveStore import storefile
+    from WarmStart import snapfile, LoadSnapshot
+    if os.path.exists(storefile):
+        PlotFuncs.UseCurveStore(storefile)
+    if os.path.exists(snapfile):
+        LoadSnapshot(snapfile)
+
+def _layer_csv(name, artists, ax):
+    # Every line, fill outline and polygon of a layer as rows of
+    # (curve index, m_a, coupling), keeping only points inside the mass window
+    import matplotlib.lines, matplotlib.collections, matplotlib.patches
+    m_min, m_max = ax.get_xlim()
+    out = io.StringIO()
+    out.write('# %s\n' % name)
+    out.write('curve,m_a [eV],%s\n' % ax.get_ylabel())
+    i = 0
+    for art in artists:
+        if isinstance(art, matplotlib.lines.Line2D):
+            curves = [art.get_xydata()]
+        elif isinstance(art, matplotlib.collections.Collection):
+            curves = [p.vertices for p in art.get_paths()]
+        elif isinstance(art, matplotlib.patches.Polygon):
+            curves = [art.get_xy()]
+        else:
+            continue
+        for xy in curves:
+            xy = np.asarray(xy, dtype=float)
+            xy = xy[(xy[:, 0] >= m_min) & (xy[:, 0] <= m_max)]
+            if len(xy) == 0:
+                continue
+            np.savetxt(out, np.column_stack((np.full(len(xy), i), xy)), fmt=['%d', '%.6e', '%.6e'], delimiter=',')
+            i += 1
+    return out.getvalue()
+
+def ExportSpec(spec, fmt='pdf'):
+    # Draws spec and returns the exported file as bytes
+    import matplotlib.pyplot as plt
+    from LimitFigure import DrawSpec
+    fig, ax, layers = DrawSpec(spec)
+    # DrawSpec has already fitted the margins (FixedLayout), so the figure is
+    # saved as it is, without bbox_inches='tight' and its measuring draw.
+    # The figure's text is plain mathtext after clean_latex; the PS backend
+    # also checks the global usetex flag
+    try:
+        with plt.rc_context({'text.usetex': False}):
+            buf = io.BytesIO()
+            if fmt == 'zip':
+                fig.savefig(buf, format='pdf')
+                zbuf = io.BytesIO()
+                with zipfile.ZipFile(zbuf, 'w', zipfile.ZIP_DEFLATED) as z:
+                    z.writestr('AxionLimits.pdf', buf.getvalue())
+                    z.writestr('spec.json', json.dumps(spec, indent=1, default=repr))
+                    for name, artists in layers.items():
+                        fname = ''.join(c if c.isalnum() else '_' for c in name)
+                        z.writestr('curves/%s.csv' % fname, _layer_csv(name, artists, ax))
+                return zbuf.getvalue()
+            fig.savefig(buf, format=fmt, dpi=200)
+            return buf.getvalue()
+    finally:
+        plt.close(fig)
+#==============================================================================#
+
+
+#==============================================================================#
+class ExportQueue():
+    # One worker process: PlotFuncs draws through pyplot's global state, and
+    # exports are rare enough that a queue of one keeps up. Under pyodide there
+    # are no processes and exports are rendered inline.
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.jobs = {}
+        self.pool = None
+
+    def _executor(self):
+        if self.pool is None and sys.platform != 'emscripten':
+            ctx = multiprocessing.get_context('spawn')
+            self.pool = ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_init_worker)
+        return self.pool
+
+    def reset(self):
+        # Forget the cached exports and restart the worker, whose curve and
+        # code may be out of date (see LimitWatch.py)
+        self.cache.clear()
+        self.jobs.clear()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def _store(self, key, fut, stored=None):
+        if self.jobs.get(key) is not fut:
+            return  # started before a reset
+        del self.jobs[key]
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        SharedStore().put(stored, fut.result())
+        self.cache[key] = fut.result()
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def submit(self, spec, fmt='pdf'):
+        # Returns a Future of the exported bytes, starting a render if needed
+        key = (SpecHash(spec), fmt)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            fut = Future()
+            fut.set_result(self.cache[key])
+            return fut
+        if key in self.jobs:
+            return self.jobs[key]
+        # rendered before, by any process, from the same data and code
+        stored = FigureKey(spec, 'export', fmt=fmt)
+        data = SharedStore().get(stored)
+        if data is not None:
+            self.cache[key] = data
+            fut = Future()
+            fut.set_result(data)
+            return fut
+        pool = self._executor()
+        if pool is None:
+            fut = Future()
+            fut.set_result(ExportSpec(spec, fmt))
+        else:
+            fut = pool.submit(ExportSpec, spec, fmt)
+        self.jobs[key] = fut
+        fut.add_done_callback(lambda f: self._store(key, f, stored))
+        return fut
+
+    def result(self, spec, fmt='pdf'):
+        return self.submit(spec, fmt).result()
+
+    async def fetch(self, spec, fmt='pdf'):
+        return await asyncio.wrap_future(self.submit(spec, fmt))
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+# Panel runs app.py once per session; the queue (and its worker process and
+# cache) is kept at module level so that all sessions of a server share it.
+_shared = None
+
+def SharedQueue():
+    global _shared
+    if _shared is None:
+        _shared = ExportQueue()
+    return _shared
+#==============================================================================#
+
+
+#==============================================================================#
+# Size and write time of the PDF and SVG exports of the standard figures (every
+# AxionPhoton limit on each of the standard shapes), as drawn and with the
+# fills rasterised (PlotFuncs.RasterisedFills)
+def CompareStandard(raster_dpi=150, shapes=('Rectangular', 'Wide', 'Square')):
+    import matplotlib.pyplot as plt
+    from PlotFuncs import CompareExports
+    from LimitFigure import DrawSpec
+    from WarmStart import Layers
+    limits = [(name, 'AxionPhoton', name, {}) for name in Layers('AxionPhoton')]
+    print('%-12s %-4s %12s %9s %12s %9s' % ('shape', 'fmt', 'bytes', 'write [s]', 'compact', 'write [s]'))
+    for shape in shapes:
+        spec = {'shape': shape, 'xlim': (1e-12, 1e7), 'ylim': (1e-19, 1e-6), 'plane': 'g',
+                'ylab': r'$|g_{a\gamma}|$ [GeV$^{-1}$]', 'models': [], 'limits': limits}
+        fig, ax, layers = DrawSpec(spec)
+        with plt.rc_context({'text.usetex': False}):
+            for fmt, n0, t0, n1, t1 in CompareExports(fig, raster_dpi):
+                print('%-12s %-4s %12d %9.2f %12d %9.2f' % (shape, fmt, n0, t0, n1, t1))
+        plt.close(fig)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'compact':
+        import matplotlib
+        matplotlib.use('Agg')
+        CompareStandard(int(sys.argv[2]) if len(sys.argv) > 2 else 150)
+    else:
+        print('usage: python LimitExport.py compact [raster dpi]')
+        sys.exit(1)
+#==============================================================================#
@@ -0,0 +1,242 @@
+#================================LimitFigure.py================================#
+# Description:
+# Builds the dashboard figure from a plot spec: a plain, picklable dict with
+# everything the figure depends on, so the same figure can be redrawn in
+# another process (see LimitExport.py) and identified by a hash of its state.
+#
+#   spec = {'shape':'Rectangular','xlim':(1e-8,1e2),'ylim':(1e-16,1e-8),
+#           'plane':'g','ylab':r'$|g_{a\gamma}|$ [GeV$^{-1}$]',
+#           'models':[{'name':'KSVZ','C':(-1.92,-1.92),'color':'#1f77b4'}],
+#           'limits':[('Helioscopes','AxionPhoton','Helioscopes',{})]}
+#
+# Each entry of 'limits' is (layer name, plotting class, method, kwargs). An
+# optional 'legend', the names of every model that can be shown, keeps room
+# for all of them, so the axes don't move when models are toggled.
+#==============================================================================#
+
+import re
+import json
+import hashlib
+import logging
+import numpy as np
+import matplotlib
+import matplotlib.text
+import matplotlib.lines
+import matplotlib.collections
+import matplotlib.patches
+import matplotlib.pyplot as plt
+from matplotlib.path import Path
+
+import PlotFuncs
+from PlotFuncs import FigSetup, ApplyView, FixedLayout
+
+# QCD axion band: g = |alpha/(2pi) C m_a/K|, K = m_a f_a in eV^2/GeV
+alpha = 1/137.035999084
+K = 5.70e6
+pref = alpha/(2*np.pi)
+
+def g_agamma(m_eV, C):
+    return np.abs(pref * C * (m_eV / K))
+
+# Fills are drawn up to FILL_TOP so that their upper edge stays off-screen in
+# every coupling plane.
+FILL_TOP = 1e10
+
+log = logging.getLogger(__name__)
+
+def SpecHash(spec):
+    s = json.dumps(spec, sort_keys=True, default=repr)
+    return hashlib.sha1(s.encode()).hexdigest()[:16]
+
+#==============================================================================#
+# The C_ag plane is the g_ag plane with every point divided by 2e-10 m_a
+# (the 'C' view of PlotFuncs), so switching plane only rewrites the y-data of
+# the artists already on the axes.
+def artist_data(art):
+    if isinstance(art, matplotlib.lines.Line2D):
+        return art.get_xydata()
+    if isinstance(art, matplotlib.collections.Collection):
+        return [p.vertices for p in art.get_paths()]
+    if isinstance(art, matplotlib.patches.Polygon):
+        return art.get_xy()
+    if isinstance(art, matplotlib.text.Text):
+        return np.array([art.get_position()], dtype=float)
+    return None
+
+def set_artist_data(art, data):
+    if isinstance(art, matplotlib.lines.Line2D):
+        art.set_data(data[:, 0], data[:, 1])
+    elif isinstance(art, matplotlib.collections.PolyCollection):
+        art.set_verts_and_codes(data, [p.codes for p in art.get_paths()])
+    elif isinstance(art, matplotlib.collections.Collection):
+        art.set_paths([Path(v, p.codes) for v, p in zip(data, art.get_paths())])
+    elif isinstance(art, matplotlib.patches.Polygon):
+        art.set_xy(data)
+    elif isinstance(art, matplotlib.text.Text):
+        art.set_position(data[0])
+
+def show_plane(ax, view, cache):
+    # cache maps artist -> {view: data}; the g-plane data is captured the first
+    # time an artist is seen and every other view is computed from it once.
+    for art in ax.lines + ax.collections + ax.patches + ax.texts:
+        if art.get_transform() is not ax.transData:
+            continue
+        views = cache.get(art)
+        if views is None:
+            data = artist_data(art)
+            if data is None:
+                continue
+            views = cache[art] = {"g": data}
+        if view not in views:
+            g = views["g"]
+            views[view] = [ApplyView(v, view) for v in g] if isinstance(g, list) else ApplyView(g, view)
+        set_artist_data(art, views[view])
+
+def clean_latex(fig):
+    for text_obj in fig.findobj(matplotlib.text.Text):
+        s = text_obj.get_text()
+        text_obj.set_usetex(False)
+        if r"{\bf" in s:
+            s_clean = re.sub(r'\{\\bf\s+(.*?)\}', r'\1', s)
+            text_obj.set_text(s_clean)
+            text_obj.set_weight('bold')
+#==============================================================================#
+
+
+#==============================================================================#
+# Label culling
+# Combined layers put dozens of labels on the axes, most of them off-screen
+# once the view is zoomed in, and every draw still lays each one out (the
+# expensive part of a label) before clipping it away. The labels of a layer
+# are turned into ViewTexts, which skip drawing when they can't reach the
+# visible area. No glyph is wider than 1 em, so a label can't extend more
+# than (characters + 2) em from its anchor, and skipping it never changes the
+# picture. TextCounts counts the labels drawn and skipped.
+# The label layout (LimitLabels.py) hides a label by clearing `shown`.
+TextCounts = {'drawn': 0, 'culled': 0}
+
+class ViewText(matplotlib.text.Text):
+    shown = True
+
+    def draw(self, renderer):
+        if not (self.get_visible() and self.get_text()):
+            return
+        if not (self.shown and self.InView()):
+            TextCounts['culled'] += 1
+            return
+        TextCounts['drawn'] += 1
+        super().draw(renderer)
+
+    def InView(self):
+        fig = self.figure
+        box = self.get_clip_box() if self.get_clip_on() else None
+        if box is None:
+            box = fig.bbox
+        x, y = self._get_xy_display()
+        reach = (len(self.get_text())+2)*self.get_fontsize()*fig.dpi/72
+        return (box.x0-reach < x < box.x1+reach) and (box.y0-reach < y < box.y1+reach)
+
+def CullLabels(artists):
+    for art in artists:
+        if type(art) is matplotlib.text.Text:
+            art.__class__ = ViewText
+    return artists
+#==============================================================================#
+
+
+#==============================================================================#
+class LayerError(RuntimeError):
+    # A limit of the spec could not be drawn (see the log for why)
+    pass
+
+def DrawLayer(ax, cls, method, kw={}):
+    # Runs one plotting method on ax, keeping the axes limits, and returns the
+    # artists it added (with culled labels). If the method fails the error is
+    # logged, whatever it drew is taken off the axes and None is returned, so
+    # that a half-drawn layer is never cached.
+    fn = getattr(getattr(PlotFuncs, cls), method)
+    before = set(ax.get_children())
+    ox, oy = ax.get_xlim(), ax.get_ylim()
+    try:
+        try: fn(ax, **kw)
+        except TypeError: fn(ax=ax, **kw)
+        failed = False
+    except Exception:
+        log.exception('%s.%s failed', cls, method)
+        failed = True
+    ax.set_xlim(ox); ax.set_ylim(oy)
+    added = [a for a in ax.get_children() if a not in before]
+    if failed:
+        for a in added:
+            try: a.remove()
+            except (NotImplementedError, ValueError): pass
+        return None
+    return CullLabels(added)
+
+def DrawSpec(spec, cache=None):
+    # Draws the figure described by spec. Returns fig, ax and {layer: [artists]}.
+    # cache (if given) is filled with the g-plane data of every artist, for
+    # later calls to show_plane. Raises LayerError if a limit fails to draw,
+    # rather than returning (and having exports cache) a figure without it.
+    if cache is None:
+        cache = {}
+    fig, ax = FigSetup(Shape=spec['shape'], ylab=spec['ylab'], mathpazo=False)
+    xlims, ylims = spec['xlim'], spec['ylim']
+    ax.set_xlim(*xlims); ax.set_ylim(1e-30, FILL_TOP)
+    ax.set_xscale('log'); ax.set_yscale('log')
+    ax.set_xlabel(r"$m_a$ [eV]", fontsize=23)
+    ax.set_ylabel(spec['ylab'], fontsize=23)
+
+    m_grid = np.logspace(np.log10(xlims[0]), np.log10(xlims[1]), 500)
+    for m in spec['models']:
+        cmin, cmax = m["C"]
+        if np.isclose(cmin, cmax):
+            yy = g_agamma(m_grid, cmin)
+            ax.plot(m_grid, yy, lw=2, alpha=0.9, label=rf"{m['name']}", color=m["color"])
+        else:
+            y1 = g_agamma(m_grid, cmin); y2 = g_agamma(m_grid, cmax)
+            ylo, yhi = np.minimum(y1, y2), np.maximum(y1, y2)
+            ax.fill_between(m_grid, ylo, yhi, alpha=0.3, color=m["color"])
+            ax.plot(m_grid, np.sqrt(ylo*yhi), lw=1.5, alpha=0.9, label=rf"{m['name']}", color=m["color"])
+
+    # The layout only depends on the frame: labels of limits that end up
+    # outside the axes (e.g. after a plane change) don't move it, and its
+    # margins are measured once per frame (FixedLayout).
+    # The figure is drawn for one mass range, so only that part of each curve
+    # is loaded (the x-axis is the same in every plane).
+    layers = {}
+    with PlotFuncs.MassWindow(xlims):
+        for name, cls, method, kw in spec['limits']:
+            layers[name] = DrawLayer(ax, cls, method, kw)
+            if layers[name] is None:
+                plt.close(fig)
+                raise LayerError('%s.%s failed' % (cls, method))
+            for art in layers[name]:
+                art.set_in_layout(False)
+
+    if spec['plane'] != 'g':
+        show_plane(ax, spec['plane'], cache)
+    ax.set_ylim(*ylims)
+
+    legend = dict(loc='upper left', bbox_to_anchor=(1.02, 1), fontsize=15, frameon=False, title="Models")
+    if spec.get('legend'):
+        # Laid out with the legend of every model that can be shown, so that
+        # toggling one doesn't move the axes (and the limit layers drawn for
+        # them, see LimitLayers.py)
+        ax.legend([matplotlib.lines.Line2D([], [], lw=2) for _ in spec['legend']], spec['legend'], **legend)
+        clean_latex(fig)
+        FixedLayout(fig)
+        ax.get_legend().remove()
+        ax.legend(**legend)
+        clean_latex(fig)
+    else:
+        ax.legend(**legend)
+        clean_latex(fig)
+        FixedLayout(fig)
+
+    if layers:
+        from LimitLabels import SharedLayout, Apply
+        groups = [(name, ax, arts) for name, arts in layers.items()]
+        Apply(groups, SharedLayout().Layout(SpecHash(spec), groups))
+    return fig, ax, layers
+#==============================================================================#
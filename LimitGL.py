@@ -0,0 +1,211 @@
+#=================================LimitGL.py===================================#
+# Description:
+# Client-side rendering of the limits. Each plotting method is run once on an
+# off-screen matplotlib axes, and the lines, fills and labels it creates are
+# harvested and converted to float32 log10 coordinates. They are then handed to
+# a Bokeh plot with the WebGL backend, so the curves are sent to the browser
+# once (as binary float32 buffers) and zooming, panning and toggling layers
+# all happen client side. Matplotlib is still what makes publication figures.
+#
+# Display lists are captured in the g plane; other coupling views (e.g. C_ag)
+# are computed from them with PlotFuncs.ApplyView, as show_plane does for the
+# matplotlib figure.
+#
+# Usage (in a Panel/Bokeh app):
+#   p,renderers = GLFigure([('Helioscopes',AxionPhoton.Helioscopes,{})])
+#   checkbox.jslink(renderers['Helioscopes'][0],value='visible')   # per renderer
+#==============================================================================#
+
+import re
+import json
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_hex
+
+from ArtifactStore import SharedStore, DataKey
+
+# Fills and layer extents are captured over this window (log10 units)
+CAPTURE_LOGM = (-12.0,8.0)
+CAPTURE_LOGG = (-20.0,0.0)
+
+# Display lists from CaptureLayer, by (method, kwargs); see WarmStart.py
+CaptureCache = {}
+
+_dashes = {'-':'solid','solid':'solid','--':'dashed','dashed':'dashed',
+           ':':'dotted','dotted':'dotted','-.':'dashdot','dashdot':'dashdot'}
+_aligns = {'left':'left','center':'center','right':'right'}
+_baselines = {'top':'top','center':'middle','center_baseline':'middle',
+              'bottom':'bottom','baseline':'alphabetic'}
+
+def _log_nan(v):
+    # log10 in float32, with NaN for anything that can't go on a log axis
+    v = np.asarray(v,dtype=float)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        out = np.where(v>0,np.log10(v),np.nan)
+    return out.astype(np.float32)
+
+def _join(parts):
+    # Concatenate sub-paths with NaN breaks, which Bokeh's patch/line accept
+    if len(parts)==1:
+        return parts[0]
+    nan = np.array([np.nan],dtype=np.float32)
+    out = []
+    for i,p in enumerate(parts):
+        if i>0:
+            out.append(nan)
+        out.append(p)
+    return np.concatenate(out)
+
+def CleanLabel(s):
+    s = re.sub(r'\{\\bf\s+(.*?)\}',r'\1',s)
+    s = s.replace('$','').replace('\\','')
+    return s
+
+#==============================================================================#
+def CaptureLayer(fn,kwargs={}):
+    # Runs fn(ax,**kwargs) on a throw-away axes and returns its artists as a list
+    # of plain dicts: {'kind':'patch'|'line'|'text','x','y',...}
+    # (and keeps them in the artifact store, for every process)
+    key = (fn.__qualname__,json.dumps(kwargs,sort_keys=True,default=repr))
+    if key not in CaptureCache:
+        stored = DataKey('display',[key[0]],['LimitGL.py'],kwargs=key[1])
+        CaptureCache[key] = SharedStore().cached(stored,lambda:_capture(fn,kwargs))
+    return CaptureCache[key]
+
+def _capture(fn,kwargs):
+    rc = plt.rcParams['text.usetex']
+    plt.rcParams['text.usetex'] = False
+    fig = plt.figure(figsize=(16.5,11))
+    ax = fig.add_subplot(111)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    lims = (10.0**np.array(CAPTURE_LOGM),10.0**np.array(CAPTURE_LOGG))
+    ax.set_xlim(*lims[0])
+    ax.set_ylim(*lims[1])
+    plt.sca(ax)
+    try:
+        try:
+            fn(ax,**kwargs)
+        except TypeError:
+            fn(ax=ax,**kwargs)
+    finally:
+        plt.rcParams['text.usetex'] = rc
+
+    items = []
+    for art in ax.collections+ax.patches:
+        if art.get_transform() is not ax.transData:
+            continue
+        if isinstance(art,matplotlib.collections.Collection):
+            paths = art.get_paths()
+            fc = art.get_facecolor()
+            if len(paths)==0 or len(fc)==0:
+                continue
+            fc = fc[0]
+        else:
+            paths = [art.get_path()]
+            fc = art.get_facecolor()
+        if fc[3]==0:
+            continue
+        verts = [p.vertices for p in paths if len(p.vertices)>0]
+        items.append({'kind':'patch',
+                      'x':_join([_log_nan(v[:,0]) for v in verts]),
+                      'y':_join([_log_nan(v[:,1]) for v in verts]),
+                      'color':to_hex(fc[:3]),'alpha':float(fc[3]),
+                      'zorder':art.get_zorder()})
+    for art in ax.lines:
+        if art.get_transform() is not ax.transData:
+            continue
+        xy = art.get_xydata()
+        ls = art.get_linestyle()
+        if ls in ('None','none',' ',''):
+            continue
+        alpha = art.get_alpha()
+        items.append({'kind':'line','x':_log_nan(xy[:,0]),'y':_log_nan(xy[:,1]),
+                      'color':to_hex(art.get_color()),'alpha':1.0 if alpha is None else float(alpha),
+                      'lw':float(art.get_linewidth()),'dash':_dashes.get(ls,'solid'),
+                      'zorder':art.get_zorder()})
+    for art in ax.texts:
+        if art.get_transform() is not ax.transData or not art.get_visible():
+            continue
+        x,y = art.get_position()
+        alpha = art.get_alpha()
+        items.append({'kind':'text','x':_log_nan([x]),'y':_log_nan([y]),
+                      'text':CleanLabel(art.get_text()),'color':to_hex(art.get_color()),
+                      'alpha':1.0 if alpha is None else float(alpha),
+                      'size':float(art.get_fontsize()),'angle':float(art.get_rotation()),
+                      'align':_aligns.get(art.get_ha(),'left'),
+                      'baseline':_baselines.get(art.get_va(),'alphabetic'),
+                      'zorder':art.get_zorder()})
+    plt.close(fig)
+    items.sort(key=lambda it:it['zorder'])
+    return items
+
+def ViewXY(x,y,view='g'):
+    # log10 coordinates in the g plane, converted to a coupling view
+    if view=='g':
+        return x,y
+    from PlotFuncs import ApplyView
+    with np.errstate(over='ignore'):
+        dat = 10.0**np.column_stack([x,y]).astype(float)
+    dat = ApplyView(dat,view)
+    return _log_nan(dat[:,0]),_log_nan(dat[:,1])
+
+def InView(items,view='g'):
+    # Captured items moved to a coupling view
+    if view=='g':
+        return items
+    out = []
+    for it in items:
+        x,y = ViewXY(it['x'],it['y'],view)
+        out.append(dict(it,x=x,y=y))
+    return out
+
+def AddGlyphs(p,items):
+    # Adds the captured items to a Bokeh figure, returns the new renderers
+    from bokeh.models import ColumnDataSource
+    renderers = []
+    for it in items:
+        src = ColumnDataSource({'x':it['x'],'y':it['y']})
+        if it['kind']=='patch':
+            r = p.patch('x','y',source=src,fill_color=it['color'],fill_alpha=it['alpha'],line_width=0,line_alpha=0)
+        elif it['kind']=='line':
+            r = p.line('x','y',source=src,line_color=it['color'],line_alpha=it['alpha'],
+                       line_width=it['lw'],line_dash=it['dash'])
+        else:
+            src.data['text'] = [it['text']]
+            r = p.text('x','y',text='text',source=src,text_color=it['color'],text_alpha=it['alpha'],
+                       text_font_size='%dpx' % round(it['size']),text_font_style='bold',
+                       angle=it['angle'],angle_units='deg',text_align=it['align'],text_baseline=it['baseline'])
+        r.level = 'glyph'
+        renderers.append(r)
+    return renderers
+
+def GLFigure(layers,visible=None,m_range=(1e-8,1e2),g_range=(1e-16,1e-8),height=650,
+             xlab='m_a [eV]',ylab='|g_ag| [GeV^-1]',view='g'):
+    # layers: list of (name,fn,kwargs). visible: optional {name:bool}.
+    # g_range is in the units of view. Returns the Bokeh figure and
+    # {name:[renderers]}
+    from bokeh.plotting import figure
+    from bokeh.models import CustomJSTickFormatter,SingleIntervalTicker
+
+    p = figure(x_range=(np.log10(m_range[0]),np.log10(m_range[1])),
+               y_range=(np.log10(g_range[0]),np.log10(g_range[1])),
+               output_backend='webgl',height=height,sizing_mode='stretch_width',
+               tools='pan,wheel_zoom,box_zoom,reset,save',active_scroll='wheel_zoom')
+    fmt = CustomJSTickFormatter(code="return Number.isInteger(tick) ? '1e'+tick : ''")
+    for axis in (p.xaxis,p.yaxis):
+        axis.formatter = fmt
+        axis.ticker = SingleIntervalTicker(interval=1,num_minor_ticks=0)
+    p.xaxis.axis_label = xlab
+    p.yaxis.axis_label = ylab
+    p.grid.visible = False
+
+    renderers = {}
+    for name,fn,kwargs in layers:
+        renderers[name] = AddGlyphs(p,InView(CaptureLayer(fn,kwargs),view))
+        if visible is not None:
+            for r in renderers[name]:
+                r.visible = bool(visible.get(name,True))
+    return p,renderers
+#==============================================================================#
@@ -0,0 +1,233 @@
+#=================================LimitIngest.py=================================#
+# Description:
+# Canonical form of a limit curve, for new digitised limits before they go
+# into limit_data/, and for the curve pack (CurveStore.py). A curve file is
+#   - read with its delimiter detected (whitespace, ',' or ';'),
+#   - its '#' comment lines kept as metadata: title, references (URLs),
+#     column names, and anything else as notes,
+#   - put in canonical order: rows repeated one after the other dropped, a
+#     curve running from high to low mass turned around, and the points of a
+#     digitised line that fall behind by less than JITTER in log10 mass
+#     sorted in, with the order of rows at equal mass (vertical edges) kept,
+#   - classified: a 'line' (masses increase, after any caps) or a 'contour'
+#     (masses go back and forth, e.g. an island), closed if its last row
+#     repeats the first, with a cap at either end if that row only takes the
+#     curve straight up or down to a sentinel value (the `1e0` rows of many
+#     files, which close fills at the top of the plot).
+# Sentinel rows, duplicate masses and contours are kept as they are: they are
+# part of how a limit is drawn. Couplings digitised for a different local dark
+# matter density can be rescaled to RHO_DM once here, instead of in the
+# plotting function every time it draws.
+#
+# Usage:
+#   python LimitIngest.py new.txt limit_data/AxionPhoton/NEW.txt [--rho 0.3]
+#                         [--title ...] [--reference URL]
+#   python LimitIngest.py --check [files]   # what ingesting would change
+#
+#   dat,meta = ReadCurve(filename)
+#   dat,shape = Canonical(dat)
+#==============================================================================#
+
+import os
+import re
+import argparse
+import warnings
+import numpy as np
+
+datadir = 'limit_data/'
+DELIMITERS = [None,',',';']    # None: any whitespace
+JITTER = 0.005                 # how far behind (log10 mass) a point of a line is sorted in
+RHO_DM = 0.45                  # local dark matter density of the plots, GeV cm^-3
+URL = re.compile(r'(https?://\S+|arXiv:\s*\S+)')
+
+#==============================================================================#
+def Delimiter(lines):
+    # The delimiter that splits every data line into the same number (2 or
+    # more) of numbers, or None for whitespace
+    rows = [l.split('#')[0].strip() for l in lines]
+    rows = [r for r in rows if r]
+    for d in DELIMITERS:
+        counts = set()
+        try:
+            for r in rows:
+                fields = [float(v) for v in r.split(d)]
+                counts.add(len(fields))
+        except ValueError:
+            continue
+        if (len(counts)==1) and (counts.pop()>=2):
+            return d
+    return None
+
+def Metadata(lines):
+    # {'title','references','columns','notes'} from the comment lines
+    meta = {'title':None,'references':[],'columns':None,'notes':[]}
+    for l in lines:
+        s = l.strip()
+        if not s.startswith('#'):
+            continue
+        s = s.lstrip('#').strip()
+        if not s:
+            continue
+        refs = URL.findall(s)
+        if refs:
+            meta['references'] += refs
+            s = URL.sub('',s).strip(' ,;:()[]')
+            if not s:
+                continue
+        if (meta['columns'] is None) and re.search(r'\[[^\]]*\].*\[[^\]]*\]',s):
+            meta['columns'] = re.split(r'\s{2,}|\t',s)
+        elif meta['title'] is None:
+            meta['title'] = s
+        else:
+            meta['notes'].append(s)
+    return meta
+
+def ReadCurve(filename):
+    # (curve as float64 rows, metadata) of a curve file, parsed as numpy's
+    # loadtxt does with the detected delimiter
+    with open(filename,errors='replace') as f:
+        lines = f.read().splitlines()
+    delimiter = Delimiter([l for l in lines if not l.lstrip().startswith('#')])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        dat = np.loadtxt(filename,delimiter=delimiter,ndmin=2)
+    meta = Metadata(lines)
+    meta['delimiter'] = delimiter
+    return np.ascontiguousarray(dat,dtype=np.float64),meta
+#==============================================================================#
+
+
+#==============================================================================#
+def _repeats(dat):
+    # Rows equal to the one before
+    same = np.zeros(len(dat),dtype=bool)
+    same[1:] = np.all(dat[1:]==dat[:-1],axis=1)
+    return same
+
+def _caps(dat):
+    # (first, last): whether the first/last row is a sentinel cap, a vertical
+    # step from its neighbour to the highest or lowest value of the curve
+    if len(dat)<4:
+        return False,False
+    g = dat[:,1]
+    def cap(i,j):
+        return (dat[i,0]==dat[j,0]) and (g[i]!=g[j]) and ((g[i]>=g.max()) or (g[i]<=g.min()))
+    return cap(0,1),cap(-1,-2)
+
+def Geometry(dat):
+    # {'kind': 'line'|'contour', 'closed', 'caps': [first, last], 'sorted'}
+    if (dat.ndim!=2) or (dat.shape[1]<2) or (len(dat)<2):
+        return {'kind':'line','closed':False,'caps':[False,False],'sorted':False}
+    closed = (len(dat)>3) and bool(np.all(dat[0]==dat[-1]))
+    first,last = (False,False) if closed else _caps(dat)
+    core = dat[int(first):len(dat)-int(last),0]
+    steps = np.diff(core)
+    kind = 'line' if (not closed) and np.all(steps>=0) else 'contour'
+    return {'kind':kind,'closed':closed,'caps':[bool(first),bool(last)],'sorted':bool(np.all(np.diff(dat[:,0])>=0))}
+
+def Canonical(dat):
+    # (curve in canonical order, its Geometry), see the description
+    dat = dat[np.all(np.isfinite(dat),axis=1)]
+    dat = dat[~_repeats(dat)]
+    shape = Geometry(dat)
+    if (shape['kind']=='contour') and (not shape['closed']) and np.all(dat[:,0]>0):
+        first,last = shape['caps']
+        i0,i1 = int(first),len(dat)-int(last)
+        logm = np.log10(dat[i0:i1,0])
+        steps = np.diff(logm)
+        if np.all(steps<=0):
+            dat = dat[::-1].copy()      # high to low mass
+        elif np.all(np.maximum.accumulate(logm)-logm<JITTER):
+            order = np.argsort(logm,kind='stable')
+            dat = np.concatenate([dat[:i0],dat[i0:i1][order],dat[i1:]])
+        dat = dat[~_repeats(dat)]
+        shape = Geometry(dat)
+    return dat,shape
+
+def Changes(dat,canon):
+    # What Canonical changed, in words
+    if (dat.shape==canon.shape) and np.all(dat==canon):
+        return []
+    changes = []
+    if len(canon)<len(dat):
+        changes.append('%d repeated rows dropped' % (len(dat)-len(canon)))
+    if (len(canon)==len(dat)) and np.all(dat[::-1]==canon):
+        changes.append('turned around')
+    elif len(canon)==len(dat):
+        changes.append('%d rows reordered' % np.sum(np.any(dat!=canon,axis=1)))
+    return changes
+#==============================================================================#
+
+
+#==============================================================================#
+def _number(x):
+    return repr(float(x))
+
+def WriteCurve(filename,dat,meta):
+    # Writes a curve in the canonical text form: comment header, then one
+    # tab-separated row per point. Written atomically.
+    lines = []
+    if meta.get('title'):
+        lines.append('# '+meta['title'])
+    lines += ['# '+r for r in meta.get('references',[])]
+    lines += ['# '+n for n in meta.get('notes',[])]
+    lines.append('# '+'\t'.join(meta.get('columns') or ['m_a [eV]','g [GeV^-1]']))
+    lines += ['\t'.join(_number(x) for x in row) for row in dat]
+    os.makedirs(os.path.dirname(filename) or '.',exist_ok=True)
+    tmp = filename+'.%d.tmp' % os.getpid()
+    with open(tmp,'w') as f:
+        f.write('\n'.join(lines)+'\n')
+    os.replace(tmp,filename)
+
+def Ingest(source,target,rho=None,title=None,references=()):
+    # Reads a digitised curve, puts it in canonical form and writes it to
+    # target. rho: local DM density (GeV cm^-3) the couplings were given
+    # for, rescaled to RHO_DM. Returns (curve, metadata, geometry, changes).
+    dat,meta = ReadCurve(source)
+    canon,shape = Canonical(dat)
+    changes = Changes(dat,canon)
+    if meta['delimiter'] is not None:
+        changes.append('delimiter %r' % meta['delimiter'])
+    if rho is not None:
+        canon[:,1] *= np.sqrt(rho/RHO_DM)
+        meta['notes'].append('couplings rescaled from rho_DM = %g to %g GeV cm^-3' % (rho,RHO_DM))
+        changes.append('rescaled to rho_DM = %g' % RHO_DM)
+    if title:
+        meta['title'] = title
+    meta['references'] += [r for r in references if r not in meta['references']]
+    WriteCurve(target,canon,meta)
+    return canon,meta,shape,changes
+#==============================================================================#
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Put a digitised limit curve in canonical form')
+    parser.add_argument('files',nargs='*')
+    parser.add_argument('--check',action='store_true',help='only report what ingesting the files (default: all of limit_data) would change')
+    parser.add_argument('--rho',type=float,help='local DM density (GeV cm^-3) the couplings are given for')
+    parser.add_argument('--title')
+    parser.add_argument('--reference',action='append',default=[])
+    args = parser.parse_args()
+    if args.check:
+        files = args.files or sorted(os.path.join(d,fn) for d,_,fns in os.walk(datadir) for fn in fns if fn.endswith('.txt'))
+        count = 0
+        for fn in files:
+            try:
+                dat,meta = ReadCurve(fn)
+            except ValueError as e:
+                print('%-56s unreadable: %s' % (fn,e))
+                continue
+            canon,shape = Canonical(dat)
+            changes = Changes(dat,canon)+(['delimiter %r' % meta['delimiter']] if meta['delimiter'] else [])
+            if changes:
+                count += 1
+                print('%-56s %-8s %s' % (fn,shape['kind'],', '.join(changes)))
+        print('%d of %d files not in canonical form' % (count,len(files)))
+    elif len(args.files)==2:
+        dat,meta,shape,changes = Ingest(args.files[0],args.files[1],args.rho,args.title,args.reference)
+        print('%s: %d rows, %s%s%s' % (args.files[1],len(dat),'closed ' if shape['closed'] else '',shape['kind'],
+              ''.join(', cap at the '+end for end,c in zip(['start','end'],shape['caps']) if c)))
+        for c in changes:
+            print('  '+c)
+    else:
+        parser.error('give a curve and where to write it, or --check')
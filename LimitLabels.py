@@ -0,0 +1,196 @@
+#================================LimitLabels.py================================#
+# Description:
+# Label layout for zoomed views. The label positions in PlotFuncs are tuned
+# for the default axes limits, so in a zoomed view labels end up half off the
+# axes or on top of each other. Layout() goes through the labels of the
+# visible limits, biggest first, and
+#   - keeps a label where it is if it is inside the axes and doesn't overlap
+#     a label of another limit already placed (the labels of one limit were
+#     arranged together, so they are allowed to touch),
+#   - otherwise moves it to the free spot nearest to where it was, clear of
+#     every label and inside the filled region it labels (the fill of its
+#     layer that contains it), if enough of that region is on screen,
+#   - otherwise hides it, if it overlaps another label or the edge of the axes.
+# Labels placed so far are kept in a grid of cells, so each test only looks
+# at the boxes nearby. Layouts are memoised per (viewport, visible layers):
+# going back to a view reuses its layout.
+#
+# Usage:
+#   groups = [(name,ax,artists),...]     # e.g. DrawSpec's layers
+#   Apply(groups,SharedLayout().Layout(key,groups))
+#==============================================================================#
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import matplotlib.collections
+import matplotlib.patches
+
+from LimitFigure import ViewText
+
+PAD = 2          # px kept free around each label
+CELL = 64        # px, side of the cells of the occupancy grid
+MAX_SPOTS = 20000
+
+#==============================================================================#
+class BoxGrid():
+    # Occupied boxes (x0,y0,x1,y1,owner) in display space, bucketed by grid
+    # cell. Boxes of the same owner don't count as hits.
+    def __init__(self,cell=CELL):
+        self.cell = cell
+        self.cells = {}
+
+    def _cells(self,box):
+        c = self.cell
+        return [(i,j) for i in range(int(box[0]//c),int(box[2]//c)+1)
+                      for j in range(int(box[1]//c),int(box[3]//c)+1)]
+
+    def Add(self,box):
+        for k in self._cells(box):
+            self.cells.setdefault(k,[]).append(box)
+
+    def Near(self,box,owner):
+        # Every box of another owner sharing a cell with box, as an (n,4) array
+        found = {b[:4] for k in self._cells(box) for b in self.cells.get(k,()) if b[4]!=owner}
+        return np.array(sorted(found),dtype=float).reshape(-1,4)
+
+    def Hits(self,box,owner):
+        b = self.Near(box,owner)
+        return bool(np.any((box[0]<b[:,2])&(b[:,0]<box[2])&(box[1]<b[:,3])&(b[:,1]<box[3])))
+#==============================================================================#
+
+
+#==============================================================================#
+def _fills(ax,artists):
+    # The filled regions of a layer as display-space paths
+    paths = []
+    for art in artists:
+        if isinstance(art,matplotlib.collections.PolyCollection):
+            t = art.get_transform()
+            paths += [t.transform_path(p) for p in art.get_paths()]
+        elif isinstance(art,matplotlib.patches.Polygon) and art.get_fill():
+            paths.append(art.get_transform().transform_path(art.get_path()))
+    return paths
+
+def _inside(box,view):
+    return (box[0]>=view[0]) and (box[1]>=view[1]) and (box[2]<=view[2]) and (box[3]<=view[3])
+
+def Spot(box,region,view,grid,owner):
+    # Lower left corner of the free spot nearest box, inside region and view,
+    # or None. Spots are tried on a grid of half the label's smaller side.
+    w,h = box[2]-box[0],box[3]-box[1]
+    ext = region.get_extents()
+    x0,x1 = max(view[0],ext.x0),min(view[2],ext.x1)-w
+    y0,y1 = max(view[1],ext.y0),min(view[3],ext.y1)-h
+    if (x1<x0) or (y1<y0):
+        return None
+    step = max(min(w,h)/2,3)
+    step = max(step,np.sqrt((x1-x0+step)*(y1-y0+step)/MAX_SPOTS))
+    X,Y = np.meshgrid(np.arange(x0,x1+1e-9,step),np.arange(y0,y1+1e-9,step))
+    X,Y = X.ravel(),Y.ravel()
+    # corners and centre of each spot inside the region
+    pts = np.concatenate([np.c_[X,Y],np.c_[X+w,Y],np.c_[X,Y+h],np.c_[X+w,Y+h],np.c_[X+w/2,Y+h/2]])
+    ok = region.contains_points(pts).reshape(5,-1).all(axis=0)
+    b = grid.Near((x0,y0,x1+w,y1+h),owner)
+    if len(b):
+        hit = ((X[:,None]<b[:,2])&(b[:,0]<X[:,None]+w)&(Y[:,None]<b[:,3])&(b[:,1]<Y[:,None]+h)).any(axis=1)
+        ok &= ~hit
+    if not ok.any():
+        return None
+    d = (X-box[0])**2+(Y-box[1])**2
+    i = np.flatnonzero(ok)[np.argmin(d[ok])]
+    return X[i],Y[i]
+
+def Labels(groups):
+    # [(key,ax,text)] of the labels a layout can move: ViewTexts anchored in
+    # data coordinates and clipped to the axes, biggest first
+    found = []
+    for name,ax,artists in groups:
+        texts = [a for a in artists if isinstance(a,ViewText)]
+        for i,t in enumerate(texts):
+            if t.get_visible() and t.get_text() and t.get_clip_on() and (t.get_transform() is ax.transData):
+                found.append(((name,i),ax,t))
+    found.sort(key=lambda l:-l[2].get_fontsize())
+    return found
+
+def Place(groups):
+    # {(layer name, label index): None to keep, 'hide', or a new (x,y) in data
+    # coordinates}, for labels at the positions they were drawn at
+    placed = {}
+    grid = BoxGrid()
+    fills = {}
+    for key,ax,t in Labels(groups):
+        t.shown = True
+        renderer = ax.figure.canvas.get_renderer()
+        e = t.get_window_extent(renderer)
+        box = (e.x0-PAD,e.y0-PAD,e.x1+PAD,e.y1+PAD)
+        view = tuple(ax.bbox.extents)
+        onscreen = (box[0]<view[2]) and (view[0]<box[2]) and (box[1]<view[3]) and (view[1]<box[3])
+        name = key[0]
+        if _inside(box,view) and not grid.Hits(box,name):
+            placed[key] = None
+            grid.Add(box+(name,))
+            continue
+        if name not in fills:
+            fills[name] = _fills(ax,next(g[2] for g in groups if g[0]==name))
+        centre = ((e.x0+e.x1)/2,(e.y0+e.y1)/2)
+        region = next((p for p in fills[name] if p.contains_point(centre)),None)
+        # a moved label keeps clear of every other label
+        spot = None if region is None else Spot(box,region,view,grid,None)
+        if spot is not None:
+            x,y = t._get_xy_display()
+            anchor = (x+spot[0]-box[0],y+spot[1]-box[1])
+            placed[key] = tuple(ax.transData.inverted().transform(anchor))
+            grid.Add((spot[0],spot[1],spot[0]+box[2]-box[0],spot[1]+box[3]-box[1],name))
+        elif onscreen:
+            placed[key] = 'hide'
+        else:
+            placed[key] = None
+    return placed
+
+def Apply(groups,placed):
+    for name,ax,artists in groups:
+        texts = [a for a in artists if isinstance(a,ViewText)]
+        for i,t in enumerate(texts):
+            where = placed.get((name,i))
+            t.shown = (where!='hide')
+            if isinstance(where,tuple):
+                t.set_position(where)
+#==============================================================================#
+
+
+#==============================================================================#
+class LabelLayout():
+    def __init__(self,maxsize=64):
+        self.maxsize = maxsize
+        self.layouts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def Cached(self,key):
+        with self.lock:
+            if key in self.layouts:
+                self.layouts.move_to_end(key)
+                return self.layouts[key]
+        return None
+
+    def Layout(self,key,groups):
+        # key identifies the viewport and the visible layers; the labels of
+        # groups must be at their own positions when a layout is computed
+        placed = self.Cached(key)
+        if placed is None:
+            placed = Place(groups)
+            with self.lock:
+                self.layouts[key] = placed
+                while len(self.layouts)>self.maxsize:
+                    self.layouts.popitem(last=False)
+        return placed
+
+# One layout cache per process, shared by all sessions
+_shared = None
+
+def SharedLayout():
+    global _shared
+    if _shared is None:
+        _shared = LabelLayout()
+    return _shared
+#==============================================================================#
@@ -0,0 +1,609 @@
+#================================LimitLayers.py================================#
+# Description:
+# Layered rendering of the dashboard figure. The figure is split into
+#   - the frame: DrawSpec with no limits (axes, ticks, labels, models, legend),
+#     rendered twice, once for the opaque background and once for everything
+#     in front of it,
+#   - one transparent layer per limit.
+# Each piece is rasterised once per viewport (window, plane, layout) into an
+# RGBA buffer and cached, and the image is their alpha composite:
+# background, limits in order, frame. Toggling a limit then only draws that
+# limit, and going back to an earlier state draws nothing.
+#
+# A limit's artists are drawn once, on its own figure, and reused for every
+# viewport: only the axes position and limits, and (for the C_ag plane) the
+# y-data change, as in LimitTiles.py and show_plane.
+#
+# A layer is drawn inside a mass window a decade or more wider than the view
+# (LayerWindow), so it only loads the part of each curve near the view, and
+# its figure is reused while the view stays inside that window.
+#
+# Labels are laid out across all visible limits at once (LimitLabels.py), and
+# a layer's buffer is kept per placement of its own labels.
+#
+# The same figures give the SVG version of the image: each piece is saved as
+# SVG once per viewport and the document is their fragments in drawing order.
+#
+# Usage:
+#   rgba = SharedRenderer().Render(spec)      # spec as in LimitFigure.py
+#   png = ImageBytes(SharedRenderer(ViewportDPI(width)).Render(spec,buffer))
+#   fmt,data = SharedRenderer().Encoded(spec,accept)
+#==============================================================================#
+
+import io
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from PIL import Image
+
+import PlotFuncs
+from LimitFigure import DrawSpec, DrawLayer, SpecHash, show_plane, clean_latex, FILL_TOP, TextCounts, ViewText
+from LimitLabels import LabelLayout, Place, Apply
+from ArtifactStore import SharedStore, FigureKey
+
+#==============================================================================#
+def _rgba(fig):
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+def _crop(rgba):
+    # (y0,x0,pixels) of the smallest box holding every non-transparent pixel
+    a = rgba[:,:,3]
+    rows = np.flatnonzero(a.any(axis=1))
+    if len(rows)==0:
+        return None
+    cols = np.flatnonzero(a.any(axis=0))
+    y0,y1,x0,x1 = rows[0],rows[-1]+1,cols[0],cols[-1]+1
+    return y0,x0,rgba[y0:y1,x0:x1]
+
+def Rasterise(fig,artists):
+    # One sprite per zorder of the artists, [(zorder,sprite)], each
+    # drawn with every other artist hidden. Matplotlib draws by zorder, so
+    # stacking these groups in zorder reproduces a single draw.
+    vis = {a:a.get_visible() for a in artists}
+    groups = []
+    try:
+        with plt.rc_context({'text.usetex':False}):
+            for z in sorted(set(a.get_zorder() for a in artists if vis[a])):
+                for a in artists:
+                    a.set_visible(vis[a] and a.get_zorder()==z)
+                rgba = _rgba(fig)
+                crop = _crop(rgba)
+                if crop is not None:
+                    groups.append((z,Sprite(crop,rgba.shape[1])))
+    finally:
+        for a,v in vis.items():
+            a.set_visible(v)
+    return groups
+
+def Sprite(crop,width):
+    # A cropped buffer ready for compositing into an image of the given width.
+    # Mostly transparent ones (ticks, outlines, labels) keep only their
+    # visible pixels, as flat indices into the image.
+    y0,x0,px = crop
+    a = px[:,:,3]
+    if np.count_nonzero(a)>a.size//4:
+        return ('box',y0,x0,px)
+    rows,cols = np.nonzero(a)
+    return ('pixels',(rows+y0)*width+cols+x0,px[rows,cols,:3],a[rows,cols])
+
+def Over(dst,sprite):
+    # Composites a straight-alpha sprite over the opaque float RGB image dst
+    # (0-255) in place
+    if sprite[0]=='box':
+        _,y0,x0,px = sprite
+        h,w = px.shape[:2]
+        d = dst[y0:y0+h,x0:x0+w]
+        a = px[:,:,3:4]*np.float32(1/255)
+        d *= 1-a
+        d += px[:,:,:3]*a
+    else:
+        _,idx,rgb,alpha = sprite
+        flat = dst.reshape(-1,3)
+        a = alpha[:,None]*np.float32(1/255)
+        flat[idx] = flat[idx]*(1-a)+rgb*a
+
+SVG = '{http://www.w3.org/2000/svg}'
+ET.register_namespace('','http://www.w3.org/2000/svg')
+ET.register_namespace('xlink','http://www.w3.org/1999/xlink')
+
+def Vectorise(fig,artists,background=()):
+    # The SVG counterpart of Rasterise, from a single SVG save of fig: one
+    # fragment per artist that draws anything, [(zorder,fragment)], and the
+    # document-level definitions they refer to (clip paths, hatches, style).
+    # background: patches hidden for Rasterise, shown here below everything.
+    front = [(a,a.get_zorder()) for a in artists]+[(a,-np.inf) for a in background]
+    gids = {}
+    saved = [(a,a.get_gid(),a.get_visible()) for a,_ in front]
+    try:
+        for i,(a,z) in enumerate(front):
+            a.set_gid('piece%d' % i)
+            gids['piece%d' % i] = z
+        for a in background:
+            a.set_visible(True)
+        buf = io.BytesIO()
+        with plt.rc_context({'text.usetex':False,'svg.fonttype':'path'}):
+            fig.savefig(buf,format='svg')
+    finally:
+        for a,gid,v in saved:
+            a.set_gid(gid)
+            a.set_visible(v)
+    root = ET.fromstring(buf.getvalue())
+    found = []
+    def walk(el):
+        for child in el:
+            if child.get('id') in gids:
+                found.append((gids[child.attrib.pop('id')],ET.tostring(child,encoding='unicode')))
+            else:
+                walk(child)
+    walk(root)
+    defs = [ET.tostring(d,encoding='unicode') for el in root if el.tag==SVG+'defs' for d in el]
+    return found,defs
+
+def SvgDocument(w,h,defs,fragments):
+    # One SVG document, w x h inches, from the fragments of figures of that
+    # size (drawn in the order given); identical definitions are kept once
+    return ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'width="%gpt" height="%gpt" viewBox="0 0 %g %g" version="1.1">'
+            % (72*w,72*h,72*w,72*h)
+            +'<defs>'+''.join(dict.fromkeys(defs))+'</defs>'
+            +''.join(fragments)+'</svg>').encode()
+
+def InView(art,bbox):
+    # Whether art draws anything inside bbox (display space)
+    if not art.get_visible():
+        return False
+    if isinstance(art,ViewText):
+        return art.shown and art.InView()
+    try:
+        return art.get_window_extent().overlaps(bbox)
+    except Exception:
+        return True
+
+# Encoder settings for the dashboard's frames: PNG at zlib level 1 is ~20%
+# bigger than at the default level 6 but encodes ~25% faster. WebP is
+# lossless; at method 1 and effort 25 it is less than half the size of the
+# PNG for ~50% more encoding time (see `python LimitLayers.py bench`).
+PNG_LEVEL = 1
+WEBP_METHOD = 1
+WEBP_EFFORT = 25
+
+def ImageBytes(rgba,fmt='png',level=PNG_LEVEL,method=WEBP_METHOD,effort=WEBP_EFFORT):
+    # Encodes an opaque RGBA image ('png', 'webp' or 'avif'). PIL reads the
+    # array in place; only the alpha channel is dropped before encoding.
+    h,w = rgba.shape[:2]
+    im = Image.frombuffer('RGBA',(w,h),rgba,'raw','RGBA',0,1).convert('RGB')
+    buf = io.BytesIO()
+    if fmt=='webp':
+        im.save(buf,format='webp',lossless=True,method=method,quality=effort)
+    elif fmt=='avif':
+        im.save(buf,format='avif',quality=100,speed=10)
+    else:
+        im.save(buf,format='png',compress_level=level)
+    return buf.getvalue()
+
+# Format negotiation: a figure with few limit artists in view is sent as SVG,
+# which is then small, and sharp at any size; otherwise as lossless WebP if
+# the browser takes it (its Accept header lists image/webp), else as PNG.
+# The SVG is put together from the same cached figures as the image (Svg),
+# so a new view costs about as much to make in either format.
+SVG_MAX_ARTISTS = 12
+
+def Negotiate(accept,artists):
+    if artists<=SVG_MAX_ARTISTS:
+        return 'svg'
+    if 'image/webp' in accept:
+        return 'webp'
+    return 'png'
+
+class FrameBuffer():
+    # A session's output image, reused from one Render to the next: the float
+    # composite and the RGBA bytes. The image returned by Render is only
+    # valid until the next Render into the same buffer.
+    def __init__(self):
+        self.out = None
+        self.rgba = None
+
+    def Get(self,shape):
+        if (self.out is None) or (self.out.shape!=shape):
+            self.out = np.empty(shape,dtype=np.float32)
+            self.rgba = np.empty(shape[:2]+(4,),dtype=np.uint8)
+            self.rgba[:,:,3] = 255
+        return self.out,self.rgba
+#==============================================================================#
+
+
+#==============================================================================#
+# Layer figures are drawn inside PlotFuncs.MassWindow(LayerWindow(xlim)): the
+# view's mass range widened by LAYER_MARGIN decades either side and rounded
+# out to whole decades, so that panning and zooming within it reuse them.
+LAYER_MARGIN = 1
+
+def LayerWindow(xlim,margin=LAYER_MARGIN):
+    lo,hi = np.log10(min(xlim)),np.log10(max(xlim))
+    return (10.0**np.floor(lo-margin),10.0**np.ceil(hi+margin))
+
+class LayerRenderer():
+    def __init__(self,dpi=100,maxsize=128,maxfigures=64,maxframes=4):
+        self.dpi = dpi
+        self.maxsize = maxsize
+        self.maxfigures = maxfigures
+        self.maxframes = maxframes
+        self.frames = OrderedDict()   # frame hash -> (background, groups, layout)
+        self.buffers = OrderedDict()  # (layout, plane, layer, labels) -> sprites
+        self.vectors = OrderedDict()  # as buffers -> (SVG fragments, definitions)
+        self.counts = OrderedDict()   # as buffers -> limit artists in view
+        self.images = OrderedDict()   # (spec hash, format) -> encoded figure
+        self.figures = OrderedDict()  # (layer, window) -> (fig, ax, artists, plane cache)
+        self.framefigs = OrderedDict() # frame hash -> (fig, ax, front, layout, SVG or None)
+        self.texts = (0,0)            # labels drawn and culled by the last Render
+        self.labels = LabelLayout()   # (layout, plane, layers) -> label layout
+        self.failed = set()           # layers that failed to draw in this call
+        self.depth = 0
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def _call(self):
+        # A layer that fails to draw is tried once per call (the outermost
+        # Render, Svg, Shown or Encoded), and again in the next one
+        with self.lock:
+            if self.depth==0:
+                self.failed = set()
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+
+    def _remember(self,cache,key,value):
+        cache[key] = value
+        while len(cache)>self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def _keep(self,cache,key,value,maxsize):
+        # As _remember, for caches of figures: evicted ones are closed
+        cache[key] = value
+        while len(cache)>maxsize:
+            plt.close(cache.popitem(last=False)[1][0])
+        return value
+
+    def _frame_figure(self,spec):
+        # The frame's figure, kept open for the last few frames so that their
+        # SVG doesn't need another DrawSpec
+        key = SpecHash(dict(spec,limits=[]))
+        if key in self.framefigs:
+            self.framefigs.move_to_end(key)
+            return self.framefigs[key]
+        fig,ax,_ = DrawSpec(dict(spec,limits=[]))
+        fig.set_dpi(self.dpi)
+        front = [a for a in fig.get_children()+ax.get_children() if a not in (fig.patch,ax.patch,ax)]
+        w,h = fig.get_size_inches()
+        # The limit layers only depend on the geometry of the frame, not on
+        # what it shows (models, labels), so toggling a model redraws none
+        # of them unless the axes move
+        layout = ((self.dpi,spec['plane']),round(w,4),round(h,4),tuple(np.round(ax.get_position().bounds,6)),
+                  tuple(ax.get_xlim()),tuple(ax.get_ylim()))
+        return self._keep(self.framefigs,key,[fig,ax,front,layout,None],self.maxframes)
+
+    def Layout(self,spec):
+        # The geometry of the frame, which the limit layers are drawn for
+        key = SpecHash(dict(spec,limits=[]))
+        if key in self.frames:
+            return self.frames[key][2]
+        return self._frame_figure(spec)[3]
+
+    def Frame(self,spec):
+        # Background (figure and axes patches) as an opaque RGB float image,
+        # and the rest of the frame in zorder groups
+        key = SpecHash(dict(spec,limits=[]))
+        if key in self.frames:
+            self.frames.move_to_end(key)
+            return self.frames[key]
+        fig,ax,front,layout,_ = self._frame_figure(spec)
+        vis = [a.get_visible() for a in front]
+        for a in front:
+            a.set_visible(False)
+        fig.patch.set_visible(True)
+        ax.patch.set_visible(True)
+        with plt.rc_context({'text.usetex':False}):
+            bg = _rgba(fig)[:,:,:3].astype(np.float32)
+        for a,v in zip(front,vis):
+            a.set_visible(v)
+        fig.patch.set_visible(False)
+        ax.patch.set_visible(False)
+        groups = Rasterise(fig,front)
+        return self._remember(self.frames,key,(bg,groups,layout))
+
+    def FrameVector(self,spec):
+        # (SVG fragments, definitions) of the whole frame, background included
+        frame = self._frame_figure(spec)
+        if frame[4] is None:
+            fig,ax,front,_,_ = frame
+            frame[4] = Vectorise(fig,front,(fig.patch,ax.patch))
+        return frame[4]
+
+    def _layer_figure(self,layout,layer):
+        # The layer is drawn as DrawSpec would draw it in the first viewport
+        # it is asked for (some methods read the axes limits or geometry),
+        # and reused for every viewport inside its window. None if the
+        # plotting method failed, so that it is tried again next time.
+        _,w,h,pos,xlim,ylim = layout
+        if layer in self.failed:
+            return None
+        for key in self.figures:
+            if (key[0]==layer) and (key[1][0]<=min(xlim)) and (max(xlim)<=key[1][1]):
+                self.figures.move_to_end(key)
+                return self.figures[key]
+        window = LayerWindow(xlim)
+        cls,method,kw = layer
+        with plt.rc_context():
+            fig = plt.figure(figsize=(w,h),dpi=self.dpi)
+            ax = fig.add_axes(pos)
+            ax.set_xscale('log')
+            ax.set_yscale('log')
+            ax.set_xlim(xlim)
+            ax.set_ylim(1e-30,FILL_TOP)
+            ax.set_axis_off()
+            fig.patch.set_visible(False)
+            ax.patch.set_visible(False)
+            plt.sca(ax)
+            with PlotFuncs.MassWindow(window):
+                artists = DrawLayer(ax,cls,method,dict(kw))
+            clean_latex(fig)
+        if artists is None:
+            plt.close(fig)
+            self.failed.add(layer)
+            return None
+        return self._keep(self.figures,(layer,window),(fig,ax,artists,{}),self.maxfigures)
+
+    def _viewport(self,spec,layout,layer):
+        # The layer's figure at the frame's viewport, labels where the
+        # plotting method put them (None if the layer failed to draw)
+        figure = self._layer_figure(layout,layer)
+        if figure is None:
+            return None
+        fig,ax,artists,cache = figure
+        _,w,h,pos,xlim,ylim = layout
+        fig.set_size_inches(w,h)
+        fig.set_dpi(self.dpi)
+        ax.set_position(pos)
+        show_plane(ax,spec['plane'],cache)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        return (repr(layer),ax,artists)
+
+    def _key(self,spec,layout,layer,labels):
+        # Cache key of one limit in this viewport with these labels
+        # labels: the label layout of every visible layer (LimitLabels.py)
+        name = repr(layer)
+        mine = tuple(sorted((k[1],v) for k,v in labels.items() if k[0]==name))
+        return (layout,spec['plane'],name,mine)
+
+    def _group(self,spec,layout,layer,labels,key):
+        # The limit in this viewport with its labels placed, its artists in
+        # view counted (None if it failed to draw)
+        group = self._viewport(spec,layout,layer)
+        if group is None:
+            return None
+        Apply([group],labels)
+        if key not in self.counts:
+            self._remember(self.counts,key,sum(InView(a,group[1].bbox) for a in group[2]))
+        return group
+
+    def Count(self,spec,layout,layer,labels={}):
+        # Number of artists of one limit in view, without drawing it
+        key = self._key(spec,layout,layer,labels)
+        if key in self.counts:
+            self.counts.move_to_end(key)
+        elif self._group(spec,layout,layer,labels,key) is None:
+            return 0
+        return self.counts[key]
+
+    def Layer(self,spec,layout,layer,labels={}):
+        # Sprites of one limit
+        key = self._key(spec,layout,layer,labels)
+        if key in self.buffers:
+            self.buffers.move_to_end(key)
+            return self.buffers[key]
+        group = self._group(spec,layout,layer,labels,key)
+        if group is None:
+            return []
+        return self._remember(self.buffers,key,Rasterise(group[1].figure,group[2]))
+
+    def Vector(self,spec,layout,layer,labels={}):
+        # (SVG fragments, definitions) of one limit
+        key = self._key(spec,layout,layer,labels)
+        if key in self.vectors:
+            self.vectors.move_to_end(key)
+            return self.vectors[key]
+        group = self._group(spec,layout,layer,labels,key)
+        if group is None:
+            return [],[]
+        return self._remember(self.vectors,key,Vectorise(group[1].figure,group[2]))
+
+    def Labels(self,spec,layout,layers):
+        # Label layout for the visible layers, shared by all of them: labels
+        # on different layer figures avoid each other as if on one axes.
+        # Not kept if a layer failed to draw.
+        key = (layout,spec['plane'],tuple(repr(layer) for layer in layers))
+        labels = self.labels.Cached(key)
+        if labels is None:
+            groups = [self._viewport(spec,layout,layer) for layer in layers]
+            if None in groups:
+                return Place([g for g in groups if g is not None])
+            labels = self.labels.Layout(key,groups)
+        return labels
+
+    def _layers(self,spec):
+        return [(cls,method,tuple(sorted(kw.items()))) for _,cls,method,kw in spec['limits']]
+
+    def Shown(self,spec):
+        # Number of limit artists in view, counted without rasterising them
+        with self._call():
+            layout = self.Layout(spec)
+            layers = self._layers(spec)
+            labels = self.Labels(spec,layout,layers)
+            return sum(self.Count(spec,layout,layer,labels) for layer in layers)
+
+    def Sprites(self,spec):
+        # Background, the sprites of everything else in drawing order, and
+        # the number of limit artists in view
+        counts = dict(TextCounts)
+        bg,front,layout = self.Frame(spec)
+        # (zorder, order added, sprite): the frame's artists come first, as
+        # in DrawSpec, then the limits in order
+        stack = [(z,0,sprite) for z,sprite in front]
+        layers = self._layers(spec)
+        labels = self.Labels(spec,layout,layers)
+        shown = 0
+        for i,layer in enumerate(layers):
+            stack += [(z,i+1,sprite) for z,sprite in self.Layer(spec,layout,layer,labels)]
+            shown += self.Count(spec,layout,layer,labels)
+        stack.sort(key=lambda g:g[:2])
+        self.texts = (TextCounts['drawn']-counts['drawn'],TextCounts['culled']-counts['culled'])
+        return bg,[sprite for _,_,sprite in stack],shown
+
+    def Render(self,spec,buffer=None):
+        # The figure for spec as an RGBA uint8 array, in buffer (a FrameBuffer)
+        # if given
+        with self._call():
+            bg,stack,_ = self.Sprites(spec)
+            out,rgba = (buffer or FrameBuffer()).Get(bg.shape)
+            np.copyto(out,bg)
+            for sprite in stack:
+                Over(out,sprite)
+            np.add(out,0.5,out=out)
+            rgba[:,:,:3] = out
+            return rgba
+
+    def Svg(self,spec):
+        # The figure for spec as an SVG document, put together like Render
+        # from the frame's and each limit's fragments
+        with self._call():
+            layout = self.Layout(spec)
+            fragments,defs = self.FrameVector(spec)
+            stack = [(z,0,f) for z,f in fragments]
+            defs = list(defs)
+            layers = self._layers(spec)
+            labels = self.Labels(spec,layout,layers)
+            for i,layer in enumerate(layers):
+                fragments,more = self.Vector(spec,layout,layer,labels)
+                stack += [(z,i+1,f) for z,f in fragments]
+                defs += more
+            stack.sort(key=lambda g:g[:2])
+            return SvgDocument(layout[1],layout[2],defs,[f for _,_,f in stack])
+
+    def Forget(self,functions,frame=False):
+        # Drop what was drawn by the plotting functions ('Class.method'), and
+        # the frames too if frame, so they are drawn again from their data
+        with self.lock:
+            stale = [key for key in self.figures if '%s.%s' % key[0][:2] in functions]
+            for key in stale:
+                plt.close(self.figures.pop(key)[0])
+            names = {repr(key[0]) for key in stale}
+            for cache in (self.buffers,self.vectors,self.counts):
+                for key in [key for key in cache if key[2] in names]:
+                    del cache[key]
+            if frame:
+                self.frames.clear()
+                while self.framefigs:
+                    plt.close(self.framefigs.popitem()[1][0])
+            self.images.clear()
+            self.labels = LabelLayout()
+
+    def Encoded(self,spec,accept='',buffer=None,fmt=None):
+        # (format, bytes) of the figure for a browser sending accept, the
+        # cheapest format that shows it well (Negotiate) unless fmt is given,
+        # cached per format. Every format is made from the same cached layers.
+        # A figure missing a limit that failed to draw isn't cached.
+        with self._call():
+            if fmt is None:
+                fmt = Negotiate(accept,self.Shown(spec))
+            key = (SpecHash(spec),fmt)
+            if key in self.images:
+                self.images.move_to_end(key)
+                return fmt,self.images[key]
+            stored = FigureKey(spec,'figure',['LimitLayers.py'],fmt=fmt,dpi=self.dpi)
+            data = SharedStore().get(stored)
+            if data is None:
+                if fmt=='svg':
+                    data = self.Svg(spec)
+                else:
+                    data = ImageBytes(self.Render(spec,buffer),fmt)
+                if self.failed:
+                    return fmt,data
+                SharedStore().put(stored,data)
+            return fmt,self._remember(self.images,key,data)
+#==============================================================================#
+
+
+#==============================================================================#
+# Like the export queue, one renderer (and its caches) per process and
+# resolution, shared by all sessions. Sessions ask for the resolution that
+# fills their figure pane (ViewportDPI), rounded up to one of DPI_STEPS so
+# that they share renderers.
+DPI_STEPS = (50,75,100,150,200)
+_shared = {}
+
+def ViewportDPI(width,ratio=1,figwidth=16.5):
+    # Smallest step at which a figure figwidth inches wide has at least the
+    # device pixels of a pane width CSS px wide
+    need = width*ratio/figwidth
+    return next((dpi for dpi in DPI_STEPS if dpi>=need),DPI_STEPS[-1])
+
+def SharedRenderer(dpi=100):
+    if dpi not in _shared:
+        _shared[dpi] = LayerRenderer(dpi=dpi)
+    return _shared[dpi]
+#==============================================================================#
+
+
+#==============================================================================#
+# Encode time and payload size per format, for the dashboard's default view
+# at a given resolution. Payloads are also given deflated, as they travel over
+# a compressed websocket (panel serve --websocket-compression-level).
+DEFAULT_SPEC = {'shape':'Rectangular','xlim':(1e-8,1e2),'ylim':(1e-16,1e-8),'plane':'g',
+                'ylab':r'$|g_{a\gamma}|$ [GeV$^{-1}$]',
+                'models':[{'name':'KSVZ','C':(-1.92,-1.92),'color':'#1f77b4'},
+                          {'name':'DFSZ-I','C':(0.75,0.75),'color':'#ff7f0e'}],
+                'limits':[('Helioscopes','AxionPhoton','Helioscopes',{})]}
+
+def Bench(spec=DEFAULT_SPEC,dpi=75,repeat=5):
+    import time
+    import zlib
+    renderer = LayerRenderer(dpi=dpi)
+    rgba = renderer.Render(spec)
+    shown = renderer.Sprites(spec)[2]
+    rows = []
+    for fmt in ('png','webp','avif','svg'):
+        times = []
+        for i in range(repeat):
+            # SVG from the figures already drawn, as after a format switch
+            renderer.vectors.clear()
+            for frame in renderer.framefigs.values():
+                frame[4] = None
+            t = time.perf_counter()
+            data = renderer.Svg(spec) if fmt=='svg' else ImageBytes(rgba,fmt)
+            times.append(time.perf_counter()-t)
+        rows.append((fmt,sorted(times)[len(times)//2],len(data),len(zlib.compress(data,6))))
+    print('%d limit artists in view, %dx%d px at %d dpi; sent as %s (webp accepted) / %s'
+          % (shown,rgba.shape[1],rgba.shape[0],dpi,Negotiate('image/webp',shown),Negotiate('',shown)))
+    print('format  encode [ms]   bytes   deflated')
+    for fmt,t,n,z in rows:
+        print('%-6s %10.1f %9d %10d' % (fmt,1e3*t,n,z))
+    return rows
+
+if __name__=='__main__':
+    import sys
+    if len(sys.argv)>1 and sys.argv[1]=='bench':
+        matplotlib.use('Agg')
+        Bench(dpi=int(sys.argv[2]) if len(sys.argv)>2 else 75)
+    else:
+        print('usage: python LimitLayers.py bench [dpi]')
+        sys.exit(1)
+#==============================================================================#
@@ -0,0 +1,213 @@
+#================================LimitTiles.py=================================#
+# Description:
+# Pre-renders XYZ raster tiles of a set of limits so that a viewer can pan and
+# zoom through the (m_a, g) plane by fetching images instead of re-rendering
+# the matplotlib figure every time.
+#
+# Tiles live in log space. The tile world is a square of 20 decades,
+# m_a = 1e-12 -> 1e8 eV and g = 1e-20 -> 1 GeV^-1, which contains the FigSetup
+# ranges. Tile (z,x,y) is 20/2^z decades on a side, with x counted from the
+# left and y from the top as in the usual XYZ scheme. Tiles are cached on disk
+# under tiles/<key>/z/x/y.png, where <key> identifies the set of layers and
+# what they are drawn from (data files and PlotFuncs source, see
+# ArtifactStore.DataKey), and are only rendered if they are not there already:
+# an edit to a curve or a plotting function gives its layers a new pyramid.
+#
+# Usage:
+#   python LimitTiles.py --zoom 5 Helioscopes Haloscopes LowMassAstroBounds
+#   python LimitTiles.py --zoom 5 --each Helioscopes Haloscopes
+# --each renders one transparent pyramid per layer, which is what the dashboard
+# viewer overlays (each limit checkbox then just shows/hides a tile layer).
+#==============================================================================#
+
+import os
+import json
+import hashlib
+import argparse
+import multiprocessing
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+
+tiledir = 'tiles/'
+
+TILE_SIZE = 256
+TILE_DPI = 100
+WORLD_DECADES = 20.0
+WORLD_LOGM = (-12.0,8.0)
+WORLD_LOGG = (-20.0,0.0)
+
+#==============================================================================#
+def TileBounds(z,x,y):
+    # (m_min,m_max,g_min,g_max) covered by tile (z,x,y)
+    s = WORLD_DECADES/2**z
+    logm = WORLD_LOGM[0]+x*s
+    logg = WORLD_LOGG[1]-(y+1)*s
+    return 10.0**logm,10.0**(logm+s),10.0**logg,10.0**(logg+s)
+
+def TilesInView(z,m_min,m_max,g_min,g_max):
+    # All (x,y) at zoom z that overlap the given window
+    s = WORLD_DECADES/2**z
+    n = 2**z
+    x0 = int(np.clip(np.floor((np.log10(m_min)-WORLD_LOGM[0])/s),0,n-1))
+    x1 = int(np.clip(np.floor((np.log10(m_max)-WORLD_LOGM[0])/s),0,n-1))
+    y0 = int(np.clip(np.floor((WORLD_LOGG[1]-np.log10(g_max))/s),0,n-1))
+    y1 = int(np.clip(np.floor((WORLD_LOGG[1]-np.log10(g_min))/s),0,n-1))
+    return [(x,y) for x in range(x0,x1+1) for y in range(y0,y1+1)]
+
+def LayerSpec(layers):
+    # Layers are method names of the plotting class, optionally with kwargs:
+    #   ['Helioscopes',('Haloscopes',{'projection':True})]
+    spec = []
+    for layer in layers:
+        if isinstance(layer,str):
+            spec.append((layer,{}))
+        else:
+            spec.append((layer[0],dict(layer[1])))
+    return spec
+
+def LayerKey(layers,cls='AxionPhoton'):
+    from ArtifactStore import DataKey
+    spec = LayerSpec(layers)
+    key = DataKey('tiles',['%s.%s' % (cls,name) for name,_ in spec],['LimitTiles.py'],layers=spec)
+    if key is not None:
+        return key[:16]
+    s = json.dumps([cls,spec],sort_keys=True,default=repr)
+    return hashlib.sha1(s.encode()).hexdigest()[:16]
+
+def TilePath(key,z,x,y,tiledir=tiledir):
+    return os.path.join(tiledir,key,str(z),str(x),str(y)+'.png')
+#==============================================================================#
+
+
+#==============================================================================#
+# Each worker draws the layers once on a frameless 256x256 px figure and then
+# only moves the axes limits from one tile to the next.
+_tile_fig = None
+
+def _init_worker(spec,cls):
+    global _tile_fig
+    import PlotFuncs
+    plt.rcParams['text.usetex'] = False
+    fig = plt.figure(figsize=(TILE_SIZE/TILE_DPI,TILE_SIZE/TILE_DPI),dpi=TILE_DPI)
+    ax = fig.add_axes([0,0,1,1])
+    ax.set_axis_off()
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlim(10.0**np.array(WORLD_LOGM))
+    ax.set_ylim(10.0**np.array(WORLD_LOGG))
+    plt.sca(ax)
+    C = getattr(PlotFuncs,cls)
+    for name,kwargs in spec:
+        kwargs = dict(kwargs)
+        kwargs.setdefault('text_on',False)
+        try:
+            getattr(C,name)(ax,**kwargs)
+        except TypeError:
+            kwargs.pop('text_on')
+            getattr(C,name)(ax,**kwargs)
+        ax.set_xlim(10.0**np.array(WORLD_LOGM))
+        ax.set_ylim(10.0**np.array(WORLD_LOGG))
+    _tile_fig = fig
+
+def _render_tile(job):
+    z,x,y,fname = job
+    ax = _tile_fig.axes[0]
+    m_min,m_max,g_min,g_max = TileBounds(z,x,y)
+    ax.set_xlim(m_min,m_max)
+    ax.set_ylim(g_min,g_max)
+    os.makedirs(os.path.dirname(fname),exist_ok=True)
+    tmp = fname+'.%d.tmp' % os.getpid()
+    _tile_fig.savefig(tmp,dpi=TILE_DPI,format='png',transparent=True)
+    os.replace(tmp,fname)
+    return fname
+
+def RenderTiles(layers,zoom=4,zoom_min=0,cls='AxionPhoton',tiledir=tiledir,
+                window=None,processes=None,force=False):
+    # Renders every missing tile from zoom_min up to zoom (inclusive), in
+    # parallel over processes (default: all cores). window=(m_min,m_max,g_min,g_max)
+    # restricts the pyramid to the tiles overlapping that region.
+    # Returns the tile-set key and the number of tiles rendered.
+    spec = LayerSpec(layers)
+    key = LayerKey(spec,cls)
+    os.makedirs(os.path.join(tiledir,key),exist_ok=True)
+    with open(os.path.join(tiledir,key,'layers.json'),'w') as f:
+        json.dump({'class':cls,'layers':spec},f,default=repr)
+
+    if window is None:
+        window = (10.0**WORLD_LOGM[0],10.0**WORLD_LOGM[1],10.0**WORLD_LOGG[0],10.0**WORLD_LOGG[1])
+    jobs = []
+    for z in range(zoom_min,zoom+1):
+        for x,y in TilesInView(z,*window):
+            fname = TilePath(key,z,x,y,tiledir)
+            if force or not os.path.exists(fname):
+                jobs.append((z,x,y,fname))
+    if len(jobs)==0:
+        return key,0
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1,min(processes,len(jobs)))
+    if processes==1:
+        _init_worker(spec,cls)
+        for job in jobs:
+            _render_tile(job)
+    else:
+        with multiprocessing.Pool(processes,initializer=_init_worker,initargs=(spec,cls)) as pool:
+            for _ in pool.imap_unordered(_render_tile,jobs,chunksize=max(1,len(jobs)//(4*processes))):
+                pass
+    return key,len(jobs)
+#==============================================================================#
+
+
+#==============================================================================#
+# Viewer: a Bokeh plot with one tile layer per pyramid key. The plot works in
+# tile-world units (decades, centred on the world) and the tick labels are
+# mapped back to log10(m_a) and log10(g). Returns the plot and a dict of the
+# tile renderers by key, so layers can be toggled client side.
+def TileViewer(keys,url_root='tiles/',zoom=4,height=650,
+               m_range=(1e-8,1e2),g_range=(1e-16,1e-8),
+               xlab='log10(m_a / eV)',ylab='log10(g / GeV^-1)'):
+    from bokeh.plotting import figure
+    from bokeh.models import WMTSTileSource,CustomJSTickFormatter
+
+    half = WORLD_DECADES/2
+    dm = WORLD_LOGM[0]+half
+    dg = WORLD_LOGG[0]+half
+    p = figure(x_range=(np.log10(m_range[0])-dm,np.log10(m_range[1])-dm),
+               y_range=(np.log10(g_range[0])-dg,np.log10(g_range[1])-dg),
+               height=height,sizing_mode='stretch_width',match_aspect=False,
+               tools='pan,wheel_zoom,box_zoom,reset',active_scroll='wheel_zoom')
+    renderers = {}
+    for key in keys:
+        source = WMTSTileSource(url=url_root.rstrip('/')+'/'+key+'/{Z}/{X}/{Y}.png',
+                                x_origin_offset=half,y_origin_offset=half,
+                                initial_resolution=WORLD_DECADES/TILE_SIZE,
+                                tile_size=TILE_SIZE,min_zoom=0,max_zoom=zoom,wrap_around=False)
+        renderers[key] = p.add_tile(source)
+    p.xaxis.axis_label = xlab
+    p.yaxis.axis_label = ylab
+    p.xaxis.formatter = CustomJSTickFormatter(code='return (tick+%g).toFixed(1)' % dm)
+    p.yaxis.formatter = CustomJSTickFormatter(code='return (tick+%g).toFixed(1)' % dg)
+    p.grid.visible = False
+    return p,renderers
+#==============================================================================#
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Pre-render a tile pyramid of limit layers')
+    parser.add_argument('layers',nargs='+',help='plotting methods to draw, e.g. Helioscopes Haloscopes')
+    parser.add_argument('--class',dest='cls',default='AxionPhoton')
+    parser.add_argument('--zoom',type=int,default=4,help='deepest zoom level')
+    parser.add_argument('--zoom-min',type=int,default=0)
+    parser.add_argument('--processes',type=int,default=None)
+    parser.add_argument('--tiledir',default=tiledir)
+    parser.add_argument('--force',action='store_true',help='re-render tiles that already exist')
+    parser.add_argument('--each',action='store_true',help='one pyramid per layer instead of one for all')
+    args = parser.parse_args()
+    matplotlib.use('Agg')
+    groups = [[layer] for layer in args.layers] if args.each else [args.layers]
+    for layers in groups:
+        key,n = RenderTiles(layers,zoom=args.zoom,zoom_min=args.zoom_min,cls=args.cls,
+                            tiledir=args.tiledir,processes=args.processes,force=args.force)
+        print(key,' '.join(layers),n,'tiles rendered')
@@ -0,0 +1,257 @@
+#=================================LimitWatch.py=================================#
+# Description:
+# Watch mode: limit_data/ and PlotFuncs.py are polled for changes (mtime and
+# size, once a second by default; no extra dependencies), and what a change
+# touches is drawn again, and nothing else:
+#   - an edited curve file: the plotting functions that read it, directly or
+#     through a callee (LimitDeps.py),
+#   - an edited PlotFuncs.py: the functions whose source changed and their
+#     callers. Their new code is patched into the running functions, so every
+#     reference to them (the app's categories, LimitFigure's imports) sees
+#     it. Changes outside functions (imports, constants) need a restart.
+# The cached curves of the changed files, and the display lists, layer
+# sprites and exports of the stale functions are dropped.
+#
+# In the dashboard (LIMIT_WATCH=1 panel serve app.py) a thread does this,
+# and each session redraws when a limit it shows, or its WebGL view, went
+# stale. On the command line the standard figures are rebuilt (LimitBuild.py)
+# and the display lists of warm.pkl recaptured.
+#
+# Usage:
+#   python LimitWatch.py [--out plots] [--formats pdf png] [--interval 1]
+#   LIMIT_WATCH=1 panel serve app.py
+#==============================================================================#
+
+import os
+import sys
+import time
+import json
+import types
+import threading
+import argparse
+
+from LimitDeps import DependencyMap
+from ArtifactStore import FRAME
+
+here = os.path.dirname(os.path.abspath(__file__))
+WATCHED = ['limit_data','PlotFuncs.py']
+
+#==============================================================================#
+class Watcher():
+    # Polls the (mtime, size) of every file under paths
+    def __init__(self,paths=WATCHED,root=here):
+        self.paths = paths
+        self.root = root
+        self.stamps = self.Scan()
+
+    def Scan(self):
+        stamps = {}
+        for p in self.paths:
+            full = os.path.join(self.root,p)
+            if os.path.isdir(full):
+                files = [os.path.join(d,fn) for d,_,fns in os.walk(full) for fn in fns]
+            else:
+                files = [full]
+            for fn in files:
+                try:
+                    st = os.stat(fn)
+                except OSError:
+                    continue
+                stamps[os.path.relpath(fn,self.root)] = (st.st_mtime_ns,st.st_size)
+        return stamps
+
+    def Changes(self):
+        # Files added, removed or modified since the last call
+        stamps = self.Scan()
+        changed = sorted(fn for fn in set(stamps)|set(self.stamps) if stamps.get(fn)!=self.stamps.get(fn))
+        self.stamps = stamps
+        return changed
+#==============================================================================#
+
+
+#==============================================================================#
+def _lookup(ns,name):
+    # (owner, attribute, object) of 'func' or 'Class.method' in namespace ns
+    first,_,rest = name.partition('.')
+    obj = ns.get(first)
+    if not rest:
+        return ns,first,obj
+    return obj,rest,(vars(obj).get(rest) if isinstance(obj,type) else None)
+
+def _function(obj):
+    # The function whose code runs, through staticmethod and decorators
+    obj = getattr(obj,'__func__',obj)
+    return getattr(obj,'__wrapped__',obj)
+
+def HotPatch(names):
+    # Runs the current PlotFuncs.py in a scratch namespace and moves the code
+    # of the functions names ('func' or 'Class.method') into the loaded
+    # module. Returns the names that couldn't be patched in place: new plain
+    # functions are added (old references don't see them), anything else
+    # needs a restart.
+    import PlotFuncs
+    with open(PlotFuncs.__file__) as f:
+        code = compile(f.read(),PlotFuncs.__file__,'exec')
+    ns = {'__name__':'PlotFuncs','__file__':PlotFuncs.__file__}
+    exec(code,ns)
+    module = vars(PlotFuncs)
+    missed = []
+    for name in names:
+        new = _lookup(ns,name)[2]
+        owner,attr,old = _lookup(module,name)
+        if new is None:
+            continue
+        src = _function(new)
+        if old is not None:
+            target = _function(old)
+            try:
+                target.__code__ = src.__code__
+                target.__defaults__ = src.__defaults__
+                target.__kwdefaults__ = src.__kwdefaults__
+                continue
+            except ValueError:
+                pass   # a different set of closure variables
+        missed.append(name)
+        if (src is new) and (owner is not None):
+            fresh = types.FunctionType(src.__code__,module,src.__name__,src.__defaults__,src.__closure__)
+            fresh.__kwdefaults__ = src.__kwdefaults__
+            if owner is module:
+                module[attr] = fresh
+            else:
+                setattr(owner,attr,fresh)
+    return missed
+
+def Stale(changed,deps):
+    # (new map, stale functions, True if a restart is needed) after changed
+    new = DependencyMap()
+    stale = set()
+    restart = False
+    if 'PlotFuncs.py' in changed:
+        edited = [n for n,node in new.nodes.items()
+                  if deps.nodes.get(n,{}).get('hash')!=node['hash']]
+        stale.update(new.Callers(edited))
+        restart = (new.module!=deps.module)
+    for fn in changed:
+        if fn!='PlotFuncs.py':
+            stale.update(new.Users(fn))
+            stale.update(deps.Users(fn))
+    return new,stale,restart
+
+def Forget(changed,stale):
+    # Drops this process' cached copies of the changed curves, and what the
+    # stale functions drew. Only modules already imported hold anything (and
+    # under `panel serve` the app's folder is only importable while app.py runs).
+    mods = sys.modules
+    mods['PlotFuncs'].ForgetCurves([fn for fn in changed if fn!='PlotFuncs.py'])
+    if 'LimitGL' in mods:
+        cache = mods['LimitGL'].CaptureCache
+        for key in [key for key in cache if key[0] in stale]:
+            del cache[key]
+    if 'LimitLayers' in mods:
+        for r in list(mods['LimitLayers']._shared.values()):
+            r.Forget(stale,frame=bool(stale.intersection(FRAME)))
+    if 'LimitLabels' in mods:
+        mods['LimitLabels'].SharedLayout().layouts.clear()
+    if ('LimitExport' in mods) and (mods['LimitExport']._shared is not None):
+        mods['LimitExport']._shared.reset()
+#==============================================================================#
+
+
+#==============================================================================#
+# In the dashboard: one watching thread per process. Each change gets a
+# generation number; sessions ask which functions went stale since the last
+# generation they saw (Since).
+Generation = 0
+History = []        # [(generation, stale functions)]
+_thread = None
+_lock = threading.Lock()
+
+def Update(watcher,deps,log=print):
+    # One poll: invalidates what changed. Returns (map, changed, stale).
+    global Generation
+    changed = watcher.Changes()
+    if not changed:
+        return deps,[],set()
+    deps,stale,restart = Stale(changed,deps)
+    if 'PlotFuncs.py' in changed:
+        missed = HotPatch([n for n in stale if n in deps.nodes])
+        if missed:
+            log('not patched in place, restart to be sure: '+', '.join(missed))
+    if restart:
+        log('PlotFuncs.py changed outside functions: restart to pick that up')
+    Forget(changed,stale)
+    with _lock:
+        Generation += 1
+        History.append((Generation,stale))
+    log('%s: %d functions to redraw' % (', '.join(changed),len(stale)))
+    return deps,changed,stale
+
+def Since(generation):
+    # (latest generation, functions stale since generation)
+    with _lock:
+        stale = set()
+        for g,s in History:
+            if g>generation:
+                stale |= s
+        return Generation,stale
+
+def Start(interval=1.0):
+    # Starts the watching thread of this process, once
+    global _thread
+    if _thread is not None:
+        return _thread
+    watcher,deps = Watcher(),DependencyMap()
+    def run():
+        nonlocal deps
+        while True:
+            time.sleep(interval)
+            try:
+                deps = Update(watcher,deps)[0]
+            except Exception as e:
+                print('watch:',repr(e))
+    _thread = threading.Thread(target=run,name='LimitWatch',daemon=True)
+    _thread.start()
+    return _thread
+
+def Running():
+    return _thread is not None
+#==============================================================================#
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Redraw what changes to limit_data/ or PlotFuncs.py touch')
+    parser.add_argument('--out',default='plots')
+    parser.add_argument('--formats',nargs='+',default=['pdf'])
+    parser.add_argument('--jobs',type=int,default=max(1,min(4,os.cpu_count() or 1)))
+    parser.add_argument('--interval',type=float,default=1.0)
+    args = parser.parse_args()
+    import matplotlib
+    matplotlib.use('Agg')
+    import PlotFuncs
+    import LimitGL
+    from LimitBuild import Builder, StandardFigures
+    from WarmStart import snapfile, LoadSnapshot, SaveSnapshot
+    snapshot = os.path.exists(snapfile) and LoadSnapshot(snapfile)
+    watcher,deps = Watcher(),DependencyMap()
+    Builder(args.out).Run(StandardFigures(),args.formats,args.jobs)
+    print('watching',', '.join(WATCHED))
+    while True:
+        time.sleep(args.interval)
+        before = set(LimitGL.CaptureCache)
+        deps,changed,stale = Update(watcher,deps)
+        if not changed:
+            continue
+        t = time.perf_counter()
+        if snapshot:
+            # recapture the display lists that were dropped
+            for name,kw in sorted(key for key in before if key not in LimitGL.CaptureCache):
+                try:
+                    fn = PlotFuncs
+                    for part in name.split('.'):
+                        fn = getattr(fn,part)
+                    LimitGL.CaptureLayer(fn,json.loads(kw))
+                except Exception as e:
+                    print('  capture %s failed: %r' % (name,e))
+            SaveSnapshot(snapfile)
+        Builder(args.out).Run(StandardFigures(),args.formats,args.jobs)
+        print('  done in %.2f s' % (time.perf_counter()-t))
@@ -9,6 +9,10 @@
 
 from numpy import *
 from numpy.random import *
+import numpy as np
+import pickle
+import time
+from contextlib import contextmanager
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
@@ -16,6 +20,8 @@ import matplotlib.gridspec as gridspec
 from matplotlib.colors import ListedColormap
 from matplotlib import colors
 import matplotlib.ticker as mticker
+import matplotlib.collections
+import matplotlib.patches
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 import matplotlib.cm as cm
 #from scipy.stats import norm
@@ -43,10 +49,270 @@ def col_alpha(col,alpha=0.1):
 #==============================================================================#
 
 
+#==============================================================================#
+# Curve cache and coupling views
+# Every limit file is parsed once per process. The plotting functions get a
+# private copy through loadtxt (so they are free to modify it), while LimitView
+# hands out read-only curves already converted into a registered view, e.g.
+#   'g'    : raw coupling (as stored in limit_data)
+#   'C'    : g/(2e-10 m), i.e. C_ag, what the RescaleByMass=True plots show
+#   'fa'   : f_a = alpha/(2 pi g) in GeV, assuming C_ag = 1
+#   'freq' : mass axis converted to frequency in Hz
+# Converted curves are memoised per (file, view), so switching view is a
+# dictionary lookup once a curve has been seen in that view.
+CurveCache = {}
+ViewCache = {}
+CouplingViews = {}
+SharedCurves = None
+MassIndices = {}
+MassRange = None
+
+def UseCurveStore(path='limit_data.pack'):
+    # Attach the memory-mapped pack written by CurveStore.py: curves found in
+    # it are read-only views shared with every other process using the pack
+    global SharedCurves
+    from CurveStore import CurveStore
+    SharedCurves = CurveStore(path)
+    CurveCache.clear()
+    ViewCache.clear()
+    MassIndices.clear()
+    return SharedCurves
+
+def ForgetCurves(files):
+    # Drop every cached copy of the curves of files (e.g. after they were
+    # edited), including their entries in the curve pack
+    files = set(files)
+    for cache in (CurveCache,MassIndices):
+        for key in [key for key in cache if key[0] in files]:
+            del cache[key]
+    for key in [key for key in ViewCache if key[0][0] in files]:
+        del ViewCache[key]
+    if SharedCurves is not None:
+        for fn in files:
+            SharedCurves.forget(fn)
+
+def LoadCurve(filename,**kwargs):
+    # The pack reads each file with its own delimiter (LimitIngest.py)
+    key = (filename,tuple(sorted(kwargs.items())))
+    dat = CurveCache.get(key)
+    if (dat is None) and (SharedCurves is not None) and set(kwargs)<={'unpack','delimiter'}:
+        dat = SharedCurves.get(filename)
+        if (dat is not None) and kwargs.get('unpack',False):
+            dat = dat.T
+        if dat is not None:
+            CurveCache[key] = dat
+    if (dat is None) and kwargs and set(kwargs)<={'unpack'} and ((filename,()) in CurveCache):
+        # e.g. preloaded (see Preload) without unpack
+        dat = CurveCache[(filename,())]
+        if kwargs['unpack']:
+            dat = dat.T
+        CurveCache[key] = dat
+    if dat is None:
+        dat = np.loadtxt(filename,**kwargs)
+        dat.flags.writeable = False
+        CurveCache[key] = dat
+    return dat
+
+def loadtxt(filename,**kwargs):
+    # Drop-in for numpy's loadtxt, backed by the curve cache (and windowed
+    # like LimitView, see MassWindow)
+    return Windowed(LoadCurve(filename,**kwargs),filename,kwargs).copy()
+
+def LogCurve(filename):
+    # log10 of the curve's columns (NaN where not positive), read-only:
+    # precomputed in the curve pack, otherwise computed once
+    key = (filename,'log')
+    dat = CurveCache.get(key)
+    if (dat is None) and (SharedCurves is not None):
+        dat = SharedCurves.log(filename)
+    if dat is None:
+        from CurveStore import LogColumns
+        dat = LogColumns(LoadCurve(filename)).T
+        dat.flags.writeable = False
+    CurveCache[key] = dat
+    return dat
+
+def CurveInfo(filename):
+    # {'meta','geometry'} of a curve file: its comments and shape (see
+    # LimitIngest.py), from the curve pack if it is there
+    info = None if SharedCurves is None else SharedCurves.info(filename)
+    if info is None:
+        from LimitIngest import ReadCurve, Geometry
+        dat,meta = ReadCurve(filename)
+        info = {'meta':meta,'geometry':Geometry(dat)}
+    return info
+
+def RegisterView(name,x=None,y=None):
+    # x(m,out) and y(m,g,out) write the new column straight into out,
+    # so a whole curve is converted in one pass without temporaries
+    CouplingViews[name] = (x,y)
+    for key in [key for key in ViewCache if key[1]==name]:
+        del ViewCache[key]
+
+def ApplyView(dat,view='g'):
+    fx,fy = CouplingViews[view]
+    if (fx is None) and (fy is None):
+        return dat
+    out = array(dat,dtype=float)
+    with errstate(divide='ignore',invalid='ignore'):
+        if fx is not None:
+            fx(dat[:,0],out[:,0])
+        if fy is not None:
+            fy(dat[:,0],dat[:,1],out[:,1])
+    return out
+
+def LimitView(filename,view='g',**kwargs):
+    key = ((filename,tuple(sorted(kwargs.items()))),view)
+    dat = ViewCache.get(key)
+    if dat is None:
+        dat = ApplyView(LoadCurve(filename,**kwargs),view)
+        if dat.flags.writeable:
+            dat.flags.writeable = False
+        ViewCache[key] = dat
+    return Windowed(dat,filename,kwargs)
+
+def ViewCoupling(m,g,view='g'):
+    # A coupling g at mass m (scalars or arrays) converted into view, for
+    # the points the plotting methods place by hand (edges, markers)
+    dat = column_stack(broadcast_arrays(m,g)).astype(float)
+    out = ApplyView(dat,view)[:,1]
+    return out[0] if (ndim(m)==0) and (ndim(g)==0) else out
+
+def _C_view(m,g,out):
+    multiply(m,2e-10,out=out)
+    divide(g,out,out=out)
+
+def _fa_view(m,g,out):
+    divide((1/137.035999084)/(2*pi),g,out=out)
+
+def _freq_view(m,out):
+    multiply(m,241.8*1e12,out=out)
+
+RegisterView('g')
+RegisterView('C',y=_C_view)
+RegisterView('fa',y=_fa_view)
+RegisterView('freq',x=_freq_view)
+#==============================================================================#
+
+
+#==============================================================================#
+# Mass window
+# Inside `with MassWindow(xlim):` LimitView and loadtxt only return the rows
+# of a curve with masses inside xlim, plus one point either side so that lines
+# and fills still run off the edge of the plot, and the first and last rows,
+# which some limits use for edges and label positions. Rows are found by a
+# binary search on the curve's sorted log-mass index (stored in the curve
+# pack, or built the first time a curve is windowed). Curves whose masses
+# aren't sorted (closed contours etc.) come back whole. MassWindow(None) turns
+# it off again, for limits that need a whole curve: those that pick rows by
+# index (every other point, all but the last few) or whose mass column isn't
+# in eV.
+@contextmanager
+def MassWindow(xlim):
+    global MassRange
+    previous = MassRange
+    MassRange = None if xlim is None else (min(xlim),max(xlim))
+    try:
+        yield
+    finally:
+        MassRange = previous
+
+def CurveRows(filename,kwargs,dat):
+    # (i0,i1) rows of the curve inside MassRange
+    from CurveStore import MassIndex,WindowRows
+    m_min,m_max = MassRange
+    unpack = kwargs.get('unpack',False)
+    n = dat.shape[1] if unpack else dat.shape[0]
+    if (SharedCurves is not None) and set(kwargs)<={'unpack','delimiter'}:
+        rows = SharedCurves.rows(filename,m_min,m_max)
+        if rows is not None:
+            return rows
+    key = (filename,tuple(sorted(kwargs.items())))
+    if key not in MassIndices:
+        MassIndices[key] = MassIndex(dat.T if unpack else dat)
+    logm = MassIndices[key]
+    if logm is None:
+        return 0,n
+    return WindowRows(logm,m_min,m_max)
+
+def Windowed(dat,filename,kwargs):
+    if (MassRange is None) or (dat.ndim!=2):
+        return dat
+    i0,i1 = CurveRows(filename,kwargs,dat)
+    unpack = kwargs.get('unpack',False)
+    n = dat.shape[1] if unpack else dat.shape[0]
+    if (i0==0) and (i1==n):
+        return dat
+    rows = arange(i0,i1)
+    if i0>0:
+        rows = r_[0,rows]
+    if i1<n:
+        rows = r_[rows,n-1]
+    return dat[:,rows] if unpack else dat[rows]
+#==============================================================================#
+
+
+#==============================================================================#
+# Preloading
+# The plotting methods read their curves one at a time, as each is reached.
+# Preload reads and parses a list of files on a thread pool and fills the
+# curve cache with them before anything is drawn, so that a cold start waits
+# for the slowest files rather than for all of them in turn. CurveFiles finds
+# the files a class (or some of its methods) needs from the static dependency
+# map of LimitDeps.py. Files that need other loadtxt options than the
+# defaults, or that can't be read at all, are left for the plotting method to
+# read (and fail on, if it is drawn).
+def CurveFiles(cls='AxionPhoton',methods=None):
+    # The shipped curve files read by the methods of a class (all of them by
+    # default) and by the functions they call, from the map of LimitDeps.py
+    from LimitDeps import SharedMap
+    deps = SharedMap()
+    name = cls if isinstance(cls,str) else cls.__name__
+    if methods is None:
+        return deps.Files(deps.Methods(name))
+    return deps.Files([name+'.'+m for m in methods])
+
+def _parse(filename):
+    t = time.perf_counter()
+    try:
+        dat = np.loadtxt(filename)
+    except (OSError,ValueError):
+        # unreadable or missing: left for the plotting method, which reports
+        # it if the curve is drawn
+        return filename,None,None
+    dat.flags.writeable = False
+    return filename,dat,time.perf_counter()-t
+
+def Preload(files,workers=8,verbose=False):
+    # Returns {file: parse time in s, or None if left for later}. Files already
+    # cached or in the curve pack are skipped.
+    from concurrent.futures import ThreadPoolExecutor
+    todo = [f for f in files if ((f,()) not in CurveCache)
+            and not ((SharedCurves is not None) and (f in SharedCurves))]
+    times = {}
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for f,dat,dt in pool.map(_parse,todo):
+            times[f] = dt
+            if dat is not None:
+                CurveCache.setdefault((f,()),dat)
+    if verbose:
+        parsed = sorted(((dt,f) for f,dt in times.items() if dt is not None),reverse=True)
+        print('%d files in %.2f s (%.2f s of parsing), slowest:' % (len(parsed),time.perf_counter()-t,sum([dt for dt,f in parsed])))
+        for dt,f in parsed[:10]:
+            print('  %6.3f s  %s' % (dt,f))
+        skipped = [f for f,dt in times.items() if dt is None]
+        if skipped:
+            print('  left for later:',', '.join(skipped))
+    return times
+#==============================================================================#
+
+
 def PlotBound(ax,filename,edgecolor='k',facecolor='crimson',alpha=1,lw=1.5,y2=1e10,zorder=0.1,
               linestyle='-',skip=1,FillBetween=True,edgealpha=1,rescale_m=False,
               scale_x=1,scale_y=1,start_x=0,end_x=nan,MinorEdgeScale=1.5,AddMinorEdges=False):
-    dat = loadtxt(filename)
+    with MassWindow(None): # whole curve, rows are picked by index
+        dat = loadtxt(filename)
     if end_x/end_x==1:
         dat = dat[start_x:end_x,:]
     else:
@@ -171,6 +437,88 @@ def AlternativeCouplingAxis(ax,scale=1,tickdir='out',labelsize=25,ylabel=r"$g_\g
     ax3.yaxis.set_minor_formatter(mpl.ticker.NullFormatter())
     plt.sca(ax)
 
+#==============================================================================#
+# FigSetup builds the same skeleton for the same arguments every time, so the
+# finished figure is pickled once per (arguments, rcParams) and later calls
+# unpickle a copy of it, which is several times faster than building it again.
+FigTemplates = {}
+MaxFigTemplates = 16
+
+def TemplateKey(args):
+    return (repr(sorted(args.items())),tuple(sorted((k,repr(v)) for k,v in plt.rcParams.items())))
+
+def FromTemplate(key):
+    template = FigTemplates.get(key)
+    if template is None:
+        return None
+    fig = pickle.loads(template)
+    ax = fig.axes[0]
+    plt.sca(ax)
+    return fig,ax
+
+def SaveTemplate(key,fig):
+    FigTemplates[key] = pickle.dumps(fig)
+    while len(FigTemplates)>MaxFigTemplates:
+        del FigTemplates[next(iter(FigTemplates))]
+#==============================================================================#
+
+#==============================================================================#
+# Fixed layout
+# tight_layout measures every text around the axes each time it is called,
+# and savefig(bbox_inches='tight') draws the whole figure once more just to
+# find its extents. The margins only depend on the frame (figure size, axis
+# and tick labels, legends, rcParams), not on what is plotted, so FixedLayout
+# measures them once per frame and after that only applies them.
+Margins = {}
+MaxMargins = 64
+
+def _ticklabels(axis,i):
+    lo,hi = sorted(axis.get_view_interval())
+    return tuple((t.get_text(),t.get_fontsize(),t.get_rotation()) for t in axis.get_majorticklabels()
+                 if t.get_visible() and lo<=t.get_position()[i]<=hi)
+
+def _texts(texts):
+    return tuple((t.get_text(),t.get_fontsize(),t.get_rotation(),tuple(t.get_position()))
+                 for t in texts if t.get_visible() and t.get_in_layout())
+
+def FrameKey(fig):
+    # Everything the tight layout of fig depends on, read without drawing it
+    key = [tuple(fig.get_size_inches()),fig.dpi,TemplateKey({})[1],_texts(fig.texts)]
+    for ax in fig.axes:
+        key += [_ticklabels(ax.xaxis,0),_ticklabels(ax.yaxis,1),
+                _texts([ax.xaxis.label,ax.yaxis.label,ax.title]+ax.texts)]
+        leg = ax.get_legend()
+        if leg is not None:
+            key.append(_texts(leg.get_texts()+[leg.get_title()]))
+    return repr(key)
+
+def FixedLayout(fig):
+    # tight_layout, measured the first time a frame is seen
+    key = FrameKey(fig)
+    margins = Margins.get(key)
+    if margins is None:
+        fig.tight_layout()
+        # tight_layout leaves a placeholder layout engine, for which savefig
+        # draws the figure twice
+        fig.set_layout_engine(None)
+        p = fig.subplotpars
+        margins = dict(left=p.left,right=p.right,bottom=p.bottom,top=p.top,wspace=p.wspace,hspace=p.hspace)
+        Margins[key] = margins
+        while len(Margins)>MaxMargins:
+            del Margins[next(iter(Margins))]
+    else:
+        fig.subplots_adjust(**margins)
+    return fig
+
+def TightBBox(fig):
+    # The box savefig(bbox_inches='tight') crops to, from the text layout
+    # alone, so that savefig skips its measuring draw
+    get_renderer = getattr(fig.canvas,'get_renderer',None)
+    if get_renderer is None:
+        return 'tight'
+    return fig.get_tightbbox(get_renderer()).padded(mpl.rcParams['savefig.pad_inches'])
+#==============================================================================#
+
 def FigSetup(xlab=r'$m_a$ [eV]',ylab='',\
                  g_min = 1.0e-19,g_max = 1.0e-6,\
                  m_min = 1.0e-12,m_max = 1.0e7,\
@@ -179,6 +527,7 @@ def FigSetup(xlab=r'$m_a$ [eV]',ylab='',\
                  mathpazo=False,TopAndRightTicks=False,majorticklength=13,minorticklength=10,\
                 xtick_rotation=20.0,tick_pad=8,x_labelpad=10,y_labelpad=10,\
              FrequencyAxis=False,N_Hz=1,upper_xlabel=r"$\nu_a$ [Hz]",**freq_kwargs):
+    args = dict(locals())
 
     plt.rcParams['axes.linewidth'] = lw
     plt.rc('text', usetex=True)
@@ -191,6 +540,11 @@ def FigSetup(xlab=r'$m_a$ [eV]',ylab='',\
         "font.serif": ["Palatino"],
             })
 
+    key = TemplateKey(args)
+    template = FromTemplate(key)
+    if template is not None:
+        return template
+
     if Shape=='Wide':
         fig = plt.figure(figsize=(16.5,5))
     elif Shape=='Rectangular':
@@ -236,6 +590,7 @@ def FigSetup(xlab=r'$m_a$ [eV]',ylab='',\
                            xlabel=upper_xlabel,\
                            lfs=lfs/1.3,tfs=tfs,tick_pad=tick_pad-2,**freq_kwargs)
 
+    SaveTemplate(key,fig)
     return fig,ax
 
 
@@ -246,11 +601,9 @@ class AxionPhoton():
                 C_upper = 44/3-1.92,C_lower = abs(5/3-1.92),level_max = 4,nlevels=20,alpha=0.2,line_color='#a35c2f',
                 KSVZ_label_mass=1e-8,DFSZ_label_mass=5e-8,vmax=0.9):
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
 
         ## QCD Axion band:
         g_min,g_max = ax.get_ylim()
@@ -262,7 +615,7 @@ class AxionPhoton():
         KSVZ = 1.92
         DFSZ = 0.75
 
-        if rs1==0:
+        if view=='g':
             # # Plot Band
             # n = 200
             # g = logspace(log10(g_min),log10(g_max),n)
@@ -336,46 +689,44 @@ class AxionPhoton():
 
     def ADMX(ax,col=[0.8, 0.0, 0.0],projection=False,fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1],zorder=0.1):
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
         # 2018: arXiv[1804.05750]
         # 2019: arXiv[1910.08638]
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/ADMX.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2018.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2019_1.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2019_2.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2021.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2024.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX2025.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/ADMX_Sidecar.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2018.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2019_1.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2019_2.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2021.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2024.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX2025.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/ADMX_Sidecar.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
 
 
         if projection:
             # ADMX arXiv[1804.05750]
-            dat = loadtxt("limit_data/AxionPhoton/Projections/ADMX_Projected.txt")
-            plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-            plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
+            dat = LimitView("limit_data/AxionPhoton/Projections/ADMX_Projected.txt",view)
+            plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+            plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
             if text_on:
-                if rs1==0:
+                if view=='g':
                     plt.text(1e-5*text_shift[0],2.3e-16*text_shift[1],r'{\bf ADMX}',fontsize=20,color=col,rotation=0,ha='left',va='top',clip_on=True)
                     plt.plot([3e-5,2e-5],[3e-16,0.6e-15],'k-',lw=1.5)
                 else:
                     plt.text(0.9e-6*text_shift[0],0.15*text_shift[1],r'{\bf ADMX}',fontsize=fs,color=col,rotation=0,ha='left',va='top',clip_on=True)
         else:
             if text_on:
-                if rs1==0:
+                if view=='g':
                     plt.text(0.85e-6*text_shift[0],1e-13*text_shift[1],r'{\bf ADMX}',fontsize=fs,color=col,rotation=90,ha='left',va='top',clip_on=True)
                 else:
                     plt.gcf().text(0.39*text_shift[0],0.5*text_shift[1],r'{\bf ADMX}',rotation=90,color=col)
@@ -385,20 +736,18 @@ class AxionPhoton():
         # UF: Phys. Rev. D42, 1297 (1990).
         # RBF: Phys. Rev. Lett. 59, 839 (1987).
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/RBF.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
-        dat = loadtxt("limit_data/AxionPhoton/UF.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/RBF.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
+        dat = LimitView("limit_data/AxionPhoton/UF.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zorder)
 
 
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*0.37e-5,text_shift[1]*0.8e-11,r'{\bf RBF+UF}',fontsize=fs,color='w',rotation=-90,ha='left',va='top',clip_on=True)
             else:
                 plt.text(text_shift[0]*0.7e-5,text_shift[1]*4e3,r'{\bf RBF}',fontsize=fs,color='w',rotation=0,ha='center',va='top',clip_on=True)
@@ -409,123 +758,116 @@ class AxionPhoton():
     def HAYSTAC(ax,col=[0.88, 0.07, 0.37],fs=13,RescaleByMass=False,projection=True,text_on=True,text_shift=[1,1]):
         # HAYSTAC arXiv:[1803.03690] and [2008.01853]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 3
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/HAYSTAC_PhaseI.txt")
-        dat2 = loadtxt("limit_data/AxionPhoton/HAYSTAC_PhaseII_ab.txt")
-        dat3 = loadtxt("limit_data/AxionPhoton/HAYSTAC_PhaseII_cd.txt")
-
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=2)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,zorder=zo,lw=2)
-            plt.fill_between(dat3[:,0],dat3[:,1]/(rs1*2e-10*dat3[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=zo)
+        dat = LimitView("limit_data/AxionPhoton/HAYSTAC_PhaseI.txt",view)
+        dat2 = LimitView("limit_data/AxionPhoton/HAYSTAC_PhaseII_ab.txt",view)
+        dat3 = LimitView("limit_data/AxionPhoton/HAYSTAC_PhaseII_cd.txt",view)
+
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=2)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,zorder=zo,lw=2)
+            plt.fill_between(dat3[:,0],dat3[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=zo)
             if text_on:
                 if projection==False:
                     plt.text(text_shift[0]*2.1e-5,text_shift[0]*5e-13,r'{\bf HAYSTAC}',fontsize=fs,color=col,rotation=-90,ha='left',va='top',clip_on=True)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',zorder=zo,lw=4)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=3)
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',zorder=zo,lw=4)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=3)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
 
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color='k',zorder=zo,lw=4)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,zorder=zo,lw=3)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color='k',zorder=zo,lw=4)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,zorder=zo,lw=3)
             plt.text(text_shift[0]*dat2[0,0]*1.1,text_shift[1]*y2*1.2,r'{\bf HAYSTAC}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(dat2[0,0],dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat2[0,0],dat2[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
         return
 
     def TASEH(ax,col=[0.88, 0.07, 0.24],fs=13,RescaleByMass=False,projection=True,text_on=True,text_shift=[1,1]):
         # TASEH https://arxiv.org/pdf/2205.05574.pdf
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 3
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/TASEH.txt")
+        dat = LimitView("limit_data/AxionPhoton/TASEH.txt",view)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=2)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=2)
         return
 
     def CASTCAPP(ax,col=[0.88, 0.07, 0.24],fs=13,RescaleByMass=False,projection=True,text_on=True,text_shift=[1,1]):
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 3
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/CAST-CAPP.txt")
+        dat = LimitView("limit_data/AxionPhoton/CAST-CAPP.txt",view)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=2)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=2)
         return
 
     def CAPP(ax,col=[1, 0.1, 0.37],fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 3
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
-        dat = loadtxt("limit_data/AxionPhoton/CAPP-1.txt")
-        dat2 = loadtxt("limit_data/AxionPhoton/CAPP-2.txt")
-        dat3 = loadtxt("limit_data/AxionPhoton/CAPP-3.txt")
-        dat4 = loadtxt("limit_data/AxionPhoton/CAPP-4.txt")
-        dat5 = loadtxt("limit_data/AxionPhoton/CAPP-5.txt")
-        dat6 = loadtxt("limit_data/AxionPhoton/CAPP-6.txt")
-        dat7 = loadtxt("limit_data/AxionPhoton/CAPP-7.txt")
-        dat8 = loadtxt("limit_data/AxionPhoton/CAPP-8.txt")
-        dat9 = loadtxt("limit_data/AxionPhoton/CAPP-9.txt")
-        dat10 = loadtxt("limit_data/AxionPhoton/CAPP-MAX.txt")
-
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=3)
-            plt.fill_between(dat2[:,0],dat2[:,1]/(rs1*2e-10*dat2[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat3[:,0],dat3[:,1]/(rs1*2e-10*dat3[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat4[:,0],dat4[:,1]/(rs1*2e-10*dat4[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat5[:,0],dat5[:,1]/(rs1*2e-10*dat5[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat6[:,0],dat6[:,1]/(rs1*2e-10*dat6[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat7[:,0],dat7[:,1]/(rs1*2e-10*dat7[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat8[:,0],dat8[:,1]/(rs1*2e-10*dat8[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat9[:,0],dat9[:,1]/(rs1*2e-10*dat9[0,0]+rs2),y2=y2,color=col,zorder=zo)
-            plt.fill_between(dat10[:,0],dat10[:,1]/(rs1*2e-10*dat10[0,0]+rs2),y2=y2,color=col,zorder=zo)
+        dat = LimitView("limit_data/AxionPhoton/CAPP-1.txt",view)
+        with MassWindow(None): # whole curves, their minima are marked
+            dat2 = LimitView("limit_data/AxionPhoton/CAPP-2.txt",view)
+            dat3 = LimitView("limit_data/AxionPhoton/CAPP-3.txt",view)
+        dat4 = LimitView("limit_data/AxionPhoton/CAPP-4.txt",view)
+        dat5 = LimitView("limit_data/AxionPhoton/CAPP-5.txt",view)
+        dat6 = LimitView("limit_data/AxionPhoton/CAPP-6.txt",view)
+        dat7 = LimitView("limit_data/AxionPhoton/CAPP-7.txt",view)
+        dat8 = LimitView("limit_data/AxionPhoton/CAPP-8.txt",view)
+        dat9 = LimitView("limit_data/AxionPhoton/CAPP-9.txt",view)
+        dat10 = LimitView("limit_data/AxionPhoton/CAPP-MAX.txt",view)
+
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=3)
+            plt.fill_between(dat2[:,0],dat2[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat3[:,0],dat3[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat4[:,0],dat4[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat5[:,0],dat5[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat6[:,0],dat6[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat7[:,0],dat7[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat8[:,0],dat8[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat9[:,0],dat9[:,1],y2=y2,color=col,zorder=zo)
+            plt.fill_between(dat10[:,0],dat10[:,1],y2=y2,color=col,zorder=zo)
 
             if text_on:
                 plt.text(text_shift[0]*0.8e-5,text_shift[1]*0.1e-13,r'{\bf CAPP}',fontsize=fs,color=col,rotation=90,ha='center',va='top',clip_on=True)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',zorder=zo,lw=4)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,zorder=zo,lw=3)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',zorder=zo,lw=4)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,zorder=zo,lw=3)
             if text_on:
                 plt.text(text_shift[0]*dat[0,0]*1.1,text_shift[1]*y2*1.8,r'{\bf CAPP}',fontsize=fs,color=col,rotation=40,ha='left',va='top',rotation_mode='anchor')
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
             imin = argmin(dat2[:,1])
-            plt.plot(dat2[imin,0],dat2[imin,1]/(rs1*2e-10*dat2[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat2[imin,0],dat2[imin,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
             imin = argmin(dat3[:,1])
-            plt.plot(dat3[imin,0],dat3[imin,1]/(rs1*2e-10*dat3[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
-            plt.fill_between(dat2[:,0],dat2[:,1]/(rs1*2e-10*dat2[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat3[:,0],dat3[:,1]/(rs1*2e-10*dat3[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat4[:,0],dat4[:,1]/(rs1*2e-10*dat4[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat5[:,0],dat5[:,1]/(rs1*2e-10*dat5[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat6[:,0],dat6[:,1]/(rs1*2e-10*dat6[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat7[:,0],dat7[:,1]/(rs1*2e-10*dat7[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat8[:,0],dat8[:,1]/(rs1*2e-10*dat8[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat9[:,0],dat9[:,1]/(rs1*2e-10*dat9[0,0]+rs2),y2=y2,color=col)
-            plt.fill_between(dat10[:,0],dat10[:,1]/(rs1*2e-10*dat10[0,0]+rs2),y2=y2,color=col)
+            plt.plot(dat3[imin,0],dat3[imin,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.fill_between(dat2[:,0],dat2[:,1],y2=y2,color=col)
+            plt.fill_between(dat3[:,0],dat3[:,1],y2=y2,color=col)
+            plt.fill_between(dat4[:,0],dat4[:,1],y2=y2,color=col)
+            plt.fill_between(dat5[:,0],dat5[:,1],y2=y2,color=col)
+            plt.fill_between(dat6[:,0],dat6[:,1],y2=y2,color=col)
+            plt.fill_between(dat7[:,0],dat7[:,1],y2=y2,color=col)
+            plt.fill_between(dat8[:,0],dat8[:,1],y2=y2,color=col)
+            plt.fill_between(dat9[:,0],dat9[:,1],y2=y2,color=col)
+            plt.fill_between(dat10[:,0],dat10[:,1],y2=y2,color=col)
 
         return
 
@@ -533,44 +875,42 @@ class AxionPhoton():
         # QUAX1 arXiv:[1903.06547]
         # QUAX2 arXiv:[2012.09498]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 3
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = -2
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/QUAX.txt")
-        dat2 = loadtxt("limit_data/AxionPhoton/QUAX2.txt")
-        dat3 = loadtxt("limit_data/AxionPhoton/QUAX4.txt")
-        dat4 = loadtxt("limit_data/AxionPhoton/QUAX5.txt")
+        dat = LimitView("limit_data/AxionPhoton/QUAX.txt",view)
+        dat2 = LimitView("limit_data/AxionPhoton/QUAX2.txt",view)
+        dat3 = LimitView("limit_data/AxionPhoton/QUAX4.txt",view)
+        dat4 = LimitView("limit_data/AxionPhoton/QUAX5.txt",view)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=2,zorder=zo)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,lw=2,zorder=zo)
-            plt.fill_between(dat3[:,0],dat3[:,1]/(rs1*2e-10*dat3[:,0]+rs2),y2=y2,color=col,lw=2,zorder=zo)
-            plt.fill_between(dat4[:,0],dat4[:,1]/(rs1*2e-10*dat4[:,0]+rs2),y2=y2,color=col,lw=2,zorder=zo)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=2,zorder=zo)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,lw=2,zorder=zo)
+            plt.fill_between(dat3[:,0],dat3[:,1],y2=y2,color=col,lw=2,zorder=zo)
+            plt.fill_between(dat4[:,0],dat4[:,1],y2=y2,color=col,lw=2,zorder=zo)
 
             if text_on:
                 plt.text(text_shift[0]*6.3e-5,text_shift[1]*0.05e-11,r'{\bf QUAX}',fontsize=fs,color=col,rotation=-90,ha='center',va='top',clip_on=True)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=3,zorder=zo)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,lw=3,zorder=zo)
-            plt.plot([dat3[0,0],dat3[0,0]],[dat3[0,1]/(rs1*2e-10*dat3[0,0]+rs2),y2/(rs1*2e-10*dat3[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat3[0,0],dat3[0,0]],[dat3[0,1]/(rs1*2e-10*dat3[0,0]+rs2),y2/(rs1*2e-10*dat3[0,0]+rs2)],color=col,lw=3,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=3,zorder=zo)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,lw=3,zorder=zo)
+            plt.plot([dat3[0,0],dat3[0,0]],[dat3[0,1],ViewCoupling(dat3[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat3[0,0],dat3[0,0]],[dat3[0,1],ViewCoupling(dat3[0,0],y2,view)],color=col,lw=3,zorder=zo)
             if text_on:
                 plt.text(text_shift[0]*dat2[0,0]*1.2,text_shift[1]*y2*1.2,r'{\bf QUAX}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
-            plt.plot(dat2[0,0],dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat2[0,0],dat2[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
 
         if projection==True:
-            dat = loadtxt("limit_data/AxionPhoton/Projections/QUAX2005.txt")
-            plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-            plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
-            if rs1==1.0:
+            dat = LimitView("limit_data/AxionPhoton/Projections/QUAX2005.txt",view)
+            plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+            plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
+            if view=='C':
                 plt.text(2.5e-5,0.8e-1,r'{\bf QUAX}',color=col,fontsize=18)
                 plt.plot([4.0e-5,4.0e-5],[2.2e-1,2.1e0],'k-',lw=1.5)
         return
@@ -587,60 +927,58 @@ class AxionPhoton():
     def ABRACADABRA(ax,col=[0.83, 0.07, 0.37],fs=15,projection=False,RescaleByMass=False,text_on=True,lw=1,text_shift=[1,1],edgealpha=1):
         # ABRACADABRA arXiv:[1810.12257]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/ABRACADABRA.txt")
+        with MassWindow(None): # whole curve, the edge is every 20th point
+            dat = LimitView("limit_data/AxionPhoton/ABRACADABRA.txt",view)
         n = shape(dat)[0]
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=2)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=2)
         x = dat[arange(0,n,20),0]
         y = dat[arange(0,n,20),1]
-        y[-1] = y2
-        plt.plot(x,y/(rs1*2e-10*x+rs2),'k-',lw=lw,zorder=2.01,alpha=edgealpha)
+        y[-1] = ViewCoupling(x[-1],y2,view)
+        plt.plot(x,y,'k-',lw=lw,zorder=2.01,alpha=edgealpha)
 
 
-        dat = loadtxt("limit_data/AxionPhoton/ABRACADABRA_run2.txt")
+        with MassWindow(None):
+            dat = LimitView("limit_data/AxionPhoton/ABRACADABRA_run2.txt",view)
         n = shape(dat)[0]
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=2.02)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=2.02)
         x = dat[arange(0,n,1),0]
         y = dat[arange(0,n,1),1]
-        y[-1] = y2
-        plt.plot(x,y/(rs1*2e-10*x+rs2),'k-',lw=lw,zorder=2.02,alpha=edgealpha)
+        y[-1] = ViewCoupling(x[-1],y2,view)
+        plt.plot(x,y,'k-',lw=lw,zorder=2.02,alpha=edgealpha)
 
 
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.5e-9,text_shift[1]*3e-8,r'{\bf ABRA}',fontsize=fs,color='w',rotation=0,ha='center',va='top',zorder=10,clip_on=True,path_effects=line_background(1.5,'k'))
                 #plt.text(text_shift[0]*1.5e-9,text_shift[1]*1e-8,r'10 cm',fontsize=fs,color='w',rotation=0,ha='center',va='top',zorder=10,clip_on=True,path_effects=line_background(1.5,'k'))
 
         if projection:
-            dat = loadtxt("limit_data/AxionPhoton/Projections/ABRACADABRA.txt")
-            plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-            plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
+            dat = LimitView("limit_data/AxionPhoton/Projections/ABRACADABRA.txt",view)
+            plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+            plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
             if text_on:
-                if rs1==0:
+                if view=='g':
                     plt.text(text_shift[0]*5e-12,text_shift[1]*4e-18,r'{\bf ABRACADABRA}',fontsize=fs-1,color=col,rotation=13,ha='left',va='top',clip_on=True)
                 else:
                     plt.text(text_shift[0]*1.3e-9,text_shift[1]*1.0e2,r'{\bf ABRACADABRA}',fontsize=fs-1,color=col,rotation=0,ha='left',va='top',clip_on=True)
-                    plt.plot([dat[-1,0],dat[-1,0]],[dat[-1,1]/(rs1*2e-10*dat[-1,0]+rs2),1e6],lw=1.5,color=col,zorder=0)
+                    plt.plot([dat[-1,0],dat[-1,0]],[dat[-1,1],1e6],lw=1.5,color=col,zorder=0)
         return
 
     def DMRadio(ax,col=[0.83, 0.07, 0.37],fs=23,text_on=True,RescaleByMass=False,lw=2,text_shift=[1,1],linestyle='-',rotation=90):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt('limit_data/AxionPhoton/Projections/DMRadio.txt')
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),linestyle=linestyle,linewidth=2,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView('limit_data/AxionPhoton/Projections/DMRadio.txt',view)
+        plt.plot(dat[:,0],dat[:,1],linestyle=linestyle,linewidth=2,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*2e-10,text_shift[1]*0.05e-16,r'{\bf DM-Radio}',color='crimson',fontsize=20,rotation=rotation,clip_on=True)
             else:
                 plt.text(text_shift[0]*5e-9,text_shift[1]*4.0e-1,r'{\bf DM-Radio}',fontsize=fs-1,color=col,rotation=0,ha='left',va='top',clip_on=True)
@@ -650,16 +988,14 @@ class AxionPhoton():
     def SRF(ax,col=[0.83, 0.07, 0.37],fs=20,text_on=True,RescaleByMass=False,lw=2,text_shift=[1,1],linestyle='-',rotation=-40):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt('limit_data/AxionPhoton/Projections/SRF.txt')
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),linestyle=linestyle,linewidth=2,color=col,zorder=0.0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0.0,alpha=0.1)
+            view = 'g'
+        dat = LimitView('limit_data/AxionPhoton/Projections/SRF.txt',view)
+        plt.plot(dat[:,0],dat[:,1],linestyle=linestyle,linewidth=2,color=col,zorder=0.0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0.0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.5e-11,text_shift[1]*0.7e-18,r'{\bf SRF-m$^3$}',color='crimson',fontsize=20,rotation=rotation,clip_on=True)
             else:
                 plt.text(text_shift[0]*5e-9,text_shift[1]*4.0e-1,r'{\bf SRF-m$^3$}',fontsize=fs-1,color=col,rotation=0,ha='left',va='top',clip_on=True)
@@ -668,16 +1004,14 @@ class AxionPhoton():
     def WISPLC(ax,col=[0.8, 0.07, 0.37],fs=15,text_on=True,RescaleByMass=False,lw=2,text_shift=[1,1],linestyle='-',rotation=14):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt('limit_data/AxionPhoton/Projections/WISPLC.txt')
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),linestyle=linestyle,linewidth=2,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView('limit_data/AxionPhoton/Projections/WISPLC.txt',view)
+        plt.plot(dat[:,0],dat[:,1],linestyle=linestyle,linewidth=2,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*2e-11,text_shift[1]*8e-16,r'{\bf WISPLC}',color='crimson',fontsize=fs,rotation=rotation,clip_on=True)
             else:
                 plt.text(text_shift[0]*1.5e-9,text_shift[1]*1.5e4,r'{\bf WISPLC}',fontsize=fs+1,color=col,rotation=-14,ha='left',va='top',clip_on=True)
@@ -687,31 +1021,29 @@ class AxionPhoton():
         # ORGAN arXiv[1706.00209]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 6
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = -2
-        dat = loadtxt("limit_data/AxionPhoton/ORGAN.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=col,facecolor=col,zorder=zo,lw=1)
+        dat = LimitView("limit_data/AxionPhoton/ORGAN.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=col,facecolor=col,zorder=zo,lw=1)
 
-        dat2 = loadtxt("limit_data/AxionPhoton/ORGAN-1a.txt")
-        plt.fill_between(dat2[:,0],dat2[:,1]/(rs1*2e-10*dat2[:,0]+rs2),y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
+        dat2 = LimitView("limit_data/AxionPhoton/ORGAN-1a.txt",view)
+        plt.fill_between(dat2[:,0],dat2[:,1],y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
 
-        dat2 = loadtxt("limit_data/AxionPhoton/ORGAN-1b.txt")
-        plt.fill_between(dat2[:,0],dat2[:,1]/(rs1*2e-10*dat2[:,0]+rs2),y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
+        dat2 = LimitView("limit_data/AxionPhoton/ORGAN-1b.txt",view)
+        plt.fill_between(dat2[:,0],dat2[:,1],y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
 
-        dat2 = loadtxt("limit_data/AxionPhoton/ORGAN-Q.txt")
-        plt.fill_between(dat2[:,0],dat2[:,1]/(rs1*2e-10*dat2[:,0]+rs2),y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
+        dat2 = LimitView("limit_data/AxionPhoton/ORGAN-Q.txt",view)
+        plt.fill_between(dat2[:,0],dat2[:,1],y2=y2,edgecolor='k',facecolor=col,zorder=zo,lw=lw)
 
         if projection:
-            dat = loadtxt("limit_data/AxionPhoton/Projections/ORGAN_Projected.txt")
-            plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-            plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
+            dat = LimitView("limit_data/AxionPhoton/Projections/ORGAN_Projected.txt",view)
+            plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+            plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
             if text_on:
-                if rs1==0:
+                if view=='g':
                     plt.text(text_shift[0]*5e-4,text_shift[1]*1.15e-15,r'{\bf ORGAN}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                     plt.plot([5e-4,1.5e-4],[1.3e-14,6e-13],'k-',lw=1.5)
                 else:
@@ -719,12 +1051,12 @@ class AxionPhoton():
 
         else:
             if RescaleByMass:
-                plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=1,zorder=zo)
+                plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=1,zorder=zo)
             if RescaleByMass:
-                plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+                plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
             if text_on:
-                if rs1==0:
+                if view=='g':
                     plt.text(text_shift[0]*110e-6,text_shift[1]*1e-11,r'{\bf ORGAN}',fontsize=fs,color=col,rotation=-90,ha='left',va='top',clip_on=True)
                 else:
                     plt.text(text_shift[0]*dat[0,0]*1.1,text_shift[1]*y2*1.2,r'{\bf ORGAN}',fontsize=fs-3,color=col,rotation=40,ha='left',rotation_mode='anchor')
@@ -734,51 +1066,47 @@ class AxionPhoton():
     def RADES(ax,col='blueviolet',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         # RADES 2104.13798
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 6
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/RADES.txt")
-        dat2 = loadtxt("limit_data/AxionPhoton/RADES2.txt")
+        dat = LimitView("limit_data/AxionPhoton/RADES.txt",view)
+        dat2 = LimitView("limit_data/AxionPhoton/RADES2.txt",view)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=2,zorder=zo)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,lw=2,zorder=zo)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=2,zorder=zo)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,lw=2,zorder=zo)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=3,zorder=zo)
-            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1]/(rs1*2e-10*dat2[0,0]+rs2),y2/(rs1*2e-10*dat2[0,0]+rs2)],color=col,lw=3,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=3,zorder=zo)
+            plt.plot([dat2[0,0],dat2[0,0]],[dat2[0,1],ViewCoupling(dat2[0,0],y2,view)],color=col,lw=3,zorder=zo)
             if text_on:
                 plt.text(text_shift[0]*dat[0,0]*0.88,text_shift[1]*y2*1.2,r'{\bf RADES}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
 
         return
 
     def GrAHal(ax,col='#b53e5a',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         # Grenoble haloscope  2110.14406
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = 6
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = 0
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/GrAHal.txt")
+        dat = LimitView("limit_data/AxionPhoton/GrAHal.txt",view)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=2,zorder=zo)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=2,zorder=zo)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',lw=4,zorder=zo)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=3,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',lw=4,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=3,zorder=zo)
             if text_on:
                 plt.text(text_shift[0]*dat[0,0]*0.88,text_shift[1]*y2*1.2,r'{\bf GrAHal}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
 
         return
 
@@ -786,16 +1114,14 @@ class AxionPhoton():
         # MADMAX arXiv[2003.10894]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/MADMAX.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/MADMAX.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.5e-4,text_shift[1]*4.5e-15,r'{\bf MADMAX}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([3e-4,1.3e-4],[5.5e-15,2.6e-14],'k-',lw=1.5)
             else:
@@ -806,16 +1132,14 @@ class AxionPhoton():
     def DALI(ax,col='darkred',fs=18,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/DALI.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=2,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/DALI.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=2,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.0e-4,text_shift[1]*0.6e-15,r'{\bf DALI}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([0.9e-4,0.32e-4],[0.6e-15,0.4e-14],'k-',lw=1.5)
             else:
@@ -827,16 +1151,14 @@ class AxionPhoton():
         # Plasma Haloscope arXiv[1904.11872]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/ALPHA.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=2,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/ALPHA.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=2,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0,alpha=0.2)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.4e-4,text_shift[1]*1.6e-15,r'{\bf ALPHA}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([1.4e-4,0.6e-4],[1.6e-15,0.9e-14],'k-',lw=1.5)
             else:
@@ -848,16 +1170,14 @@ class AxionPhoton():
         # FLASH https://indico.cern.ch/event/1115163/
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/FLASH.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.3)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/FLASH.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.3)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*2.5e-6,text_shift[1]*0.45e-16,r'{\bf FLASH}',fontsize=20,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([1.2e-6,2.5e-6],[5e-16,0.6e-16],'k-',lw=1.5)
             else:
@@ -867,16 +1187,14 @@ class AxionPhoton():
     def BabyIAXO_RADES(ax,col='darkred',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/BabyIAXO_RADES.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.3)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/BabyIAXO_RADES.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.3)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*2.5e-6,text_shift[1]*0.45e-16,r'{\bf FLASH}',fontsize=20,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([1.2e-6,2.5e-6],[5e-16,0.6e-16],'k-',lw=1.5)
             else:
@@ -886,16 +1204,14 @@ class AxionPhoton():
     def CADEx(ax,col='firebrick',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/CADEx.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/CADEx.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.1e-3,text_shift[1]*0.35e-13,r'{\bf CADEx}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([1.3e-3,0.4e-3],[0.45e-13,2e-12],'k-',lw=1.5)
             else:
@@ -907,16 +1223,14 @@ class AxionPhoton():
         # BRASS http://www.iexp.uni-hamburg.de/groups/astroparticle/brass/brassweb.htm
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/BRASS.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/BRASS.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*2.4e-3,text_shift[1]*0.98e-13,r'{\bf BRASS}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([2.1e-3,0.7e-3],[0.95e-13,1.9e-12],'k-',lw=1.5)
             else:
@@ -927,16 +1241,14 @@ class AxionPhoton():
     def BREAD(ax,col='firebrick',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1]):
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/BREAD.txt")
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/BREAD.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*7e-3,text_shift[1]*2.5e-13,r'{\bf BREAD}',fontsize=18,color=col,rotation=0,ha='left',va='top',clip_on=True)
                 plt.plot([5.5e-3,3e-3],[1.9e-13,2.9e-13],'k-',lw=1.5)
             else:
@@ -948,17 +1260,17 @@ class AxionPhoton():
         # TOORAD arXiv[1807.08810]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/TOORAD_2025.txt")
+            view = 'g'
+        with MassWindow(None): # whole curve, masses in meV
+            dat = loadtxt("limit_data/AxionPhoton/Projections/TOORAD_2025.txt")
         dat[:,0] *= 1e-3
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.1)
+        dat = ApplyView(dat,view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*0.7e-2,text_shift[1]*3e-11,r'{\bf TOO}',fontsize=12,ha='center',color=col,clip_on=True)
                 plt.text(text_shift[0]*0.7e-2,text_shift[1]*1.5e-11,r'{\bf RAD}',fontsize=12,ha='center',color=col,clip_on=True)
             else:
@@ -970,16 +1282,14 @@ class AxionPhoton():
         # LAMPOST arXiv[1803.11455]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/Projections/LAMPOST.txt",delimiter=',')
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'-',linewidth=1.5,color=col,zorder=0)
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,facecolor=col,zorder=0,alpha=0.1)
+            view = 'g'
+        dat = LimitView("limit_data/AxionPhoton/Projections/LAMPOST.txt",view)
+        plt.plot(dat[:,0],dat[:,1],'-',linewidth=1.5,color=col,zorder=0)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,facecolor=col,zorder=0,alpha=0.1)
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1.55e-1,text_shift[1]*3.5e-11,r'{\bf LAMPOST}',rotation=rotation,fontsize=fs,color=col,ha='left',va='top',clip_on=True)
             else:
                 plt.text(text_shift[0]*0.9e-1,text_shift[1]*1.9e-1,r'{\bf LAMPOST}',rotation=0,fontsize=fs,color=col,ha='left',va='top',clip_on=True)
@@ -1019,7 +1329,8 @@ class AxionPhoton():
     
     def ADBC1(ax,col='red',fs=12,text_on=True,lw=1,text_pos=[0.3e-7,3e-8],rotation=90,zorder=0.8,edgealpha=1):
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/ADBC.txt")
+        with MassWindow(None): # whole curve, the edge is every other point
+            dat = loadtxt("limit_data/AxionPhoton/ADBC.txt")
         n = shape(dat)[0]
         x = dat[arange(0,n,2),0]
         y = dat[arange(0,n,2),1]
@@ -1034,7 +1345,8 @@ class AxionPhoton():
     def SHAFT(ax,col='red',fs=16,text_on=True,lw=1,text_pos=[0.8e-10,3e-10],rotation=0,zorder=1.8,edgealpha=1):
         # SHAFT arXiv:[2003.03348]
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/SHAFT.txt")
+        with MassWindow(None): # whole curve, the edge is every other point
+            dat = loadtxt("limit_data/AxionPhoton/SHAFT.txt")
         n = shape(dat)[0]
         x = dat[arange(0,n,2),0]
         y = dat[arange(0,n,2),1]
@@ -1048,7 +1360,8 @@ class AxionPhoton():
     def UPLOAD(ax,col='tomato',fs=16,text_on=False):
         # UPLOAD arXiv:[1912.07751]
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/UPLOAD.txt")
+        with MassWindow(None): # whole curve, the edge is every other point
+            dat = loadtxt("limit_data/AxionPhoton/UPLOAD.txt")
         n = shape(dat)[0]
         x = dat[arange(0,n,2),0]
         y = dat[arange(0,n,2),1]
@@ -1064,15 +1377,13 @@ class AxionPhoton():
     def BASE(ax,col='crimson',fs=15,RescaleByMass=False,text_on=True,text_shift=[1,1],zorder=1.9,lw=2.5,arrow_on=True):
         # BASE https://inspirehep.net/literature/1843024
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = zorder
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = zorder
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/BASE.txt")
+        dat = LimitView("limit_data/AxionPhoton/BASE.txt",view)
 
         if arrow_on:
             fig = plt.gcf()
@@ -1081,68 +1392,64 @@ class AxionPhoton():
               head_width=0.007, head_length=0.016, overhang=0.13,
               edgecolor='crimson',facecolor='crimson',clip_on=True)
 
-        if rs1==0:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=lw,zorder=zo)
+        if view=='g':
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=lw,zorder=zo)
             if text_on:
                 plt.text(text_shift[0]*3e-9,text_shift[1]*1.e-12,r'{\bf BASE}',fontsize=fs,color=col,rotation=90,ha='center',va='top',clip_on=True)
         else:
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color='k',lw=lw+2,zorder=zo)
-            plt.plot([dat[0,0],dat[0,0]],[dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),y2/(rs1*2e-10*dat[0,0]+rs2)],color=col,lw=lw+1,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color='k',lw=lw+2,zorder=zo)
+            plt.plot([dat[0,0],dat[0,0]],[dat[0,1],ViewCoupling(dat[0,0],y2,view)],color=col,lw=lw+1,zorder=zo)
             if text_on:
                 plt.text(text_shift[0]*dat[0,0]*1.2,text_shift[1]*y2*1.2,r'{\bf BASE}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(dat[0,0],dat[0,1]/(rs1*2e-10*dat[0,0]+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
+            plt.plot(dat[0,0],dat[0,1],'.',markersize=15,color=col,markeredgecolor='k',zorder=zo)
 
         return
 
     def ADMX_SLIC(ax,col='crimson',fs=12,RescaleByMass=False,text_on=True,text_shift=[1,1],zorder=0.005):
         # ADMX SLIC https://arxiv.org/pdf/1911.05772.pdf
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
             zo = zorder
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
             zo = zorder
         y2 = ax.get_ylim()[1]
         dat = loadtxt("limit_data/AxionPhoton/ADMX_SLIC.txt")
         x = mean(dat[:,0])
         y = amin(dat[:,1])
-        if rs1==0:
-            plt.plot([x,x],[y/(rs1*2e-10*x+rs2),y2/(rs1*2e-10*x+rs2)],color=col,lw=2,zorder=zorder)
+        if view=='g':
+            plt.plot([x,x],[ViewCoupling(x,y,view),ViewCoupling(x,y2,view)],color=col,lw=2,zorder=zorder)
             if text_on:
                 plt.text(text_shift[0]*2.4e-7,text_shift[1]*0.2e-11,r'{\bf ADMX SLIC}',fontsize=fs,color=col,rotation=-90,ha='center',va='top',clip_on=True)
         else:
-            plt.plot([x,x],[y/(rs1*2e-10*x+rs2),y2/(rs1*2e-10*x+rs2)],color='k',lw=4,zorder=zorder)
-            plt.plot([x,x],[y/(rs1*2e-10*x+rs2),y2/(rs1*2e-10*x+rs2)],color=col,lw=3,zorder=zorder)
+            plt.plot([x,x],[ViewCoupling(x,y,view),ViewCoupling(x,y2,view)],color='k',lw=4,zorder=zorder)
+            plt.plot([x,x],[ViewCoupling(x,y,view),ViewCoupling(x,y2,view)],color=col,lw=3,zorder=zorder)
             if text_on:
                 plt.text(text_shift[0]*x,text_shift[1]*y2*1.2,r'{\bf ADMX SLIC}',fontsize=fs,color=col,rotation=40,ha='left',rotation_mode='anchor')
-            plt.plot(x,y/(rs1*2e-10*x+rs2),'.',markersize=15,color=col,markeredgecolor='k',zorder=zorder)
+            plt.plot(x,ViewCoupling(x,y,view),'.',markersize=15,color=col,markeredgecolor='k',zorder=zorder)
 
         return
 
     def ALPS(ax,projection=True,col=[0.8, 0.25, 0.33],fs=15,lw=1.5,RescaleByMass=False,text_on=True,lw_proj=1.5,lsty_proj='-',col_proj='k',text_shift_x=1,text_shift_y=1,block=True):
         # ALPS-I arXiv:[1004.1313]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
 
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/AxionPhoton/ALPS.txt")
+        dat = LimitView("limit_data/AxionPhoton/ALPS.txt",view)
 
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=1.53,lw=0.01)
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'k-',lw=lw,zorder=1.53,alpha=1)
-        if rs1==0:
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=1.53,lw=0.01)
+        plt.plot(dat[:,0],dat[:,1],'k-',lw=lw,zorder=1.53,alpha=1)
+        if view=='g':
             if text_on: plt.text(1e-5*text_shift_x,8e-8*text_shift_y,r'{\bf ALPS-I}',fontsize=20,color='w',clip_on=True,path_effects=line_background(1.5,'k'))
         if projection:
-            dat = loadtxt("limit_data/AxionPhoton/Projections/ALPS-II.txt")
+            dat = LimitView("limit_data/AxionPhoton/Projections/ALPS-II.txt",view).copy()
             if block:
                 mask = dat[:,0]<0.85e-6
                 dat[mask,0] = nan
-            plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),linestyle=lsty_proj,lw=lw_proj,zorder=1.5,color=col_proj,alpha=0.5)
+            plt.plot(dat[:,0],dat[:,1],linestyle=lsty_proj,lw=lw_proj,zorder=1.5,color=col_proj,alpha=0.5)
             if RescaleByMass:
                 plt.text(9e-4*text_shift_x,2.5e3*text_shift_y,r'{\bf ALPS-II}',fontsize=20,color='k',rotation=20,alpha=0.5,clip_on=True)
             else:
@@ -1185,25 +1492,24 @@ class AxionPhoton():
         # CAST arXiv:[1705.02290]
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
-        dat = loadtxt("limit_data/AxionPhoton/CAST_highm.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor='k',facecolor=col,zorder=1.49,lw=0.1)
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'k-',lw=1.5,zorder=1.49,alpha=1)
+            view = 'g'
+        with MassWindow(None): # whole curve, for its third-last point
+            dat = LimitView("limit_data/AxionPhoton/CAST_highm.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor='k',facecolor=col,zorder=1.49,lw=0.1)
+        plt.plot(dat[:,0],dat[:,1],'k-',lw=1.5,zorder=1.49,alpha=1)
 
         mf = dat[-3,0]
         gf = dat[-3,1]
-        dat = loadtxt("limit_data/AxionPhoton/CAST.txt")
-        plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor='none',facecolor=col,zorder=1.5,lw=0.1)
-        plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'k-',lw=1.5,zorder=1.5,alpha=1)
+        dat = LimitView("limit_data/AxionPhoton/CAST.txt",view)
+        plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor='none',facecolor=col,zorder=1.5,lw=0.1)
+        plt.plot(dat[:,0],dat[:,1],'k-',lw=1.5,zorder=1.5,alpha=1)
 
-        gi = 10.0**interp(log10(mf),log10(dat[:,0]),log10(dat[:,1]))/(rs1*2e-10*mf+rs2)
+        gi = 10.0**interp(log10(mf),log10(dat[:,0]),log10(dat[:,1]))
         plt.plot([mf,mf],[gf,gi],'k-',lw=1.5,zorder=1.5)
         if text_on==True:
-            if rs1==0:
+            if view=='g':
                 plt.text(1e-1,1.5e-9,r'{\bf CAST}',fontsize=fs+4,color='w',rotation=0,ha='center',va='top',clip_on=True,path_effects=line_background(1.5,'k'))
             else:
                 plt.text(4e-2,5e3,r'{\bf CAST}',fontsize=fs+4,color='w',rotation=0,ha='center',va='top',clip_on=True,path_effects=line_background(1.5,'k'))
@@ -1211,11 +1517,11 @@ class AxionPhoton():
         if projection:
             # IAXO arXiv[1212.4633]
             IAXO_col = 'purple'
-            IAXO = loadtxt("limit_data/AxionPhoton/Projections/IAXO.txt")
-            plt.plot(IAXO[:,0],IAXO[:,1]/(rs1*2e-10*IAXO[:,0]+rs2),'--',linewidth=2.5,color=IAXO_col,zorder=-1)
-            plt.fill_between(IAXO[:,0],IAXO[:,1]/(rs1*2e-10*IAXO[:,0]+rs2),y2=y2,edgecolor=None,facecolor=IAXO_col,zorder=-1,alpha=0.3)
+            IAXO = LimitView("limit_data/AxionPhoton/Projections/IAXO.txt",view)
+            plt.plot(IAXO[:,0],IAXO[:,1],'--',linewidth=2.5,color=IAXO_col,zorder=-1)
+            plt.fill_between(IAXO[:,0],IAXO[:,1],y2=y2,edgecolor=None,facecolor=IAXO_col,zorder=-1,alpha=0.3)
             if text_on==True:
-                if rs1==0:
+                if view=='g':
                     plt.text(0.5e-3,7.3e-12,r'{\bf IAXO}',fontsize=23,color='purple',rotation=0,clip_on=True)
                 else:
                     plt.text(0.7e-2,0.12e1,r'{\bf IAXO}',fontsize=fs,color=IAXO_col,rotation=-18,clip_on=True)
@@ -1618,11 +1924,9 @@ class AxionPhoton():
 
         y2 = ax.get_ylim()[1]
         if RescaleByMass:
-            rs1 = 1.0
-            rs2 = 0.0
+            view = 'C'
         else:
-            rs1 = 0.0
-            rs2 = 1.0
+            view = 'g'
         # dat = loadtxt('limit_data/AxionPhoton/NeutronStars_GreenBank.txt')
         # plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
         # plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'k-',alpha=0.5,lw=0.5,zorder=0)
@@ -1635,20 +1939,22 @@ class AxionPhoton():
         # plt.fill_between(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
         # plt.plot(dat[:,0],dat[:,1]/(rs1*2e-10*dat[:,0]+rs2),'k-',alpha=0.5,lw=0.5,zorder=0)
 
-        dat = loadtxt('limit_data/AxionPhoton/NeutronStars_BreakthroughListen.txt')
-        plt.fill_between(dat[0::xskip,0],dat[0::xskip,1]/(rs1*2e-10*dat[0::xskip,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
-        plt.plot(dat[0::xskip,0],dat[0::xskip,1]/(rs1*2e-10*dat[0::xskip,0]+rs2),'k-',alpha=edgealpha,lw=lw,zorder=0.1)
-        if (xskip>1)&(rs1==0.0):
+        with MassWindow(None): # whole curves, drawn every xskip-th point
+            dat = LimitView('limit_data/AxionPhoton/NeutronStars_BreakthroughListen.txt',view)
+        plt.fill_between(dat[0::xskip,0],dat[0::xskip,1],y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
+        plt.plot(dat[0::xskip,0],dat[0::xskip,1],'k-',alpha=edgealpha,lw=lw,zorder=0.1)
+        if (xskip>1)&(view=='g'):
             plt.plot([dat[-2,0],dat[-1,0]],[dat[-2,1],dat[-1,1]],'k-',alpha=edgealpha,lw=lw,zorder=0.1)
 
-        dat = loadtxt('limit_data/AxionPhoton/NeutronStars_Battye2.txt')
-        plt.fill_between(dat[0::xskip,0],dat[0::xskip,1]/(rs1*2e-10*dat[0::xskip,0]+rs2),y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
-        plt.plot(dat[0::xskip,0],dat[0::xskip,1]/(rs1*2e-10*dat[0::xskip,0]+rs2),'k-',alpha=edgealpha,lw=lw,zorder=0.1)
-        if (xskip>1)&(rs1==0.0):
+        with MassWindow(None):
+            dat = LimitView('limit_data/AxionPhoton/NeutronStars_Battye2.txt',view)
+        plt.fill_between(dat[0::xskip,0],dat[0::xskip,1],y2=y2,edgecolor=None,facecolor=col,zorder=0.1)
+        plt.plot(dat[0::xskip,0],dat[0::xskip,1],'k-',alpha=edgealpha,lw=lw,zorder=0.1)
+        if (xskip>1)&(view=='g'):
             plt.plot([dat[-2,0],dat[-1,0]],[dat[-2,1],dat[-1,1]],'k-',alpha=edgealpha,lw=lw,zorder=0.1)
 
         if text_on:
-            if rs1==0:
+            if view=='g':
                 plt.text(text_shift[0]*1e-5,text_shift[1]*0.62e-10,r'{\bf Neutron stars}',fontsize=fs,color=text_col,ha='left',va='bottom')
             else:
                 plt.text(text_shift[0]*1e-7,text_shift[1]*4e3,r'{\bf Neutron}',fontsize=fs,color=col,ha='center')
@@ -2531,7 +2837,8 @@ class AxionNeutron():
         # Old comagnetometer data arXiv:[1907.03767]
         y2 = ax.get_ylim()[1]
         zo = 0.3
-        dat = loadtxt("limit_data/AxionNeutron/OldComagnetometers.txt")
+        with MassWindow(None): # whole curve, less its last 30 points
+            dat = loadtxt("limit_data/AxionNeutron/OldComagnetometers.txt")
         dat[:,1] *= 2*AxionNeutron.m_n
         plt.plot(dat[:-30,0],dat[:-30,1],'-',color='k',alpha=1,zorder=zo,lw=2.5)
         plt.fill_between(dat[:-30,0],dat[:-30,1],y2=y2,edgecolor=None,facecolor=col,zorder=zo,alpha=1.0)
@@ -3400,6 +3707,7 @@ class DarkPhoton():
              Grid=False,Shape='Rectangular',mathpazo=True,\
              TopAndRightTicks=False,FrequencyAxis=True,FrequencyLabels=True,UnitAxis=True,f_rescale=1,\
             tick_rotation = 20,width=20,height=10,upper_tickdir='out'):
+        args = dict(locals(),FigSetup='DarkPhoton')
 
         plt.rcParams['axes.linewidth'] = lw
         plt.rc('text', usetex=True)
@@ -3408,6 +3716,11 @@ class DarkPhoton():
         if mathpazo:
             plt.rcParams.update({"text.usetex": True,"font.family": "serif","font.serif": ["Palatino"],})
 
+        key = TemplateKey(args)
+        template = FromTemplate(key)
+        if template is not None:
+            return template
+
 
         if Shape=='Wide':
             fig = plt.figure(figsize=(16.5,5))
@@ -3468,6 +3781,7 @@ class DarkPhoton():
             ax2.set_xlim([m_min*241.8*1e12/f_rescale,m_max*241.8*1e12/f_rescale])
 
             plt.sca(ax)
+        SaveTemplate(key,fig)
         return fig,ax
 
 
@@ -3603,7 +3917,8 @@ class DarkPhoton():
 
     def Xenon(ax,col='crimson',fs=23,text_on=True,lw=1.5):
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/DarkPhoton/Xenon1T.txt")
+        with MassWindow(None): # whole curve, masses in keV
+            dat = loadtxt("limit_data/DarkPhoton/Xenon1T.txt")
         dat[:,1] = dat[:,1]*sqrt(0.3/0.45)
 
         plt.fill_between(1e3*dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor=col,zorder=0.5)
@@ -3643,7 +3958,8 @@ class DarkPhoton():
 
 
     def DAMIC(ax,col='salmon',fs=21,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None): # whole curve, interpolated at the limit's masses
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/DAMIC.txt")
         dat[:,1] = dat[:,1]*sqrt(0.3/0.45)
 
@@ -3659,8 +3975,10 @@ class DarkPhoton():
         return
 
     def MuDHI(ax,col='#a8324a',fs=15,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
-        dat = loadtxt("limit_data/DarkPhoton/MuDHI.txt")
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None): # whole curve, drawn every other point
+            dat = loadtxt("limit_data/DarkPhoton/MuDHI.txt")
 
         y2 = interp(dat[:,0],m1,y1)
         dat[dat[:,1]>y2,1] = y2[dat[:,1]>y2]
@@ -3674,7 +3992,8 @@ class DarkPhoton():
 
 
     def FUNK(ax,col='red',fs=21,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/FUNK.txt")
         dat[:,1] = dat[:,1]*sqrt(0.3/0.45)*sqrt(2/3/0.27)
 
@@ -3726,7 +4045,8 @@ class DarkPhoton():
         return
     
     def Nanowire(ax,col='pink',fs=22,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/WSi_Nanowire.txt")
         dat[:,1] = dat[:,1]*sqrt(0.3/0.45)
         y2 = interp(dat[:,0],m1,y1)
@@ -3752,7 +4072,8 @@ class DarkPhoton():
 
 
     def LAMPOST(ax,col='#471710',fs=15,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/LAMPOST.txt")
         dat[:,1] = dat[:,1]*sqrt(0.4/0.45)*sqrt(2/3/0.27)
 
@@ -3768,7 +4089,8 @@ class DarkPhoton():
         return
 
     def Tokyo(ax,col='darkred',fs=15,text_on=False,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/Tokyo-Dish.txt")
         dat[:,1] = dat[:,1]*sqrt(2/3/0.6)
         y2 = interp(dat[:,0],m1,y1)
@@ -3792,7 +4114,8 @@ class DarkPhoton():
         return
 
     def FAST(ax,col='tomato',fs=10,text_on=False,lw=1.5,edge_on=False,zorder=0.11):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/FAST.txt")
         dat[:,1] = dat[:,1]*sqrt(2/3/0.6)
         y2 = interp(dat[:,0],m1,y1)
@@ -3807,7 +4130,8 @@ class DarkPhoton():
         return
     
     def BRASS(ax,col='darkred',fs=10,text_on=False,lw=1.5,edge_on=False,zorder=0.01):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/BRASS-p.txt")
         dat[:,1] = dat[:,1]*sqrt(1/3/0.26)*sqrt(0.3/0.45)
         y2 = interp(dat[:,0],m1,y1)
@@ -3822,7 +4146,8 @@ class DarkPhoton():
         return
     
     def SHANHE(ax,col='darkred',fs=10,text_on=False,lw=1.5,edge_on=False,zorder=0.01):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/SHANHE.txt")
         dat[:,1] = dat[:,1]*sqrt(1/3/0.02472551)
         y2 = interp(dat[:,0],m1,y1)
@@ -3837,7 +4162,8 @@ class DarkPhoton():
         return
     
     def ParkerSolarProbe(ax,col='#052ea1',fs=14,text_on=True,lw=1.5,edge_on=True,zorder=0.11,rotation=20):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/ParkerSolarProbe.txt")
 
         y2 = interp(dat[:,0],m1,y1)
@@ -3853,7 +4179,8 @@ class DarkPhoton():
 
     def LOFAR(ax,col='red',fs=10,text_on=False,lw=1.5,edge_on=False,zorder=0.11):
         # Solar corona bound
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/LOFAR.txt")
         dat[:,1] = dat[:,1]*sqrt(0.3/0.45)
         y2 = interp(dat[:,0],m1,y1)
@@ -4048,7 +4375,8 @@ class DarkPhoton():
         pek=[pe.Stroke(linewidth=7, foreground='k'), pe.Normal()]
 
         # Combined limits
-        dat = loadtxt("limit_data/DarkPhoton/DM_combined.txt")
+        with MassWindow(None): # whole curve, dashed from its 40th point
+            dat = loadtxt("limit_data/DarkPhoton/DM_combined.txt")
         plt.plot(dat[:,0],dat[:,1],'-',color='w',alpha=1,zorder=zo+0.1,lw=2.5,path_effects=pek)
         plt.fill_between(dat[:,0],dat[:,1],y2=y2,edgecolor=None,facecolor='lightgray',zorder=zo,alpha=1.0)
         plt.plot([1e-16,dat[0,0]],[dat[0,1],dat[0,1]],'--',color='w',alpha=1,zorder=zo+0.1,lw=2.5,path_effects=pek)
@@ -4198,7 +4526,8 @@ class DarkPhoton():
 
 
     def JWST(ax,col='#2d4d6e',fs=12,text_on=True,lw=1.5):
-        m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
+        with MassWindow(None):
+            m1,y1 = loadtxt("limit_data/DarkPhoton/DM_combined.txt",unpack=True)
         dat = loadtxt("limit_data/DarkPhoton/JWST.txt")
 
         y2 = interp(dat[:,0],m1,y1)
@@ -4272,7 +4601,8 @@ class DarkPhoton():
     
     def AMAILS(ax,col='#b2413e',fs=14,text_on=True,lw=1):
         y2 = ax.get_ylim()[1]
-        dat = loadtxt("limit_data/DarkPhoton/AMAILS.txt")
+        with MassWindow(None): # whole curve, drawn every other point
+            dat = loadtxt("limit_data/DarkPhoton/AMAILS.txt")
         plt.fill_between(dat[::2,0],dat[::2,1],y2=y2,edgecolor=None,facecolor=col,zorder=1)
         plt.plot(dat[::2,0],dat[::2,1],color='k',alpha=1,zorder=1,lw=lw)
 
@@ -4294,11 +4624,106 @@ class DarkPhoton():
 
 
 #==============================================================================#
-def MySaveFig(fig,pltname,pngsave=True):
-    fig.savefig(pltdir+pltname+'.pdf',bbox_inches='tight')
+# Compact vector export
+# With many limits, the filled regions are most of the bytes of a PDF or SVG
+# (fill_between keeps every point of each envelope) and most of the time spent
+# writing and opening it. Inside RasterisedFills the fills are drawn as images
+# at the savefig dpi, while edges and labels stay vector: a fill's own edge is
+# drawn by a vector copy, and lines are simplified to edge_tolerance (points)
+# instead of matplotlib's default of 1/9.
+# Each run of rasterised artists in drawing order becomes one image of the
+# whole figure, so the fills of a zorder are moved just ahead of the other
+# artists of that zorder (edges of a zorder are drawn over all its fills):
+# one image per zorder instead of one per limit.
+FILL_NUDGE = 1e-6
+
+def _filled(art):
+    if isinstance(art,mpl.collections.PolyCollection):
+        fc = art.get_facecolor()
+        return len(fc)>0 and (fc[:,3]>0).any()
+    if isinstance(art,mpl.patches.Patch):
+        return art.get_fill() and art.get_facecolor()[3]>0
+    return False
+
+def _edge(art):
+    # A vector copy of the edge of a filled artist, or None if it has none
+    if isinstance(art,mpl.collections.PolyCollection):
+        lw = art.get_linewidths()
+        if not ((len(lw)>0) and (max(lw)>0) and (art.get_edgecolor()[:,3]>0).any()):
+            return None
+        edge = mpl.collections.LineCollection([p.vertices for p in art.get_paths()],
+                    colors=art.get_edgecolor(),linewidths=lw,linestyles=art.get_linestyles(),
+                    transform=art.get_transform(),zorder=art.get_zorder())
+    else:
+        if not ((art.get_linewidth()>0) and (art.get_edgecolor()[3]>0)):
+            return None
+        edge = mpl.patches.PathPatch(art.get_path(),fill=False,edgecolor=art.get_edgecolor(),
+                    linewidth=art.get_linewidth(),linestyle=art.get_linestyle(),
+                    transform=art.get_transform(),zorder=art.get_zorder())
+    edge.set_clip_on(art.get_clip_on())
+    edge.set_clip_box(art.get_clip_box())
+    edge.set_clip_path(art.get_clip_path())
+    return edge
+
+@contextmanager
+def RasterisedFills(fig,edge_tolerance=0.5):
+    changed = []
+    added = []
+    try:
+        for ax in fig.axes:
+            fills = [art for art in ax.collections+ax.patches if art.get_visible() and _filled(art)]
+            for art in fills:
+                edge = _edge(art)
+                z = art.get_zorder()
+                changed.append((art,art.get_rasterized(),art.get_linewidth(),z))
+                art.set_rasterized(True)
+                art.set_zorder(z-FILL_NUDGE)
+                if edge is not None:
+                    art.set_linewidth(0)
+                    added.append(ax.add_artist(edge) if isinstance(edge,mpl.patches.Patch)
+                                 else ax.add_collection(edge,autolim=False))
+        with plt.rc_context({'path.simplify':True,'path.simplify_threshold':edge_tolerance}):
+            yield fig
+    finally:
+        for edge in added:
+            edge.remove()
+        for art,rasterized,lw,z in changed:
+            art.set_rasterized(rasterized)
+            art.set_linewidth(lw)
+            art.set_zorder(z)
+
+def CompareExports(fig,raster_dpi=150,formats=('pdf','svg')):
+    # [(format, bytes, seconds as is, bytes, seconds with RasterisedFills)]
+    import io
+    bbox = TightBBox(fig)
+    rows = []
+    for fmt in formats:
+        row = [fmt]
+        for compact in (False,True):
+            buf = io.BytesIO()
+            t = time.perf_counter()
+            if compact:
+                with RasterisedFills(fig):
+                    fig.savefig(buf,format=fmt,bbox_inches=bbox,dpi=raster_dpi)
+            else:
+                fig.savefig(buf,format=fmt,bbox_inches=bbox)
+            row += [len(buf.getvalue()),time.perf_counter()-t]
+        rows.append(tuple(row))
+    return rows
+
+def MySaveFig(fig,pltname,pngsave=True,raster_dpi=None):
+    # raster_dpi: if given, the PDF has its fills rasterised at this dpi
+    # (RasterisedFills)
+    bbox = TightBBox(fig) # measured once for both files
+    if raster_dpi is None:
+        fig.savefig(pltdir+pltname+'.pdf',bbox_inches=bbox)
+    else:
+        with RasterisedFills(fig):
+            fig.savefig(pltdir+pltname+'.pdf',bbox_inches=bbox,dpi=raster_dpi)
     if pngsave:
         fig.set_facecolor('w') # <- not sure what matplotlib fucked up in the new version but it seems impossible to set png files to be not transparent now
-        fig.savefig(pltdir_png+pltname+'.png',bbox_inches='tight',transparent=False)
+        fig.savefig(pltdir_png+pltname+'.png',bbox_inches=bbox,transparent=False)
+#==============================================================================#
 
 def cbar(mappable,extend='neither',minorticklength=8,majorticklength=10,\
             minortickwidth=2,majortickwidth=2.5,pad=0.2,side="right",orientation="vertical"):
@@ -4455,12 +4880,39 @@ def reverse_colourmap(cmap, name = 'my_cmap_r'):
 
 from matplotlib import patches
 from matplotlib import text as mtext
+from matplotlib.path import Path
+from matplotlib.textpath import text_to_path
+from matplotlib.transforms import IdentityTransform
 import numpy as np
 import math
 
+def _glyphs(s,prop,ismath=False):
+    # [(vertices, codes)] of every glyph (and rule, e.g. a fraction bar) of s
+    # in points, laid out on one line as a Text with the same ismath (False,
+    # True for mathtext, or 'TeX' for usetex) would be
+    prop = prop.copy()
+    scale = prop.get_size_in_points()/text_to_path.FONT_SCALE
+    prop.set_size(text_to_path.FONT_SCALE)
+    if ismath=='TeX':
+        info,glyph_map,rects = text_to_path.get_glyphs_tex(prop,s)
+    elif ismath:
+        info,glyph_map,rects = text_to_path.get_glyphs_mathtext(prop,s)
+    else:
+        info,glyph_map,rects = text_to_path.get_glyphs_with_font(text_to_path._get_font(prop),s)
+    glyphs = [((np.asarray(glyph_map[g][0])*k+[x,y])*scale,np.asarray(glyph_map[g][1],dtype=np.uint8))
+              for g,x,y,k in info]
+    glyphs += [(np.asarray(v,dtype=float)*scale,np.asarray(c,dtype=np.uint8)) for v,c in rects]
+    return [(v,c) for v,c in glyphs if len(v)]
+
 class CurvedText(mtext.Text):
     """
     A text object that follows an arbitrary curve.
+
+    The glyph outlines of the text are made once, laid out as a Text would
+    lay them out (mathtext, or TeX with usetex), and on draw they are
+    rotated and moved along the curve all at once and drawn as a single
+    path. The result is kept until the axes limits, position or figure size
+    change, so a curved label costs about as much as a normal one.
     """
     def __init__(self, x, y, text, axes, **kwargs):
         super(CurvedText, self).__init__(x[0],y[0],' ', **kwargs)
@@ -4468,151 +4920,84 @@ class CurvedText(mtext.Text):
         axes.add_artist(self)
 
         ##saving the curve:
-        self.__x = x
-        self.__y = y
-        self.__zorder = self.get_zorder()
-
-        ##creating the text objects
-        self.__Characters = []
-        for c in text:
-            if c == ' ':
-                ##make this an invisible 'a':
-                t = mtext.Text(0,0,'a')
-                t.set_alpha(0.0)
-            else:
-                t = mtext.Text(0,0,c, **kwargs)
-
-            #resetting unnecessary arguments
-            t.set_ha('center')
-            t.set_rotation(0)
-            t.set_zorder(self.__zorder +1)
-
-            self.__Characters.append((c,t))
-            axes.add_artist(t)
-
-
-    ##overloading some member functions, to assure correct functionality
-    ##on update
-    def set_zorder(self, zorder):
-        super(CurvedText, self).set_zorder(zorder)
-        self.__zorder = self.get_zorder()
-        for c,t in self.__Characters:
-            t.set_zorder(self.__zorder+1)
+        self.__x = np.asarray(x,dtype=float)
+        self.__y = np.asarray(y,dtype=float)
+
+        ##glyph outlines in points, each centred on its own origin, and the
+        ##centre and right edge of each glyph along the baseline, as the text
+        ##would be laid out on a straight line (kerning, mathtext and TeX)
+        prop = self.get_fontproperties()
+        s,ismath = self._preprocess_math(text)
+        glyphs = _glyphs(s,prop,ismath)
+        left = np.array([v[:,0].min() for v,c in glyphs]) if glyphs else np.zeros(0)
+        right = np.array([v[:,0].max() for v,c in glyphs]) if glyphs else np.zeros(0)
+        self.__centres = (left+right)/2
+        self.__right = right
+        self.__verts = np.concatenate([v-[m,0] for (v,c),m in zip(glyphs,self.__centres)]) if glyphs else np.zeros((0,2))
+        self.__codes = np.concatenate([c for v,c in glyphs]) if glyphs else np.zeros(0,dtype=np.uint8)
+        self.__owner = np.concatenate([np.full(len(v),k) for k,(v,c) in enumerate(glyphs)]) if glyphs else np.zeros(0,dtype=int)
+        _,h,d = text_to_path.get_text_width_height_descent(s,prop,ismath)
+        self.__height = (h,d)
+
+        self.__patch = patches.PathPatch(Path(np.zeros((0,2))),lw=0,transform=IdentityTransform())
+        self.__key = None
+
+    def baseline_shift(self):
+        ##offset of the baseline from the curve, for the vertical alignment
+        h,d = self.__height
+        return {'baseline':0,'bottom':d,'top':-(h-d),
+                'center':(d-(h-d))/2,'center_baseline':-(h-d)/2}[self.get_va()]
 
     def draw(self, renderer, *args, **kwargs):
         """
-        Overload of the Text.draw() function. Do not do
-        do any drawing, but update the positions and rotation
-        angles of self.__Characters.
+        Overload of the Text.draw() function: draws the glyphs along the
+        curve, rebuilding them only when the view has changed.
         """
-        self.update_positions(renderer)
+        if not self.get_visible():
+            return
+        key = (self.axes.get_xlim(),self.axes.get_ylim(),tuple(self.axes.bbox.bounds))
+        if key!=self.__key:
+            self.__patch.set_path(self.update_positions(renderer))
+            self.__key = key
+        patch = self.__patch
+        patch.set_figure(self.figure)
+        patch.set_facecolor(self.get_color())
+        patch.set_alpha(self.get_alpha())
+        patch.set_zorder(self.get_zorder())
+        if self.get_clip_on():
+            patch.set_clip_box(self.axes.bbox)
+        else:
+            patch.set_clip_box(None)
+        patch.draw(renderer)
+
+    def get_window_extent(self, renderer=None, dpi=None):
+        return self.__patch.get_window_extent(renderer)
 
     def update_positions(self,renderer):
         """
-        Update positions and rotations of the individual text elements.
+        The glyphs placed along the curve, as one path in display coordinates.
         """
-
-        #preparations
-
-        ##determining the aspect ratio:
-        ##from https://stackoverflow.com/a/42014041/2454357
-
-        ##data limits
-        xlim = self.axes.get_xlim()
-        ylim = self.axes.get_ylim()
-        ## Axis size on figure
-        figW, figH = self.axes.get_figure().get_size_inches()
-        ## Ratio of display units
-        _, _, w, h = self.axes.get_position().bounds
-        ##final aspect ratio
-        aspect = ((figW * w)/(figH * h))*(ylim[1]-ylim[0])/(xlim[1]-xlim[0])
-
-        #points of the curve in figure coordinates:
-        x_fig,y_fig = (
-            np.array(l) for l in zip(*self.axes.transData.transform([
-            (i,j) for i,j in zip(self.__x,self.__y)
-            ]))
-        )
-
-        #point distances in figure coordinates
-        x_fig_dist = (x_fig[1:]-x_fig[:-1])
-        y_fig_dist = (y_fig[1:]-y_fig[:-1])
-        r_fig_dist = np.sqrt(x_fig_dist**2+y_fig_dist**2)
-
-        #arc length in figure coordinates
-        l_fig = np.insert(np.cumsum(r_fig_dist),0,0)
-
-        #angles in figure coordinates
-        rads = np.arctan2((y_fig[1:] - y_fig[:-1]),(x_fig[1:] - x_fig[:-1]))
-        degs = np.rad2deg(rads)
-
-
-        rel_pos = 10
-        for c,t in self.__Characters:
-            #finding the width of c:
-            t.set_rotation(0)
-            t.set_va('center')
-            bbox1  = t.get_window_extent(renderer=renderer)
-            w = bbox1.width
-            h = bbox1.height
-
-            #ignore all letters that don't fit:
-            if rel_pos+w/2 > l_fig[-1]:
-                t.set_alpha(0.0)
-                rel_pos += w
-                continue
-
-            elif c != ' ':
-                t.set_alpha(1.0)
-
-            #finding the two data points between which the horizontal
-            #center point of the character will be situated
-            #left and right indices:
-            il = np.where(rel_pos+w/2 >= l_fig)[0][-1]
-            ir = np.where(rel_pos+w/2 <= l_fig)[0][0]
-
-            #if we exactly hit a data point:
-            if ir == il:
-                ir += 1
-
-            #how much of the letter width was needed to find il:
-            used = l_fig[il]-rel_pos
-            rel_pos = l_fig[il]
-
-            #relative distance between il and ir where the center
-            #of the character will be
-            fraction = (w/2-used)/r_fig_dist[il]
-
-            ##setting the character position in data coordinates:
-            ##interpolate between the two points:
-            x = self.__x[il]+fraction*(self.__x[ir]-self.__x[il])
-            y = self.__y[il]+fraction*(self.__y[ir]-self.__y[il])
-
-            #getting the offset when setting correct vertical alignment
-            #in data coordinates
-            t.set_va(self.get_va())
-            bbox2  = t.get_window_extent(renderer=renderer)
-
-            bbox1d = self.axes.transData.inverted().transform(bbox1)
-            bbox2d = self.axes.transData.inverted().transform(bbox2)
-            dr = np.array(bbox2d[0]-bbox1d[0])
-
-            #the rotation/stretch matrix
-            rad = rads[il]
-            rot_mat = np.array([
-                [math.cos(rad), math.sin(rad)*aspect],
-                [-math.sin(rad)/aspect, math.cos(rad)]
-            ])
-
-            ##computing the offset vector of the rotated character
-            drp = np.dot(dr,rot_mat)
-
-            #setting final position and rotation:
-            t.set_position(np.array([x,y])+drp)
-            t.set_rotation(degs[il])
-
-            t.set_va('center')
-            t.set_ha('center')
-
-            #updating rel_pos to right edge of character
-            rel_pos += w-used
+        ##points of the curve in display coordinates and the arc length
+        xy = self.axes.transData.transform(np.c_[self.__x,self.__y])
+        seg = np.diff(xy,axis=0)
+        l_fig = np.r_[0,np.cumsum(np.hypot(seg[:,0],seg[:,1]))]
+        rads = np.arctan2(seg[:,1],seg[:,0])
+
+        ##character centres along the curve, starting 10 pixels in; letters
+        ##that don't fit are left out
+        scale = self.figure.dpi/72
+        pos = 10+self.__centres*scale
+        fits = (10+self.__right*scale) <= l_fig[-1]
+        seg_i = np.clip(np.searchsorted(l_fig,pos,side='right')-1,0,len(rads)-1)
+        cx = np.interp(pos,l_fig,xy[:,0])
+        cy = np.interp(pos,l_fig,xy[:,1])
+
+        ##rotate each glyph about its own centre and move it onto the curve
+        keep = fits[self.__owner]
+        k = self.__owner[keep]
+        v = self.__verts[keep]*scale
+        v[:,1] += self.baseline_shift()*scale
+        a = rads[seg_i[k]]
+        cos,sin = np.cos(a),np.sin(a)
+        out = np.c_[cx[k]+v[:,0]*cos-v[:,1]*sin,cy[k]+v[:,0]*sin+v[:,1]*cos]
+        return Path(out,self.__codes[keep])
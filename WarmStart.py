@@ -0,0 +1,194 @@
+#=================================WarmStart.py=================================#
+# Description:
+# Warm state for new processes. A cold process has to import PlotFuncs and
+# matplotlib, parse and convert curves, build matplotlib's font and mathtext
+# caches and capture the WebGL display lists (LimitGL.py) before it can serve
+# anything. Two ways of paying that once:
+#
+#  - a snapshot: the curve caches of PlotFuncs, its FigSetup templates and
+#    layout margins, and LimitGL's display lists, pickled to warm.pkl and
+#    restored at process start (app.py and the export worker do this when
+#    the file exists);
+#  - preload-then-fork: `serve` warms this process and then starts
+#    `panel serve` in it, so the workers forked by --num-procs inherit
+#    everything copy-on-write.
+#
+# A snapshot stays usable when curve files change: their curves, and the
+# display lists of the methods that read them (LimitDeps.py), are left out.
+# Templates and margins are only restored for the same PlotFuncs.py and
+# matplotlib.
+#
+# Usage:
+#   python WarmStart.py snapshot
+#   python WarmStart.py serve app.py --num-procs 4 [more panel serve options]
+#   python WarmStart.py preload [class]   # per-file parse times of a class's curves
+#==============================================================================#
+
+import os
+import sys
+import gc
+import pickle
+
+snapfile = 'warm.pkl'
+SNAP_VERSION = 2
+
+def _stamp(filename):
+    st = os.stat(filename)
+    return (st.st_mtime_ns,st.st_size)
+
+def Layers(cls='AxionPhoton'):
+    # The plotting methods of a PlotFuncs class
+    import PlotFuncs
+    C = getattr(PlotFuncs,cls)
+    return [name for name,fn in vars(C).items()
+            if callable(fn) and not name.startswith('_') and name!='FigSetup']
+
+#==============================================================================#
+def Warm(classes=('AxionPhoton',)):
+    # Parses the curves of the classes in parallel, captures every plotting
+    # method once (which converts them) and lays out and draws one full
+    # figure for the template, margins and font caches
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import PlotFuncs
+    from LimitGL import CaptureLayer
+    from LimitFigure import clean_latex
+    for cls in classes:
+        PlotFuncs.Preload(PlotFuncs.CurveFiles(cls))
+        C = getattr(PlotFuncs,cls)
+        for name in Layers(cls):
+            try:
+                CaptureLayer(getattr(C,name),{})
+            except Exception:
+                pass
+    with plt.rc_context():
+        fig,ax = PlotFuncs.FigSetup(Shape='Rectangular',ylab=r'$|g_{a\gamma}|$ [GeV$^{-1}$]')
+        PlotFuncs.AxionPhoton.Helioscopes(ax)
+        clean_latex(fig)
+        PlotFuncs.FixedLayout(fig)
+        with plt.rc_context({'text.usetex':False}):
+            fig.canvas.draw()
+        plt.close(fig)
+
+def SaveSnapshot(path=snapfile):
+    import matplotlib
+    import PlotFuncs
+    import LimitGL
+    curves = {key:dat for key,dat in PlotFuncs.CurveCache.items() if os.path.exists(key[0])}
+    stamps = {key[0]:_stamp(key[0]) for key in curves}
+    stamps[PlotFuncs.__file__] = _stamp(PlotFuncs.__file__)
+    snap = {'version':SNAP_VERSION,'stamps':stamps,'curves':curves,
+            'views':{key:dat for key,dat in PlotFuncs.ViewCache.items() if key[0] in curves},
+            'display':dict(LimitGL.CaptureCache),
+            'matplotlib':matplotlib.__version__,
+            'templates':dict(PlotFuncs.FigTemplates),'margins':dict(PlotFuncs.Margins)}
+    tmp = path+'.%d.tmp' % os.getpid()
+    with open(tmp,'wb') as f:
+        pickle.dump(snap,f,protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp,path)
+    return len(curves),len(snap['display'])
+
+def Stale(stamps):
+    # (changed files, names of the functions whose display lists they make
+    # stale, or None for all of them). A function is stale if it reads a
+    # changed file directly or through a callee (LimitDeps.py); a change to
+    # PlotFuncs.py itself makes every display list stale.
+    import PlotFuncs
+    from LimitDeps import SharedMap
+    changed = []
+    for fn,stamp in stamps.items():
+        try:
+            if _stamp(fn)!=tuple(stamp):
+                changed.append(fn)
+        except OSError:
+            changed.append(fn)
+    if PlotFuncs.__file__ in changed:
+        return changed,None
+    deps = SharedMap()
+    stale = set()
+    for fn in changed:
+        stale.update(deps.Users(os.path.relpath(fn,deps.root) if os.path.isabs(fn) else fn))
+    return changed,stale
+
+def LoadSnapshot(path=snapfile):
+    # Restores a snapshot into this process, leaving out the curves of files
+    # changed since it was written and the display lists that depend on them.
+    # Returns True if used.
+    import matplotlib
+    import PlotFuncs
+    import LimitGL
+    try:
+        with open(path,'rb') as f:
+            snap = pickle.load(f)
+        if snap.get('version')!=SNAP_VERSION:
+            return False
+    except (OSError,pickle.UnpicklingError,EOFError):
+        return False
+    changed,stale = Stale(snap['stamps'])
+    changed = set(changed)
+    shared = PlotFuncs.SharedCurves
+    for key,dat in snap['curves'].items():
+        if (key in PlotFuncs.CurveCache) or (key[0] in changed):
+            continue
+        if (shared is not None) and (key[0] in shared):
+            continue  # the memory-mapped copy is shared, the pickled one isn't
+        dat.flags.writeable = False
+        PlotFuncs.CurveCache[key] = dat
+    for key,dat in snap['views'].items():
+        if (key not in PlotFuncs.ViewCache) and (key[0] not in changed):
+            if dat.flags.writeable:
+                dat.flags.writeable = False
+            PlotFuncs.ViewCache[key] = dat
+    if stale is not None:
+        for key,items in snap['display'].items():
+            if key[0] not in stale:
+                LimitGL.CaptureCache.setdefault(key,items)
+        if snap['matplotlib']==matplotlib.__version__:
+            for key,template in snap['templates'].items():
+                PlotFuncs.FigTemplates.setdefault(key,template)
+            for key,margins in snap['margins'].items():
+                PlotFuncs.Margins.setdefault(key,margins)
+    return True
+#==============================================================================#
+
+
+#==============================================================================#
+def Serve(args):
+    # Preload, then hand over to `panel serve` in this process: with
+    # --num-procs the server forks after this point
+    import matplotlib
+    matplotlib.use('Agg')
+    import PlotFuncs
+    from CurveStore import storefile
+    if os.path.exists(storefile):
+        PlotFuncs.UseCurveStore(storefile)
+    if not LoadSnapshot():
+        Warm()
+    import panel
+    import panel.command
+    import LimitFigure, LimitLayers, LimitExport, LimitGL
+    # Objects created so far are never collected, so the collector doesn't
+    # touch (and un-share) their pages in the forked workers
+    gc.collect()
+    gc.freeze()
+    sys.argv = ['panel','serve']+list(args)
+    panel.command.main()
+#==============================================================================#
+
+
+if __name__=='__main__':
+    if len(sys.argv)>1 and sys.argv[1]=='snapshot':
+        import matplotlib
+        matplotlib.use('Agg')
+        Warm()
+        n,m = SaveSnapshot()
+        print(n,'curves and',m,'display lists written to',snapfile)
+    elif len(sys.argv)>1 and sys.argv[1]=='serve':
+        Serve(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=='preload':
+        # parse times of the curves of a class, read cold
+        import PlotFuncs
+        PlotFuncs.Preload(PlotFuncs.CurveFiles(sys.argv[2] if len(sys.argv)>2 else 'AxionPhoton'),verbose=True)
+    else:
+        print('usage: python WarmStart.py snapshot | serve app.py [panel serve options] | preload [class]')
+        sys.exit(1)
@@ -2,7 +2,7 @@ import panel as pn
 import sys
 import os
 import io
-import re  # Required for clean_latex
+import re
 
 # 1. Initialize Panel
 pn.extension(sizing_mode="stretch_width") 
@@ -30,10 +30,19 @@ if 'pyodide' in sys.modules:
     import zipfile
     from js import window, URL
 
+    # The code and the default limits come in the core bundle (see
+    # LimitBundles.py), the other limits' curves when they are first checked.
+    # Sites built without bundles ship everything in assets.zip.
     if not os.path.exists('./PlotFuncs.py'):
         try:
             base_url = window.location.href
-            assets_url = URL.new('./assets.zip', base_url).href
+            response = requests.get(URL.new('./bundles/manifest.json', base_url).href)
+            if response.status_code == 200:
+                with open('bundles.json', 'w') as f:
+                    f.write(response.text)
+                assets_url = URL.new('./' + response.json()['bundles']['core']['file'], base_url).href
+            else:
+                assets_url = URL.new('./assets.zip', base_url).href
             response = requests.get(assets_url)
             if response.status_code == 200:
                 with zipfile.ZipFile(io.BytesIO(response.content)) as z:
@@ -43,22 +52,37 @@ if 'pyodide' in sys.modules:
 
 # --- IMPORTS ---
 import matplotlib.pyplot as plt
-import matplotlib.text
+import matplotlib.colors
 import numpy as np
 
 try:
-    from PlotFuncs import FigSetup, AxionPhoton
+    import PlotFuncs
+    from PlotFuncs import AxionPhoton
 except ImportError:
     def AxionPhoton(*args): pass
-    def FigSetup(*args, **kwargs): return plt.subplots()
-
-# --- PHYSICS ---
-alpha = 1/137.035999084
-K = 5.70e6
-pref = alpha/(2*np.pi)
 
-def g_agamma(m_eV, C):
-    return np.abs(pref * C * (m_eV / K))
+# app.py runs once per session; the process-wide state is set up by the
+# first one (or inherited, under `python WarmStart.py serve`). Curves
+# published with `python CurveStore.py` are memory-mapped, so all server
+# processes share one copy of them, and warm.pkl restores the rest. Any
+# curve still missing is parsed now, all together on a thread pool.
+if ('PlotFuncs' in sys.modules) and not PlotFuncs.CurveCache:
+    from CurveStore import storefile
+    from WarmStart import snapfile, LoadSnapshot
+    if os.path.exists(storefile) and PlotFuncs.SharedCurves is None:
+        PlotFuncs.UseCurveStore(storefile)
+    if os.path.exists(snapfile):
+        LoadSnapshot(snapfile)
+    PlotFuncs.Preload(PlotFuncs.CurveFiles('AxionPhoton'))
+from LimitFigure import pref, K
+from LimitLayers import SharedRenderer, FrameBuffer, ViewportDPI
+from LimitExport import SharedQueue
+from LimitBundles import Load as LoadBundles
+import LimitWatch
+# Watch mode: edits to limit_data/ or PlotFuncs.py redraw the limits they
+# touch in every open session (see LimitWatch.py)
+if os.environ.get('LIMIT_WATCH') and 'pyodide' not in sys.modules:
+    LimitWatch.Start()
 
 models = [
     {"name": "KSVZ", "Ndw": "1", "C": (-1.92, -1.92)},
@@ -101,14 +125,40 @@ categories = {
     ],
 }
 
-def clean_latex(fig):
-    for text_obj in fig.findobj(matplotlib.text.Text):
-        s = text_obj.get_text()
-        text_obj.set_usetex(False)
-        if r"{\bf" in s:
-            s_clean = re.sub(r'\{\\bf\s+(.*?)\}', r'\1', s)
-            text_obj.set_text(s_clean)
-            text_obj.set_weight('bold')
+# --- COUPLING PLANES ---
+# Switching plane only rewrites the y-data of the artists each limit has
+# already drawn (see show_plane in LimitFigure.py, and LimitLayers.py).
+planes = {
+    "g": {"ylab": r"$|g_{a\gamma}|$ [GeV$^{-1}$]", "title": "Coupling Range (|gₐᵧ|) [log₁₀ GeV⁻¹]",
+          "gl_ylab": "|gₐᵧ| [GeV⁻¹]", "start": -30, "end": -5, "ymin": -16, "ymax": -8},
+    "C": {"ylab": r"$|C_{a\gamma}|$", "title": "Coupling Range (|Cₐᵧ|) [log₁₀]",
+          "gl_ylab": "|Cₐᵧ|", "start": -5, "end": 8, "ymin": -2, "ymax": 4},
+}
+
+# --- VIEWPORT PROBE ---
+# Reports the width its container gives it in the browser, and the device
+# pixel ratio, so the figure can be rendered at the resolution it is shown at.
+import param
+from panel.reactive import ReactiveHTML
+
+class Viewport(ReactiveHTML):
+    # not `width`, which is the layout's own parameter
+    client_width = param.Integer(default=0)
+    ratio = param.Number(default=1.0)
+    _template = '<div id="probe" style="width:100%;height:1px"></div>'
+    _scripts = {
+        'render': """
+            const report = () => {
+                const w = Math.round(probe.getBoundingClientRect().width)
+                if (w > 0 && w != data.client_width) data.client_width = w
+                if (window.devicePixelRatio != data.ratio) data.ratio = window.devicePixelRatio
+            }
+            state.observer = new ResizeObserver(report)
+            state.observer.observe(probe)
+            report()
+        """,
+        'remove': 'state.observer.disconnect()',
+    }
 
 # --- DASHBOARD LOGIC ---
 def create_dashboard():
@@ -126,18 +176,23 @@ def create_dashboard():
     
     # 1. Widgets & Labels
     # 1. Widgets (Compact)
-    DEFAULTS = {'mmin': -8, 'mmax': 2, 'ymin': -16, 'ymax': -8}
+    DEFAULTS = {'mmin': -8, 'mmax': 2, 'plane': 'g'}
 
     mmin = pn.widgets.FloatSlider(name='Min', start=-15, end=8, step=0.5, value=DEFAULTS['mmin'])
     mmax = pn.widgets.FloatSlider(name='Max', start=-15, end=8, step=0.5, value=DEFAULTS['mmax'])
     
-    ymin = pn.widgets.FloatSlider(name='Min', start=-30, end=-5, step=0.5, value=DEFAULTS['ymin'])
-    ymax = pn.widgets.FloatSlider(name='Max', start=-30, end=-5, step=0.5, value=DEFAULTS['ymax'])
+    g_plane = planes[DEFAULTS['plane']]
+    ymin = pn.widgets.FloatSlider(name='Min', start=g_plane['start'], end=g_plane['end'], step=0.5, value=g_plane['ymin'])
+    ymax = pn.widgets.FloatSlider(name='Max', start=g_plane['start'], end=g_plane['end'], step=0.5, value=g_plane['ymax'])
+    plane = pn.widgets.RadioButtonGroup(name='Coupling plane', options={'|gₐᵧ|': 'g', '|Cₐᵧ|': 'C'},
+                                        value=DEFAULTS['plane'], button_type='primary', sizing_mode='stretch_width')
+    coupling_card = pn.Card(ymin, ymax, title=g_plane['title'], collapsed=False)
 
     reset_btn = pn.widgets.Button(name='Reset to Defaults', button_type='warning', icon='refresh', sizing_mode='stretch_width')
     def reset_callback(event):
         mmin.value = DEFAULTS['mmin']; mmax.value = DEFAULTS['mmax']
-        ymin.value = DEFAULTS['ymin']; ymax.value = DEFAULTS['ymax']
+        plane.value = DEFAULTS['plane']
+        ymin.value = planes[plane.value]['ymin']; ymax.value = planes[plane.value]['ymax']
         for chk in model_checks.values(): chk.value = True
         for cat_name, cat in cat_widgets.items():
             for name, chk in cat["checks"].items():
@@ -175,69 +230,101 @@ def create_dashboard():
         col = pn.Column(pn.Column(*checks.values(), scroll=True, height=120), pn.Row(b_all, b_no))
         limit_accordion.append((cat_name, col))
 
-    # 3. Plotting
-    mpl_pane = pn.pane.Matplotlib(tight=True, dpi=200, format='png', sizing_mode='stretch_width', height=650)
-    current_fig = [None] 
-
-    def update_plot(mmin_val, mmax_val, ymin_val, ymax_val, *args):
-        plt.close('all')
-        fig, ax = FigSetup(Shape='Rectangular', ylab=r'$|g_{a\gamma}|$ [GeV$^{-1}$]', mathpazo=False)
-        current_fig[0] = fig 
-        
-        xlims = (10**mmin_val, 10**mmax_val)
-        ylims = (10**ymin_val, 10**ymax_val)
-        ax.set_xlim(*xlims); ax.set_ylim(*ylims)
-        ax.set_xscale('log'); ax.set_yscale('log')
-        ax.set_xlabel(r"$m_a$ [eV]", fontsize=23)
-        ax.set_ylabel(r"$|g_{a\gamma}|$ [GeV$^{-1}$]", fontsize=23)
-        
-        prop_cycle = plt.rcParams['axes.prop_cycle']
-        colors = prop_cycle.by_key()['color']
-        m_grid = np.logspace(np.log10(xlims[0]), np.log10(xlims[1]), 500)
-        
-        for i, m in enumerate(models):
-            if model_checks[m["name"]].value:
-                color = colors[i % len(colors)]
-                cmin, cmax = m["C"]
-                if np.isclose(cmin, cmax):
-                    yy = g_agamma(m_grid, cmin)
-                    ax.plot(m_grid, yy, lw=2, alpha=0.9, label=rf"{m['name']}", color=color)
-                else:
-                    y1 = g_agamma(m_grid, cmin); y2 = g_agamma(m_grid, cmax)
-                    ylo, yhi = np.minimum(y1, y2), np.maximum(y1, y2)
-                    ax.fill_between(m_grid, ylo, yhi, alpha=0.3, color=color)
-                    ax.plot(m_grid, np.sqrt(ylo*yhi), lw=1.5, alpha=0.9, label=rf"{m['name']}", color=color)
-
-        def _plot_bound(fn, kw):
-            ox, oy = ax.get_xlim(), ax.get_ylim()
-            try:
-                try: fn(ax, **kw)
-                except TypeError: fn(ax=ax, **kw)
-            except Exception: pass
-            ax.set_xlim(ox); ax.set_ylim(oy)
-
+    # 3. Plotting: the figure is composited from cached per-limit layers (see
+    # LimitLayers.py), so a toggle only draws the limit that changed. It is
+    # rendered at the resolution the pane shows it at (the pane keeps the
+    # figure's aspect, so at most 650 px high), into a buffer kept by the
+    # session, and sent in the cheapest format that shows it well: SVG when
+    # few limits are in view, else lossless WebP if the browser takes it, or PNG.
+    FIG_HEIGHT = 650
+    accept = (pn.state.headers or {}).get('Accept', '')
+    fig_panes = {'png': pn.pane.PNG(sizing_mode='stretch_width', height=FIG_HEIGHT),
+                 'webp': pn.pane.WebP(sizing_mode='stretch_width', height=FIG_HEIGHT),
+                 'svg': pn.pane.SVG(sizing_mode='stretch_width', height=FIG_HEIGHT, encode=False)}
+    viewport = Viewport(sizing_mode='stretch_width', height=1, margin=0)
+    fig_box = pn.Column(viewport, fig_panes['png'], sizing_mode='stretch_width')
+    frame_buffer = FrameBuffer()
+    render_dpi = [100]
+
+    def svg_markup(data):
+        # Inline SVG scaled to the pane: drop the XML prolog and the fixed size
+        s = data[data.index(b'<svg'):].decode()
+        return re.sub(r'width="[\d.]+pt" height="[\d.]+pt"', 'width="100%" height="100%"', s, count=1)
+
+    def figure_dpi():
+        if viewport.client_width <= 0:
+            return 100
+        w, h = 16.5, 11
+        return ViewportDPI(min(viewport.client_width, FIG_HEIGHT*w/h), viewport.ratio, w)
+
+    def plot_spec():
+        # Everything the figure depends on, as a plain dict (see LimitFigure.py)
+        colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        limits = []
         for cat in cat_widgets.values():
             for it in cat["items"]:
                 if cat["checks"][it["name"]].value:
-                    _plot_bound(it["fn"], it.get("kwargs", {}))
-
-        ax.legend(loc='upper left', bbox_to_anchor=(1.02, 1), fontsize=15, frameon=False, title="Models")
-        #ax.set_title("Axion–Photon Coupling Space", fontweight="bold", pad=20, fontsize=22)
-        clean_latex(fig)
-        fig.tight_layout()
-        mpl_pane.object = fig
-        return mpl_pane
+                    fn = it["fn"]
+                    limits.append((it["name"], fn.__qualname__.split('.')[0], fn.__name__, it.get("kwargs", {})))
+        return {"shape": "Rectangular",
+                "xlim": (10**mmin.value, 10**mmax.value), "ylim": (10**ymin.value, 10**ymax.value),
+                "plane": plane.value, "ylab": planes[plane.value]["ylab"],
+                "models": [{"name": m["name"], "C": m["C"], "color": colors[i % len(colors)]}
+                           for i, m in enumerate(models) if model_checks[m["name"]].value],
+                "legend": [m["name"] for m in models],
+                "limits": limits}
+
+    def shown_categories():
+        return [cat_name for cat_name, cat in cat_widgets.items() if any(c.value for c in cat["checks"].values())]
+
+    def update_plot(*args):
+        # Widgets are read directly: value_throttled goes stale when a slider
+        # is moved programmatically (reset, plane switch). In the browser build
+        # the curves of a category are fetched the first time it is shown.
+        LoadBundles(shown_categories())
+        render_dpi[0] = figure_dpi()
+        fmt, data = SharedRenderer(render_dpi[0]).Encoded(plot_spec(), accept, frame_buffer)
+        pane = fig_panes[fmt]
+        pane.object = svg_markup(data) if fmt == 'svg' else data
+        if fig_box[1] is not pane:
+            fig_box[1] = pane
+        return pane
 
     triggers = [mmin.param.value_throttled, mmax.param.value_throttled, ymin.param.value_throttled, ymax.param.value_throttled]
     triggers += [c.param.value for c in model_checks.values()]
     for c in cat_widgets.values():
         triggers += [chk.param.value for chk in c["checks"].values()]
     pn.bind(update_plot, *triggers, watch=True)
-    update_plot(mmin.value, mmax.value, ymin.value, ymax.value)
+    update_plot()
+
+    def resized(*args):
+        # Only redraw when the pane needs another resolution
+        if figure_dpi() != render_dpi[0]:
+            update_plot()
+    viewport.param.watch(resized, ['client_width', 'ratio'])
+
+    def switch_plane(event):
+        p = planes[event.new]
+        coupling_card.title = p["title"]
+        ymin.param.update(start=p["start"], end=p["end"], value=p["ymin"])
+        ymax.param.update(start=p["start"], end=p["end"], value=p["ymax"])
+        update_plot()
+    plane.param.watch(switch_plane, 'value')
+
+    # 4. DOWNLOAD BUTTON: exports are drawn from the plot spec in a background
+    # process (see LimitExport.py) and cached by spec hash, so the session keeps
+    # responding while a PDF renders and repeated downloads are instant.
+    export_queue = SharedQueue()
+    export_fmt = pn.widgets.Select(options={'PDF': 'pdf', 'SVG': 'svg', 'PNG': 'png', 'EPS': 'eps',
+                                            'ZIP (PDF + CSV)': 'zip'},
+                                   value='pdf', sizing_mode='fixed', width=140, height=40)
+
+    async def export_callback():
+        data = await export_queue.fetch(plot_spec(), export_fmt.value)
+        return io.BytesIO(data)
 
-    # 4. DOWNLOAD BUTTON
     download_btn = pn.widgets.FileDownload(
-        callback=lambda: (io.BytesIO(current_fig[0].savefig(io.BytesIO(), format='pdf', bbox_inches='tight') or io.BytesIO().getvalue()) if current_fig[0] else None),
+        callback=export_callback,
         filename="AxionLimits.pdf", 
         button_type="success", 
         label="Download Figure", 
@@ -245,18 +332,125 @@ def create_dashboard():
         icon="file-download",
         sizing_mode="fixed", width=180
     )
+    def set_export_fmt(event):
+        download_btn.filename = "AxionLimits." + event.new
+    export_fmt.param.watch(set_export_fmt, 'value')
     
     # Action Bar: Sits right below the plot
     action_bar = pn.Row(
         pn.Spacer(), 
         pn.Column(
             pn.pane.Markdown(styles={'font-size': '12px', 'margin-bottom': '2px', 'text-align': 'right'}),
-            download_btn
+            pn.Row(export_fmt, download_btn)
         ),
         margin=(0, 0, 0, 0)
     )
 
-    # 5. FOOTER (Slim Banner)
+    # 5. WEBGL VIEW: the same limits drawn in the browser (see LimitGL.py). The
+    # curves are captured and sent once, the first time the tab is opened; after
+    # that zoom, pan and the checkboxes no longer go through the server.
+    gl_view = pn.Column(pn.pane.Markdown("Loading curves..."), sizing_mode='stretch_width', height=650)
+
+    def build_gl_view():
+        from LimitGL import GLFigure, ViewXY
+        LoadBundles(list(cat_widgets))
+        view = plane.value
+        layers, checks = [], {}
+        for cat in cat_widgets.values():
+            for it in cat["items"]:
+                layers.append((it["name"], it["fn"], it.get("kwargs", {})))
+                checks[it["name"]] = cat["checks"][it["name"]]
+        p, renderers = GLFigure(layers, visible={n: c.value for n, c in checks.items()},
+                                m_range=(10**mmin.value, 10**mmax.value), g_range=(10**ymin.value, 10**ymax.value),
+                                xlab="mₐ [eV]", ylab=planes[view]["gl_ylab"], view=view)
+        for name, rs in renderers.items():
+            for r in rs:
+                checks[name].jslink(r, value='visible')
+        # Model lines are straight in log space: log10 g = log10(pref C/K) + log10 m,
+        # and in every other view
+        colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        gx = np.array([-12.0, 8.0], dtype=np.float32)
+        for i, m in enumerate(models):
+            color = matplotlib.colors.to_hex(colors[i % len(colors)])
+            cmin, cmax = sorted(np.abs(m["C"]))
+            lx, ylo = ViewXY(gx, (np.log10(pref*cmin/K) + gx).astype(np.float32), view)
+            lx, yhi = ViewXY(gx, (np.log10(pref*cmax/K) + gx).astype(np.float32), view)
+            rs = [p.line(lx, 0.5*(ylo + yhi), line_color=color, line_width=2, legend_label=m["name"].replace('$', '').replace('\\', ''))]
+            if not np.isclose(cmin, cmax):
+                rs.append(p.varea(x=lx, y1=ylo, y2=yhi, fill_color=color, fill_alpha=0.3))
+            for r in rs:
+                r.visible = model_checks[m["name"]].value
+                model_checks[m["name"]].jslink(r, value='visible')
+        p.legend.location = 'top_left'
+        p.legend.background_fill_alpha = 0.6
+        gl_view.objects = [pn.pane.Bokeh(p, sizing_mode='stretch_width', height=650)]
+
+    views = [("Figure", fig_box), ("Interactive (WebGL)", gl_view)]
+
+    # 6. DEEP ZOOM: pre-rendered tile pyramids (one per limit, see LimitTiles.py)
+    # overlaid in a Bokeh plot; the limit checkboxes toggle them client side.
+    # The tiles are drawn in the g plane, so the tab is only there in that plane.
+    tile_view = None
+    try:
+        from LimitTiles import LayerKey, TileViewer, tiledir
+        tile_checks = {}
+        for cat in cat_widgets.values():
+            for it in cat["items"]:
+                key = LayerKey([(it["fn"].__name__, it.get("kwargs", {}))])
+                if os.path.isdir(os.path.join(tiledir, key)):
+                    tile_checks[key] = cat["checks"][it["name"]]
+        if tile_checks:
+            tile_plot, tile_renderers = TileViewer(list(tile_checks))
+            for key, chk in tile_checks.items():
+                tile_renderers[key].visible = chk.value
+                chk.jslink(tile_renderers[key], value='visible')
+            tile_view = pn.pane.Bokeh(tile_plot, sizing_mode='stretch_width', height=650, name="Deep zoom")
+            if plane.value == 'g':
+                views.append(("Deep zoom", tile_view))
+    except ImportError:
+        pass
+
+    main_view = pn.Tabs(*views, sizing_mode='stretch_width')
+    def open_view(event):
+        if main_view[event.new] is gl_view and isinstance(gl_view[0], pn.pane.Markdown):
+            build_gl_view()
+    main_view.param.watch(open_view, 'active')
+
+    def reset_gl_view():
+        # Captures the WebGL view again, now if it is shown, otherwise when opened
+        if not isinstance(gl_view[0], pn.pane.Markdown):
+            gl_view.objects = [pn.pane.Markdown("Loading curves...")]
+            if main_view[main_view.active] is gl_view:
+                build_gl_view()
+
+    def plane_views(event):
+        reset_gl_view()
+        if tile_view is None:
+            return
+        if event.new == 'g':
+            if tile_view not in main_view.objects:
+                main_view.append(("Deep zoom", tile_view))
+        elif tile_view in main_view.objects:
+            if main_view[main_view.active] is tile_view:
+                main_view.active = 0
+            main_view.remove(tile_view)
+    plane.param.watch(plane_views, 'value')
+
+    # The watching thread has already dropped what went stale; the session
+    # redraws if that includes a limit it shows, and recaptures its WebGL view.
+    if LimitWatch.Running():
+        seen = [LimitWatch.Generation]
+        def check_changes():
+            seen[0], stale = LimitWatch.Since(seen[0])
+            if not stale:
+                return
+            shown = {'%s.%s' % (cls, method) for _, cls, method, _ in plot_spec()["limits"]}
+            if shown & stale:
+                update_plot()
+            reset_gl_view()
+        pn.state.add_periodic_callback(check_changes, period=1000)
+
+    # 7. FOOTER (Slim Banner)
     footer = pn.Row(
         pn.pane.Markdown(
             "© 2025 COSMIC WWISPers. The Axion Limits Explorer was created by Francisco Rodríguez Candón, Francesca Calore and Philip Sørensen. Data and plotting functions are adapted from **[Ciaran O'Hare / AxionLimits](https://github.com/cajohare/AxionLimits)**. More information about the models displayed can be found in the WISP dictionary.",
@@ -273,7 +467,8 @@ def create_dashboard():
     sidebar_content = pn.Column(
         pn.pane.Markdown("## Controls"),
         pn.Card(mmin, mmax, title="Mass Range (mₐ) [log₁₀ eV]", collapsed=False),
-        pn.Card(ymin, ymax, title="Coupling Range (|gₐᵧ|) [log₁₀ GeV⁻¹]", collapsed=False),
+        plane,
+        coupling_card,
         reset_btn,
         pn.layout.Divider(),
         pn.pane.Markdown("## Theoretical Models"),
@@ -284,7 +479,7 @@ def create_dashboard():
         sizing_mode="stretch_width"
     )
 
-    return sidebar_content, mpl_pane, action_bar, footer
+    return sidebar_content, main_view, action_bar, footer
 
 # --- TEMPLATE ---
 sidebar_content, main_plot, action_bar, footer = create_dashboard()
@@ -0,0 +1,20 @@
+# The modules are flat files at the top of the repository and read their
+# curves from limit_data/ relative to it, so the tests run from there, with
+# the artifact store (ArtifactStore.py) in a temporary folder.
+import os
+import sys
+import pytest
+import matplotlib
+matplotlib.use('Agg')
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,root)
+
+@pytest.fixture(autouse=True)
+def repo(monkeypatch,tmp_path):
+    monkeypatch.chdir(root)
+    import ArtifactStore
+    monkeypatch.setattr(ArtifactStore,'_shared',ArtifactStore.ArtifactStore(root=str(tmp_path/'artifacts')))
+    yield root
+    import matplotlib.pyplot as plt
+    plt.close('all')
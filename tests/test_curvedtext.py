@@ -0,0 +1,38 @@
+import shutil
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties
+
+from PlotFuncs import CurvedText, _glyphs
+
+LABEL = r'$g_{a\gamma}$'
+
+def widths(usetex):
+    # Ink width in px of LABEL along a straight line and as a plain Text
+    with plt.rc_context({'text.usetex':usetex}):
+        fig,ax = plt.subplots(figsize=(6,4),dpi=100)
+        ax.set_xlim(0,1)
+        ax.set_ylim(0,1)
+        curved = CurvedText(np.linspace(0.1,0.9,50),np.full(50,0.5),LABEL,ax,fontsize=20)
+        text = ax.text(0.1,0.2,LABEL,fontsize=20)
+        fig.canvas.draw()
+        r = fig.canvas.get_renderer()
+        return curved.get_window_extent(r).width,text.get_window_extent(r).width
+
+def test_mathtext_glyphs():
+    # g, a and gamma, where the markup read as plain text has a glyph per
+    # character
+    prop = FontProperties(size=20)
+    assert len(_glyphs(LABEL,prop,True))==3
+    assert len(_glyphs(LABEL,prop,False))==len(LABEL)
+
+def test_mathtext_rendering():
+    curved,text = widths(False)
+    assert 0.7*text<curved<1.1*text
+
+@pytest.mark.skipif(shutil.which('latex') is None,reason='needs a TeX installation')
+def test_tex_rendering():
+    assert len(_glyphs(LABEL,FontProperties(size=20),'TeX'))==3
+    curved,text = widths(True)
+    assert 0.7*text<curved<1.1*text
@@ -0,0 +1,28 @@
+import glob
+import numpy as np
+import pytest
+
+from CurveStore import PackCurves, CurveStore
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('pack')/'limit_data.pack')
+    PackCurves('limit_data',path)
+    return CurveStore(path)
+
+def test_pack_matches_loadtxt(store):
+    files = sorted(glob.glob('limit_data/**/*.txt',recursive=True))
+    assert len(store)>0.9*len(files)
+    for fn in files:
+        info = store.info(fn)
+        if info is None:
+            continue
+        dat = np.loadtxt(fn,delimiter=info['meta']['delimiter'])
+        assert store.get(fn).shape==dat.shape,fn
+        assert np.array_equal(store.get(fn),dat,equal_nan=True),fn
+
+def test_log_columns(store):
+    fn = 'limit_data/AxionPhoton/Projections/LAMPOST.txt'
+    dat = store.get(fn)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        assert np.allclose(store.log(fn),np.log10(dat))
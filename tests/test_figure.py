@@ -0,0 +1,37 @@
+import logging
+import pytest
+import matplotlib.pyplot as plt
+
+import PlotFuncs
+from LimitFigure import DrawLayer, DrawSpec, LayerError
+
+SPEC = {'shape':'Rectangular','xlim':(1e-8,1e2),'ylim':(1e-16,1e-8),'plane':'g',
+        'ylab':r'$|g_{a\gamma}|$ [GeV$^{-1}$]','models':[],'limits':[]}
+
+def broken(ax,**kw):
+    ax.plot([1e-6,1e-4],[1e-12,1e-10])
+    raise RuntimeError('no data')
+
+@pytest.fixture
+def failing(monkeypatch):
+    monkeypatch.setattr(PlotFuncs.AxionPhoton,'Broken',staticmethod(broken),raising=False)
+
+def test_draw_layer_returns_artists():
+    fig,ax = plt.subplots()
+    artists = DrawLayer(ax,'AxionPhoton','Helioscopes')
+    assert artists and all(a in ax.get_children() for a in artists)
+
+def test_failed_layer_is_logged_and_removed(failing,caplog):
+    fig,ax = plt.subplots()
+    before = list(ax.get_children())
+    with caplog.at_level(logging.ERROR,logger='LimitFigure'):
+        assert DrawLayer(ax,'AxionPhoton','Broken') is None
+    assert 'AxionPhoton.Broken failed' in caplog.text
+    assert 'no data' in caplog.text
+    assert ax.get_children()==before
+
+def test_draw_spec_raises_on_failed_layer(failing):
+    spec = dict(SPEC,limits=[('Broken','AxionPhoton','Broken',{})])
+    with pytest.raises(LayerError):
+        DrawSpec(spec)
+    assert not plt.get_fignums()
@@ -0,0 +1,58 @@
+import numpy as np
+
+from LimitIngest import ReadCurve, Canonical, Changes, Geometry, Ingest
+
+# LAMPOST.txt as digitised: high to low mass, with a cap to 1e-5 at each end
+LAMPOST = """# Optical haloscope (Baryakhtar et al.)
+# m_a [eV]  g_ap [GeV^-1]
+4.999018665795833, 1.0e-5
+4.999018665795833, 6.161406742693235e-11
+1.238616334264832, 7.375924152997962e-12
+1.238616334264832, 5.8810623868015515e-12
+0.2353678888365638, 4.757236712526234e-13
+0.2294007299777082, 5.412577680386668e-13
+0.19833427341363946, 7.964057645639277e-13
+0.09914767348618389, 1.2010831010597362e-12
+0.06980172750582385, 9.529513267303373e-13
+0.06980172750582385, 1.0e-5
+"""
+
+def test_lampost_is_turned_around(tmp_path):
+    src = tmp_path/'LAMPOST.txt'
+    src.write_text(LAMPOST)
+    dat,meta = ReadCurve(str(src))
+    assert meta['delimiter']==','
+    canon,shape = Canonical(dat)
+    assert np.array_equal(canon,dat[::-1])
+    assert shape=={'kind':'line','closed':False,'caps':[True,True],'sorted':True}
+    assert Changes(dat,canon)==['turned around']
+    # and once written, it is already canonical
+    Ingest(str(src),str(tmp_path/'out.txt'))
+    again,_ = ReadCurve(str(tmp_path/'out.txt'))
+    assert np.array_equal(again,canon)
+    assert Changes(again,Canonical(again)[0])==[]
+
+def test_cap_rows():
+    dat = np.array([[1e-6,1.0],[1e-6,1e-10],[1e-5,1e-11],[1e-4,1e-10],[1e-4,1.0]])
+    assert Geometry(dat)['caps']==[True,True]
+    assert Geometry(dat)['kind']=='line'
+    # a vertical step that isn't to the top or bottom of the curve isn't a cap
+    step = np.array([[1e-6,1e-10],[1e-6,1e-11],[1e-5,1e-12],[1e-4,1e-9]])
+    assert Geometry(step)['caps']==[False,False]
+    # caps are kept where they are when a line is turned around
+    canon,shape = Canonical(dat[::-1].copy())
+    assert np.array_equal(canon,dat)
+    assert shape['caps']==[True,True]
+
+def test_jitter_and_repeats():
+    dat = np.array([[1e-6,1e-10],[1e-6,1e-10],[2e-6,1e-11],[1.99e-6,1.1e-11],[1e-5,1e-10]])
+    canon,shape = Canonical(dat)
+    assert len(canon)==4
+    assert np.all(np.diff(canon[:,0])>=0)
+    assert shape['kind']=='line'
+
+def test_contour_is_kept():
+    island = np.array([[1e-6,1e-10],[1e-5,1e-11],[1e-4,1e-10],[1e-5,1e-9],[1e-6,1e-10]])
+    canon,shape = Canonical(island)
+    assert np.array_equal(canon,island)
+    assert shape['kind']=='contour' and shape['closed']
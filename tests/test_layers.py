@@ -0,0 +1,84 @@
+import pytest
+
+import PlotFuncs
+import LimitLayers
+from LimitLayers import LayerRenderer, Negotiate, DEFAULT_SPEC, SVG_MAX_ARTISTS
+
+MODELS = DEFAULT_SPEC['models']+[{'name':'DFSZ-II','C':(-1.25,-1.25),'color':'#2ca02c'}]
+SPEC = dict(DEFAULT_SPEC,models=MODELS,legend=[m['name'] for m in MODELS],
+            limits=[('Helioscopes','AxionPhoton','Helioscopes',{}),('StellarBounds','AxionPhoton','StellarBounds',{})])
+
+@pytest.fixture
+def calls(monkeypatch):
+    # Counts the limits and frames the renderer draws
+    n = {'layers':0,'frames':0}
+    def layer(*args,**kw):
+        n['layers'] += 1
+        return draw_layer(*args,**kw)
+    def frame(*args,**kw):
+        n['frames'] += 1
+        return draw_spec(*args,**kw)
+    draw_layer,draw_spec = LimitLayers.DrawLayer,LimitLayers.DrawSpec
+    monkeypatch.setattr(LimitLayers,'DrawLayer',layer)
+    monkeypatch.setattr(LimitLayers,'DrawSpec',frame)
+    return n
+
+def test_model_toggle_reuses_limit_layers(calls):
+    r = LayerRenderer(dpi=50)
+    r.Render(SPEC)
+    assert calls['layers']==2
+    buffers = dict(r.buffers)
+    r.Render(dict(SPEC,models=MODELS[:1]))
+    assert calls==dict(layers=2,frames=2)
+    assert dict(r.buffers)==buffers
+
+def test_failed_layer_is_not_cached(monkeypatch,calls):
+    def broken(ax,**kw):
+        raise RuntimeError('no data')
+    monkeypatch.setattr(PlotFuncs.AxionPhoton,'Broken',staticmethod(broken),raising=False)
+    spec = dict(SPEC,limits=SPEC['limits']+[('Broken','AxionPhoton','Broken',{})])
+    r = LayerRenderer(dpi=50)
+    r.Render(spec)
+    assert [key[0][1] for key in r.figures]==['Helioscopes','StellarBounds']
+    assert not [key for key in r.buffers if 'Broken' in key[2]]
+    r.Render(spec)
+    assert calls['layers']==4   # tried again, the others reused
+    r.Encoded(spec,fmt='png')
+    assert not r.images
+
+def test_negotiate():
+    assert Negotiate('image/webp,*/*',SVG_MAX_ARTISTS)=='svg'
+    assert Negotiate('image/avif,image/webp,*/*',SVG_MAX_ARTISTS+1)=='webp'
+    assert Negotiate('image/png,*/*',SVG_MAX_ARTISTS+1)=='png'
+
+def test_default_view_format():
+    # The default view (Helioscopes) has few artists in view, all of the
+    # dashboard's Haloscopes many
+    r = LayerRenderer(dpi=50)
+    assert r.Encoded(DEFAULT_SPEC,'image/webp,*/*')[0]=='svg'
+    crowded = dict(DEFAULT_SPEC,limits=[('Haloscopes','AxionPhoton','Haloscopes',{})])
+    assert r.Encoded(crowded,'image/webp,*/*')[0]=='webp'
+    assert r.Encoded(crowded,'')[0]=='png'
+
+def test_format_switch_reuses_layers(calls):
+    r = LayerRenderer(dpi=50)
+    assert r.Encoded(SPEC,fmt='png')[1].startswith(b'\x89PNG')
+    fmt,svg = r.Encoded(SPEC,fmt='svg')
+    assert calls==dict(layers=2,frames=1)
+    assert svg.startswith(b'<svg') and svg.count(b'<path')>10
+    r.Encoded(SPEC,fmt='webp')
+    assert calls==dict(layers=2,frames=1)
+
+def test_svg_matches_figure():
+    # Same pieces as a single draw of the figure, in the same order
+    import io,re
+    import matplotlib.pyplot as plt
+    from LimitFigure import DrawSpec
+    r = LayerRenderer(dpi=50)
+    svg = r.Svg(SPEC).decode()
+    fig,ax,_ = DrawSpec(SPEC)
+    buf = io.StringIO()
+    with plt.rc_context({'text.usetex':False,'svg.fonttype':'path'}):
+        fig.savefig(buf,format='svg')
+    colours = lambda s:re.findall(r'fill: *(#[0-9a-f]{6})',s)
+    assert colours(svg) and colours(svg)==colours(buf.getvalue())
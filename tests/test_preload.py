@@ -0,0 +1,23 @@
+import numpy as np
+
+import PlotFuncs
+from PlotFuncs import Preload, CurveCache
+
+def test_preload_tolerates_bad_files(tmp_path):
+    good = str(tmp_path/'good.txt')
+    np.savetxt(good,[[1e-6,1e-10],[1e-5,1e-11]])
+    text = tmp_path/'text.txt'
+    text.write_text('m g\nnot numbers\n')
+    binary = tmp_path/'binary.txt'
+    binary.write_bytes(b'\xff\xfe\x00\x81')
+    missing = str(tmp_path/'missing.txt')
+    files = [good,str(text),str(binary),missing]
+    try:
+        times = Preload(files,workers=2)
+        assert set(times)==set(files)
+        assert times[good] is not None
+        assert [times[f] for f in files[1:]]==[None,None,None]
+        assert np.array_equal(CurveCache[(good,())],np.loadtxt(good))
+        assert not [f for f in files[1:] if (f,()) in CurveCache]
+    finally:
+        PlotFuncs.ForgetCurves(files)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import PlotFuncs
+from PlotFuncs import MassWindow, loadtxt, LimitView
+from LimitLayers import LayerRenderer, DEFAULT_SPEC
+
+@pytest.fixture
+def curve(tmp_path):
+    m = np.logspace(-10,0,101)
+    fn = str(tmp_path/'curve.txt')
+    np.savetxt(fn,np.c_[m,1e-10*np.sqrt(m)])
+    yield fn,m
+    PlotFuncs.ForgetCurves([fn])
+
+def test_window_keeps_boundary_rows(curve):
+    fn,m = curve
+    with MassWindow((2e-5,5e-4)):
+        dat = loadtxt(fn)
+        view = LimitView(fn,'g')
+    inside = np.flatnonzero((m>=2e-5) & (m<=5e-4))
+    rows = np.r_[0,inside[0]-1,inside,inside[-1]+1,len(m)-1]
+    assert np.array_equal(dat[:,0],m[rows])
+    assert np.array_equal(view[:,0],m[rows])
+    assert len(loadtxt(fn))==len(m)
+
+def test_window_off(curve):
+    fn,m = curve
+    with MassWindow((1e-5,1e-3)):
+        with MassWindow(None):
+            assert len(loadtxt(fn))==len(m)
+        assert len(loadtxt(fn))<len(m)
+
+def test_unsorted_curve_is_whole(tmp_path):
+    fn = str(tmp_path/'contour.txt')
+    np.savetxt(fn,[[1e-6,1e-10],[1e-4,1e-11],[1e-5,1e-9],[1e-6,1e-10]])
+    with MassWindow((1e-5,2e-5)):
+        assert len(loadtxt(fn))==4
+    PlotFuncs.ForgetCurves([fn])
+
+def vertices(r):
+    n = 0
+    for fig,ax,artists,_ in r.figures.values():
+        for a in artists:
+            if hasattr(a,'get_xydata'):
+                n += len(a.get_xydata())
+            elif hasattr(a,'get_paths'):
+                n += sum(len(p.vertices) for p in a.get_paths())
+    return n
+
+def test_zoomed_layer_reads_fewer_rows():
+    spec = dict(DEFAULT_SPEC,limits=[('DarkMatterDecay','AxionPhoton','DarkMatterDecay',{})])
+    wide,zoomed = LayerRenderer(dpi=50),LayerRenderer(dpi=50)
+    wide.Render(dict(spec,xlim=(1e-12,1e7)))
+    zoomed.Render(dict(spec,xlim=(1e-6,1e-5)))
+    assert vertices(zoomed)<vertices(wide)/10
+    # views inside the layer's window reuse its figure
+    zoomed.Render(dict(spec,xlim=(2e-6,8e-6)))
+    assert len(zoomed.figures)==1